@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reconhecimento automático do banco de um extrato.
+
+Lê apenas o início do arquivo, antes de qualquer extração completa ou OCR:
+
+- OFX: os primeiros kilobytes, procurando o código do banco (BANKID/FID) e
+  o nome da instituição (ORG); sem eles, as assinaturas no texto.
+- PDF: a camada de texto da primeira página (PyMuPDF, sem renderizar).
+  Páginas escaneadas não têm texto, e o banco fica sem reconhecimento.
+
+As assinaturas de cada banco ficam nos perfis de bank_profiles. Vence o
+banco com mais ocorrências; empate ou nenhuma ocorrência resulta em None.
+"""
+
+import os
+import re
+from typing import Dict, List, Optional
+
+from bank_profiles import DETECTABLE_PROFILES, BankProfile
+from lazy_imports import lazy_import
+
+fitz = lazy_import("fitz")  # PyMuPDF
+
+OFX_SAMPLE_SIZE = 64 * 1024
+PDF_SAMPLE_PAGES = 1
+
+SUPPORTED_EXTENSIONS = ('.ofx', '.pdf')
+
+_ofx_id_pattern = re.compile(r'<(BANKID|FID|ORG)>\s*([^<\r\n]+)', re.IGNORECASE)
+
+
+def _best_by_signatures(upper_text: str, profiles: List[BankProfile]) -> Optional[str]:
+    scores = [(profile.signature_hits(upper_text), profile.name) for profile in profiles]
+    scores.sort(reverse=True)
+    if not scores or scores[0][0] == 0:
+        return None
+    if len(scores) > 1 and scores[1][0] == scores[0][0]:
+        return None
+    return scores[0][1]
+
+
+def detect_ofx_bank(file_path: str) -> Optional[str]:
+    """
+    Banco de um OFX pelo cabeçalho (código ou nome da instituição).
+    """
+    with open(file_path, 'rb') as f:
+        sample = f.read(OFX_SAMPLE_SIZE).decode('latin-1')
+
+    for _, value in _ofx_id_pattern.findall(sample):
+        value = value.strip().upper()
+        for profile in DETECTABLE_PROFILES:
+            if value in profile.ofx_ids:
+                return profile.name
+    return _best_by_signatures(sample.upper(), DETECTABLE_PROFILES)
+
+
+def first_pages_text(file_path: str, pages: int = PDF_SAMPLE_PAGES) -> str:
+    """
+    Camada de texto das primeiras páginas do PDF (vazia se forem escaneadas).
+    """
+    with fitz.open(file_path) as document:
+        return "\n".join(document[page_num].get_text() for page_num in range(min(pages, len(document))))
+
+
+def detect_pdf_bank(file_path: str) -> Optional[str]:
+    """
+    Banco de um PDF pelas assinaturas na primeira página.
+    """
+    return _best_by_signatures(first_pages_text(file_path).upper(), DETECTABLE_PROFILES)
+
+
+def detect_bank(file_path: str) -> Optional[str]:
+    """
+    Banco do extrato, ou None se não for possível reconhecê-lo.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    try:
+        if extension == '.ofx':
+            return detect_ofx_bank(file_path)
+        if extension == '.pdf':
+            return detect_pdf_bank(file_path)
+    except Exception as e:
+        print(f"Não foi possível reconhecer o banco de '{file_path}': {e}")
+    return None
+
+
+def statement_files(folder: str) -> List[str]:
+    """
+    Extratos (.ofx e .pdf) de uma pasta, em ordem alfabética.
+    """
+    return sorted(
+        os.path.join(folder, name) for name in os.listdir(folder)
+        if name.lower().endswith(SUPPORTED_EXTENSIONS) and os.path.isfile(os.path.join(folder, name))
+    )
+
+
+def detect_folder(folder: str) -> Dict[str, Optional[str]]:
+    """
+    Banco de cada extrato da pasta: {caminho: banco ou None}.
+    """
+    return {file_path: detect_bank(file_path) for file_path in statement_files(folder)}
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Perfis declarativos dos bancos suportados.
+
+Cada perfil descreve as regras de um extrato: palavras que fazem a linha ser
+ignorada, o padrão da linha de transação, as regras de limpeza da descrição
+(incluindo os nomes de cidade no final) e o padrão do ano da fatura. As
+regras são compiladas uma única vez, na importação do módulo, e as listas de
+palavras viram uma única expressão com alternativas, de modo que cada linha
+é testada em uma só passada. Palavras sem distinção de maiúsculas são
+buscadas na linha convertida com upper() (bem mais rápido que re.IGNORECASE).
+
+Os perfis trazem também as assinaturas usadas para reconhecer o banco de um
+arquivo (bank_detection): palavras do texto da primeira página do PDF e
+códigos/nomes da instituição no cabeçalho do OFX.
+
+Para adicionar um banco com extrato linha a linha basta criar um perfil e
+registrá-lo em BANK_PROFILES.
+"""
+
+import re
+from typing import List, Dict, Tuple, Optional, Callable, Iterable, Iterator, Pattern, Union
+
+# Cidades que aparecem coladas no fim das descrições
+CITY_NAMES = ['RIBEIRAO PRET', 'RIBEIRAO PRE', 'SAO PAULO', 'OSASCO', 'HORTOLANDIA',
+              'BELO HORIZON', 'SAN FRANCISCO']
+
+
+def _alternation(words: Iterable[str]) -> str:
+    # Palavras mais longas primeiro, para a alternativa mais específica vencer
+    return '|'.join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+
+
+def keyword_regex(keywords: Iterable[str] = (), patterns: Iterable[str] = ()) -> Optional[Pattern]:
+    """
+    Compila palavras e padrões soltos em uma única expressão, usada com search().
+    """
+    parts = []
+    if keywords:
+        parts.append(_alternation(keywords))
+    parts.extend(patterns)
+    return re.compile('|'.join(parts)) if parts else None
+
+
+def city_tail_rule(cities: Iterable[str]) -> Tuple[str, str, int]:
+    """
+    Regra que corta a descrição a partir da primeira cidade encontrada.
+    """
+    return (rf'\s*(?:{_alternation(cities)}).*$', '', re.IGNORECASE)
+
+
+def city_suffix_rule(cities: Iterable[str]) -> Tuple[str, str, int]:
+    """
+    Regra que remove cidades apenas quando estão no final da descrição.
+    """
+    return (rf'(?:\s+(?:{_alternation(cities)})\s*)+$', '', re.IGNORECASE)
+
+
+class BankProfile:
+    """
+    Regras de leitura do extrato de um banco, já compiladas.
+
+    - ignore / ignore_upper: linhas que casam com estas expressões (a segunda
+      aplicada à linha em maiúsculas) são descartadas.
+    - line: padrão da linha de transação; line_groups diz quais grupos são
+      a data, a descrição e o valor.
+    - cleanup: regras (padrão, substituição, flags) aplicadas em ordem à descrição.
+    - patterns / keyword_sets: expressões extras usadas por parsers com estado.
+    - text_engine: mecanismo da camada de texto do PDF ("pymupdf" ou
+      "pdfplumber", ver pdf_extraction.TEXT_ENGINES).
+    - end: linha que encerra o extrato; o que vem depois (propaganda, textos
+      legais) não é lido, e as páginas restantes nem chegam a ser extraídas.
+    - signatures: palavras (sem distinção de maiúsculas) que identificam o
+      banco no texto do extrato; ofx_ids: código do banco (BANKID/FID) ou
+      nome da instituição (ORG) no OFX.
+    """
+    def __init__(self, name: str,
+                 line_pattern: Optional[str] = None,
+                 line_groups: Tuple[int, int, int] = (1, 2, 3),
+                 ignore_keywords: Iterable[str] = (),
+                 ignore_keywords_nocase: Iterable[str] = (),
+                 ignore_patterns: Iterable[str] = (),
+                 cleanup: Iterable[Tuple[str, str, int]] = (),
+                 year_pattern: str = r'(\d{2}/\d{2}/(\d{4}))',
+                 year_group: int = 2,
+                 year_flags: int = 0,
+                 skip_zero_values: bool = False,
+                 skip_empty_descriptions: bool = False,
+                 postprocess: Optional[Callable[[str], str]] = None,
+                 patterns: Optional[Dict[str, str]] = None,
+                 keyword_sets: Optional[Dict[str, Iterable[str]]] = None,
+                 signatures: Iterable[str] = (),
+                 ofx_ids: Iterable[str] = (),
+                 end_keywords: Iterable[str] = (),
+                 text_engine: str = "pymupdf"):
+        self.name = name
+        self.line = re.compile(line_pattern) if line_pattern else None
+        self.line_groups = line_groups
+        self.ignore = keyword_regex(ignore_keywords, ignore_patterns)
+        self.ignore_upper = keyword_regex([k.upper() for k in ignore_keywords_nocase])
+        self.cleanup: List[Tuple[Pattern, str]] = [(re.compile(p, flags), repl) for p, repl, flags in cleanup]
+        self.year = re.compile(year_pattern, year_flags)
+        self.year_group = year_group
+        self.skip_zero_values = skip_zero_values
+        self.skip_empty_descriptions = skip_empty_descriptions
+        self.postprocess = postprocess
+        self.patterns: Dict[str, Pattern] = {k: re.compile(v) for k, v in (patterns or {}).items()}
+        self.keyword_sets: Dict[str, Pattern] = {k: keyword_regex(v) for k, v in (keyword_sets or {}).items()}
+        self.signatures = re.compile(rf'\b(?:{_alternation(w.upper() for w in signatures)})\b') if signatures else None
+        self.ofx_ids = {i.upper() for i in ofx_ids}
+        self.end = keyword_regex(end_keywords)
+        self.text_engine = text_engine
+
+    def should_ignore(self, line: str) -> bool:
+        if self.ignore_upper is not None and self.ignore_upper.search(line.upper()):
+            return True
+        return self.ignore is not None and self.ignore.search(line) is not None
+
+    def clean(self, description: str) -> str:
+        for pattern, repl in self.cleanup:
+            description = pattern.sub(repl, description)
+        description = description.strip()
+        if self.postprocess:
+            description = self.postprocess(description)
+        return description
+
+    def signature_hits(self, upper_text: str) -> int:
+        """
+        Quantas vezes as assinaturas do banco aparecem no texto (já em maiúsculas).
+        """
+        if self.signatures is None:
+            return 0
+        return sum(1 for _ in self.signatures.finditer(upper_text))
+
+    def is_end(self, line: str) -> bool:
+        return self.end is not None and self.end.search(line) is not None
+
+    def statement_year(self, text: str, default: int) -> int:
+        match = self.year.search(text)
+        return int(match.group(self.year_group)) if match else default
+
+
+def _capitalize_words(text: str) -> str:
+    # Remove "R$" se for a única coisa que sobrou
+    if text.upper() == 'R$':
+        return ""
+    return ' '.join(word.capitalize() for word in text.split())
+
+
+def _truncate(text: str, limit: int = 50) -> str:
+    return text[:limit] + "..." if len(text) > limit else text
+
+
+SPACES = (r'\s+', ' ', 0)
+
+SANTANDER = BankProfile(
+    "Santander",
+    # Captura data (com ou sem ano), descrição e valor, sem deixar "R$" na descrição
+    line_pattern=r'(\d{2}/\d{2}(?:/\d{2,4})?)\s+(.+?)\s+(?:R\$)?\s*([\d.,]+,\d{2})',
+    ignore_keywords_nocase=['TOTAL', 'SALDO', 'PAGAMENTO', 'FATURA', 'ANTERIOR', 'CRÉDITO',
+                            'DÉBITO AUTOM', 'ENCARGOS', 'ANUIDADE DIFERENCIADA', 'RESUMO',
+                            'LIMITE', 'DISPONÍVEL'],
+    ignore_patterns=[r'-\s*[\d.,]+,\d{2}'],  # valores negativos (créditos)
+    cleanup=[
+        (r'\s+\d{2}/\d{2}\s*$', '', 0),      # parcelamento (ex: 01/12)
+        (r'\s+[A-Z0-9]{6,8}$', '', 0),       # códigos no final (ex: "EMCT06D06")
+        (r'[*]', ' ', 0),
+        SPACES,
+    ],
+    year_pattern=r'Vencimento\s+\d{2}/\d{2}/(20\d{2})',
+    year_group=1,
+    year_flags=re.IGNORECASE,
+    skip_zero_values=True,
+    skip_empty_descriptions=True,
+    postprocess=_capitalize_words,
+    signatures=['SANTANDER', 'SANTANDER SX', 'SANTANDER FREE', 'WAY SANTANDER'],
+    ofx_ids=['033', '0033', 'SANTANDER'],
+)
+
+ITAU = BankProfile(
+    "Itaú",
+    line_pattern=r"(\d{2}/\d{2})\s+([^\n]+?)\s+R\$?([\d\.]+,\d{2})",
+    ignore_keywords=['Total', 'Saldo', 'Pagamento', 'Encargos', 'Tarifas', 'Custo Efetivo'],
+    cleanup=[
+        (r'\s*\d{2}/\d{2}$', '', 0),
+        (r'\s*un\d{2}/\d{2}$', '', 0),
+        SPACES,
+    ],
+    signatures=['ITAÚ', 'ITAU', 'ITAUCARD', 'ITAÚ UNIBANCO', 'PERSONNALITÉ'],
+    ofx_ids=['341', '0341', 'ITAU', 'ITAÚ', 'BANCO ITAU'],
+)
+
+BANCO_DO_BRASIL = BankProfile(
+    "Banco do Brasil",
+    line_pattern=r"(\d{2}/\d{2})\s+(.*?)\s+([\d\.]+,\d{2})",
+    ignore_keywords=['LANÇAMENTOS', 'TOTAL', 'FATURA', 'SALDO', 'RESUMO', 'ANTERIOR', 'PARCIAL',
+                     ' - ', '-R$'],
+    ignore_keywords_nocase=['CRÉDITO', 'ESTORNO'],
+    cleanup=[
+        (r'\s*PARC\s+\d{2}/\d{2}', '', re.IGNORECASE),
+        city_suffix_rule(CITY_NAMES),
+        SPACES,
+    ],
+    signatures=['BANCO DO BRASIL', 'OUROCARD', 'BB.COM.BR'],
+    ofx_ids=['001', '0001', 'BANCO DO BRASIL', 'BB'],
+)
+
+CAIXA = BankProfile(
+    "Caixa",
+    line_pattern=r'(\d{2}/\d{2})\s+(.+?)\s+([A-Z][A-Z\s]*[A-Z])\s+([\d\.]+,\d{2})\s*D\s*$',
+    line_groups=(1, 2, 4),
+    cleanup=[
+        (r'\s+\d{2}\s+DE\s+\d{2}', '', re.IGNORECASE),
+        (r'\s+\d{2}/\d{2}$', '', 0),
+        (r'\s+\d{1,2}/\s*\d{1,2}', '', 0),
+        (r'\s+-\s+\d+', '', 0),
+        (r'\s+\d{6}', '', 0),
+        (r'\*', ' ', 0),
+        SPACES,
+    ],
+    postprocess=_truncate,
+    patterns={
+        'card_header': r'^[A-Z\s]+\s*\(Cartão\s+\d+\)',
+        'anuidade': r'^([A-Z\s\d/]+?)\s+([\d\.]+,\d{2})\s*D\s*$',
+        'alt': r'(\d{2}/\d{2})\s+(.+)\s+([\d\.]+,\d{2})\s*D',
+    },
+    keyword_sets={
+        'section_end': ["OUTROS", "Demonstrativo", "Total final", "Valor total desta fatura",
+                        "Total COMPRAS", "Total COMPRAS PARCELADAS"],
+        'column_header': ["Data", "Descrição", "Cidade/País", "Valor U$$", "Crédito/Débito",
+                          "Total", "Valor Original", "Cotação"],
+    },
+    end_keywords=["Total final"],
+    signatures=['CAIXA', 'CAIXA ECONÔMICA FEDERAL', 'CAIXA ECONOMICA FEDERAL', 'CAIXA.GOV.BR'],
+    ofx_ids=['104', '0104', 'CAIXA', 'CAIXA ECONOMICA FEDERAL'],
+)
+CAIXA_SECTIONS = ["ANUIDADE", "COMPRAS", "COMPRAS PARCELADAS"]
+
+SICOOB = BankProfile(
+    "Sicoob",
+    # Fatura em PDF: data, descrição (com cidade) e valor, com "D" opcional no fim
+    line_pattern=r'(\d{2}/\d{2})\s+(.+?)\s+(?:R\$\s*)?([\d.]+,\d{2})\s*D?\s*$',
+    ignore_keywords_nocase=['TOTAL', 'SALDO', 'PAGAMENTO', 'LIMITE', 'ENCARGOS', 'ESTORNO', 'CRÉDITO'],
+    ignore_patterns=[r'-\s*[\d.,]+,\d{2}', r'[\d.,]+,\d{2}\s*C\s*$'],  # créditos
+    year_pattern=r'Vencimento\D{0,20}\d{2}/\d{2}/(20\d{2})',
+    year_group=1,
+    year_flags=re.IGNORECASE,
+    skip_zero_values=True,
+    skip_empty_descriptions=True,
+    cleanup=[
+        (r'\s+\d{2}/\d{2}\s+', ' ', 0),
+        city_tail_rule(CITY_NAMES + ['ARIBEIRAO PRE']),
+        SPACES,
+        (r'\s*-?\s*US\$.*$', '', 0),
+    ],
+    signatures=['SICOOB', 'SICOOBCARD', 'BANCOOB'],
+    ofx_ids=['756', '0756', 'SICOOB', 'BANCOOB'],
+)
+
+# Perfis de todos os bancos suportados, usados no reconhecimento automático
+DETECTABLE_PROFILES: List[BankProfile] = [SICOOB, SANTANDER, ITAU, BANCO_DO_BRASIL, CAIXA]
+
+# Perfil de cada banco pelo nome
+PROFILES_BY_NAME: Dict[str, BankProfile] = {profile.name: profile for profile in DETECTABLE_PROFILES}
+
+# Perfis dos extratos lidos linha a linha pelo parser genérico
+BANK_PROFILES: Dict[str, BankProfile] = {
+    "Santander": SANTANDER,
+    "Itaú": ITAU,
+    "Banco do Brasil": BANCO_DO_BRASIL,
+}
+
+
+def format_statement_date(date_str: str, year: int) -> str:
+    """
+    Converte "dd/mm", "dd/mm/aa" ou "dd/mm/aaaa" em "dd/mm/aaaa".
+    """
+    parts = date_str.replace(' ', '').split('/')
+    if len(parts) == 3:
+        day, month, year_part = parts
+        if len(year_part) == 2:
+            return f"{day}/{month}/20{year_part}"
+        return date_str
+    return f"{parts[0].zfill(2)}/{parts[1].zfill(2)}/{year}"
+
+
+def parse_value(value_str: str) -> float:
+    """
+    Converte um valor no formato brasileiro ("1.234,56") em float.
+    """
+    return float(value_str.replace('.', '').replace(',', '.'))
+
+
+def statement_pages(profile: BankProfile, pages: Union[str, Iterable[str]],
+                    default_year: int) -> Iterator[Tuple[int, str]]:
+    """
+    Gera (ano da fatura, texto da página). pages é o texto inteiro ou o
+    texto de cada página, consumido aos poucos: o ano é procurado página a
+    página e só as páginas anteriores à que o contém (normalmente nenhuma)
+    ficam guardadas.
+    """
+    if isinstance(pages, str):
+        pages = [pages]
+    held: List[str] = []
+    year = None
+    for text in pages:
+        if year is None:
+            match = profile.year.search(text)
+            held.append(text)
+            if match is None:
+                continue
+            year = int(match.group(profile.year_group))
+            for held_text in held:
+                yield year, held_text
+            held = []
+        else:
+            yield year, text
+    for held_text in held:
+        yield default_year, held_text
+
+
+def statement_lines(profile: BankProfile, pages: Union[str, Iterable[str]],
+                    default_year: int) -> Iterator[Tuple[int, str]]:
+    """
+    Gera (ano da fatura, linha) para cada linha não vazia do extrato, já sem
+    espaços nas pontas (ver statement_pages).
+    """
+    for year, text in statement_pages(profile, pages, default_year):
+        for line in text.split('\n'):
+            line = line.strip()
+            if line:
+                yield year, line
+
+
+def parse_lines(profile: BankProfile, pages: Union[str, Iterable[str]],
+                default_year: int) -> Iterator[Tuple[str, str, float]]:
+    """
+    Parser genérico dos extratos linha a linha. Gera (data, descrição, valor)
+    para cada linha de transação, aplicando as regras do perfil. Para na
+    linha de fim do extrato, se o perfil tiver uma.
+    """
+    line_regex = profile.line
+    should_ignore = profile.should_ignore
+    date_group, description_group, value_group = profile.line_groups
+
+    for year, line in statement_lines(profile, pages, default_year):
+        if profile.is_end(line):
+            return
+        if should_ignore(line):
+            continue
+        match = line_regex.search(line)
+        if not match:
+            continue
+
+        date_str, description, value_str = match.group(date_group, description_group, value_group)
+        try:
+            value = parse_value(value_str)
+        except ValueError as e:
+            print(f"Erro ao converter valor '{value_str}' ({profile.name}): {e}")
+            continue
+        if profile.skip_zero_values and value <= 0:
+            continue
+
+        clean_description = profile.clean(description.strip())
+        if profile.skip_empty_descriptions and not clean_description:
+            continue
+        yield format_statement_date(date_str.strip(), year), clean_description, value
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark da gravação na planilha: fluxo anterior (copiar o modelo,
+reabrir, procurar a linha livre célula a célula e gravar por coordenada
+"C6") contra excel_writer.write_transactions. Mede linhas por segundo.
+
+Uso: python benchmarks/bench_excel.py [transações] [linhas já preenchidas no modelo]
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openpyxl import load_workbook  # noqa: E402
+
+from excel_writer import write_transactions  # noqa: E402
+from generators import build_template  # noqa: E402
+from transaction_records import Transaction  # noqa: E402
+
+
+def synthetic_transactions(count: int):
+    return [Transaction(f"LOJA {i}", date(2025, 8, 5), 1000 + 100 * i, "" if i % 3 else f"Fornecedor {i}")
+            for i in range(count)]
+
+
+def legacy_write(template: str, output: str, transactions, account: str, due_date: str):
+    shutil.copy2(template, output)
+    workbook = load_workbook(output)
+    worksheet = workbook.active
+    current_row = 6
+    while worksheet[f'C{current_row}'].value is not None:
+        current_row += 1
+    for transaction in transactions:
+        worksheet[f'C{current_row}'] = transaction.supplier or transaction.description
+        worksheet[f'D{current_row}'] = transaction.category
+        worksheet[f'E{current_row}'] = account
+        worksheet[f'F{current_row}'] = transaction.value
+        worksheet[f'J{current_row}'] = transaction.date_text
+        worksheet[f'K{current_row}'] = due_date
+        current_row += 1
+    workbook.save(output)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    filled = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    transactions = synthetic_transactions(count)
+    with tempfile.TemporaryDirectory() as tmp:
+        template = os.path.join(tmp, "modelo.xlsx")
+        build_template(template, filled)
+        print(f"{count} transações, modelo com {filled} linhas preenchidas")
+        for name, writer in [("anterior", legacy_write), ("excel_writer", write_transactions)]:
+            output = os.path.join(tmp, f"{name}.xlsx")
+            start = time.perf_counter()
+            writer(template, output, transactions, "Conta", "10/09/2025")
+            elapsed = time.perf_counter() - start
+            print(f"{name:>13}: {elapsed:6.2f} s  {count / elapsed:9.0f} linhas/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark da rasterização e do OCR por página em faturas escaneadas:
+fluxo anterior (pixmap colorido em 300 DPI, PNG codificado e decodificado
+de novo, página inteira no Tesseract) contra o atual de pdf_extraction
+(pixmap em tons de cinza direto para o Pillow, primeira leitura em
+OCR_PROBE_DPI e resolução completa só na região da tabela).
+
+Para cada página são medidos o tempo de renderização, o tempo de OCR, o
+tamanho da maior imagem e o pico de memória alocada pelo Python
+(tracemalloc). Sem o Tesseract instalado, mede só a renderização
+(primeira leitura e página inteira em resolução completa).
+
+Uso: python benchmarks/bench_ocr.py [fatura escaneada.pdf] [--banco Santander] [--transacoes N]
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_extraction import (fitz, pytesseract, Image, _render, _render_and_ocr,  # noqa: E402
+                            DEFAULT_OCR_DPI, DEFAULT_OCR_LANG, OCR_PROBE_DPI)
+from generators import write_scanned_statement_pdf, SUPPORTED_PDF_BANKS  # noqa: E402
+
+
+def legacy_render(page, dpi: int):
+    pix = page.get_pixmap(matrix=fitz.Matrix(dpi / 72, dpi / 72))
+    image = Image.open(BytesIO(pix.tobytes("png")))
+    image.load()
+    return image, len(pix.samples_mv)
+
+
+def legacy_ocr(page, dpi: int, lang: str):
+    start = time.perf_counter()
+    image, image_bytes = legacy_render(page, dpi)
+    render_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    pytesseract.image_to_string(image, lang=lang)
+    return render_seconds, time.perf_counter() - start, image_bytes
+
+
+def current_ocr(document, page_num: int, dpi: int, lang: str):
+    _, stats = _render_and_ocr(document, page_num, dpi, lang)
+    return stats.render_seconds, stats.ocr_seconds, stats.image_bytes
+
+
+def render_only(render, page, dpi: int):
+    start = time.perf_counter()
+    _, image_bytes = render(page, dpi)
+    return time.perf_counter() - start, 0.0, image_bytes
+
+
+def traced(func, *args):
+    tracemalloc.start()
+    try:
+        result = func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result + (peak,)
+
+
+def tesseract_available() -> bool:
+    try:
+        pytesseract.get_tesseract_version()
+        return True
+    except Exception:
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rasterização e OCR por página em faturas escaneadas.")
+    parser.add_argument("fatura", nargs="?", help="PDF escaneado (padrão: fatura sintética)")
+    parser.add_argument("--banco", default="Santander", choices=SUPPORTED_PDF_BANKS)
+    parser.add_argument("--transacoes", type=int, default=150, help="transações da fatura sintética")
+    parser.add_argument("--dpi", type=int, default=DEFAULT_OCR_DPI)
+    parser.add_argument("--idioma", default=DEFAULT_OCR_LANG)
+    args = parser.parse_args()
+
+    with_ocr = tesseract_available()
+    if not with_ocr:
+        print("Tesseract não encontrado: medindo só a renderização.")
+    tmp = tempfile.mkdtemp()
+    try:
+        path = args.fatura
+        if not path:
+            path = os.path.join(tmp, "fatura_escaneada.pdf")
+            write_scanned_statement_pdf(path, args.banco, args.transacoes)
+        if with_ocr:
+            methods = [("anterior", lambda doc, n: legacy_ocr(doc[n], args.dpi, args.idioma)),
+                       ("atual", lambda doc, n: current_ocr(doc, n, args.dpi, args.idioma))]
+        else:
+            methods = [("anterior", lambda doc, n: render_only(legacy_render, doc[n], args.dpi)),
+                       (f"prova {OCR_PROBE_DPI} DPI", lambda doc, n: render_only(_render, doc[n], OCR_PROBE_DPI)),
+                       (f"cinza {args.dpi} DPI", lambda doc, n: render_only(_render, doc[n], args.dpi))]
+
+        totals = {name: [0.0, 0.0, 0, 0] for name, _ in methods}
+        with fitz.open(path) as document:
+            print(f"{os.path.basename(path)}: {len(document)} página(s), {args.dpi} DPI")
+            for page_num in range(len(document)):
+                for name, method in methods:
+                    render_seconds, ocr_seconds, image_bytes, peak = traced(method, document, page_num)
+                    total = totals[name]
+                    total[0] += render_seconds
+                    total[1] += ocr_seconds
+                    total[2] = max(total[2], image_bytes)
+                    total[3] = max(total[3], peak)
+                    print(f"  página {page_num + 1:>3} {name:>16}: renderização {render_seconds:6.3f} s  "
+                          f"OCR {ocr_seconds:6.3f} s  imagem {image_bytes / 1024 / 1024:6.1f} MB  "
+                          f"pico {peak / 1024 / 1024:6.1f} MB")
+        print("Total:")
+        for name, (render_seconds, ocr_seconds, image_bytes, peak) in totals.items():
+            print(f"  {name:>16}: renderização {render_seconds:6.3f} s  OCR {ocr_seconds:6.3f} s  "
+                  f"maior imagem {image_bytes / 1024 / 1024:6.1f} MB  pico {peak / 1024 / 1024:6.1f} MB")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do leitor de OFX: leitura antiga (arquivo inteiro + re.findall)
+contra o leitor em fluxo, num arquivo sintético de 100 mil transações.
+
+Uso: python benchmarks/bench_ofx.py [quantidade]
+"""
+
+import os
+import re
+import sys
+import time
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ofx_parser import iter_ofx_file  # noqa: E402
+from generators import write_synthetic_ofx  # noqa: E402
+
+def legacy_parse(file_path: str) -> int:
+    """
+    Reprodução da leitura anterior de _process_ofx (sem a limpeza da descrição).
+    """
+    try:
+        with open(file_path, 'r', encoding='utf-8') as file:
+            content = file.read()
+    except UnicodeDecodeError:
+        with open(file_path, 'r', encoding='latin-1') as file:
+            content = file.read()
+    count = 0
+    for match in re.findall(r'<STMTTRN>(.*?)</STMTTRN>', content, re.DOTALL):
+        parts = [re.search(r'<TRNTYPE>(.*?)</TRNTYPE>', match),
+                 re.search(r'<DTPOSTED>(\d{8}).*?</DTPOSTED>', match),
+                 re.search(r'<TRNAMT>(-?\d+\.?\d*)', match),
+                 re.search(r'<MEMO>(.*?)</MEMO>', match)]
+        if all(parts) and float(parts[2].group(1)) < 0:
+            count += 1
+    return count
+
+
+def streaming_parse(file_path: str) -> int:
+    count = 0
+    for fields in iter_ofx_file(file_path):
+        if fields.get('TRNAMT', '').startswith('-'):
+            count += 1
+    return count
+
+
+def measure(func, file_path: str):
+    # Tempo e memória em execuções separadas: o tracemalloc distorce o tempo
+    start = time.perf_counter()
+    result = func(file_path)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func(file_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = os.path.join(tmp, 'sintetico.ofx')
+        write_synthetic_ofx(file_path, count)
+        size_mb = os.path.getsize(file_path) / 1024 / 1024
+        print(f"Arquivo sintético: {count} transações, {size_mb:.1f} MB")
+        for name, func in [('anterior', legacy_parse), ('streaming', streaming_parse)]:
+            debits, elapsed, peak = measure(func, file_path)
+            print(f"{name:>10}: {elapsed:6.2f} s  pico {peak / 1024 / 1024:7.1f} MB  débitos {debits}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark dos parsers por linha: laços anteriores (regex montada a cada
+linha, upper() por palavra-chave, um re.sub por cidade) contra os perfis
+compilados de bank_profiles, e o parser por linha da fatura da Caixa.
+
+Uso: python benchmarks/bench_parsers.py [linhas]
+"""
+
+import os
+import re
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bank_profiles import SANTANDER, BANCO_DO_BRASIL, SICOOB, parse_lines  # noqa: E402
+from generators import statement_lines, LINES_PER_PAGE  # noqa: E402
+
+MERCHANTS = ['UBER *TRIP', 'IFOOD *RESTAURANTE', 'POSTO IPE AMARELO', 'SUPERMERCADO SAO JOAO',
+             'AMAZON MARKETPLACE', 'PADARIA PAO DOURADO', 'DROGASIL 1234', 'NETFLIX.COM']
+CITIES = ['RIBEIRAO PRET', 'SAO PAULO', 'OSASCO', 'BELO HORIZON', '']
+NOISE = ['SALDO ANTERIOR 1.234,56', 'PAGAMENTO EFETUADO -1.000,00', 'Limite disponível R$ 5.000,00',
+         'Central de atendimento 4004 3535', 'TOTAL DA FATURA 2.345,67']
+
+
+def synthetic_lines(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    lines = ["Vencimento 10/09/2025"]
+    for _ in range(count):
+        if rng.random() < 0.2:
+            lines.append(rng.choice(NOISE))
+        else:
+            lines.append(f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d} {rng.choice(MERCHANTS)} "
+                         f"{rng.choice(CITIES)} {rng.randint(1, 999)},{rng.randint(0, 99):02d}")
+    return '\n'.join(lines)
+
+
+def legacy_santander(text: str) -> int:
+    count = 0
+    ignore_keywords = ['TOTAL', 'SALDO', 'PAGAMENTO', 'FATURA', 'ANTERIOR', 'CRÉDITO',
+                       'DÉBITO AUTOM', 'ENCARGOS', 'ANUIDADE DIFERENCIADA', 'RESUMO',
+                       'LIMITE', 'DISPONÍVEL']
+    pattern = r'(\d{2}/\d{2}(?:/\d{2,4})?)\s+(.+?)\s+(?:R\$)?\s*([\d.,]+,\d{2})'
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        if any(keyword in line.upper() for keyword in ignore_keywords):
+            continue
+        if re.search(r'-\s*[\d.,]+,\d{2}', line):
+            continue
+        match = re.search(pattern, line)
+        if match:
+            description = match.group(2).strip()
+            cleaned = re.sub(r'\s+\d{2}/\d{2}\s*$', '', description).strip()
+            cleaned = re.sub(r'\s+[A-Z0-9]{6,8}$', '', cleaned).strip()
+            cleaned = re.sub(r'[*]', ' ', cleaned).strip()
+            cleaned = re.sub(r'\s+', ' ', cleaned)
+            if ' '.join(word.capitalize() for word in cleaned.split()):
+                count += 1
+    return count
+
+
+def legacy_bb(text: str) -> int:
+    count = 0
+    pattern = r"(\d{2}/\d{2})\s+(.*?)\s+([\d\.]+,\d{2})"
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        if any(word in line for word in ['LANÇAMENTOS', 'TOTAL', 'FATURA', 'SALDO', 'RESUMO', 'ANTERIOR', 'PARCIAL']):
+            continue
+        if ' - ' in line or '-R$' in line or 'CRÉDITO' in line.upper() or 'ESTORNO' in line.upper():
+            continue
+        match = re.search(pattern, line)
+        if match:
+            cleaned = re.sub(r'\s*PARC\s+\d{2}/\d{2}', '', match.group(2).strip(), flags=re.IGNORECASE)
+            for city in ['RIBEIRAO PRET', 'RIBEIRAO PRE', 'SAO PAULO', 'OSASCO', 'HORTOLANDIA',
+                         'BELO HORIZON', 'SAN FRANCISCO']:
+                cleaned = re.sub(r'\s+' + re.escape(city) + r'\s*$', '', cleaned, flags=re.IGNORECASE)
+            re.sub(r'\s+', ' ', cleaned).strip()
+            count += 1
+    return count
+
+
+def legacy_sicoob(memos) -> int:
+    for description in memos:
+        cleaned = re.sub(r'\s+\d{2}/\d{2}\s+', ' ', description)
+        for city in ['RIBEIRAO PRET', 'RIBEIRAO PRE', 'SAO PAULO', 'OSASCO', 'HORTOLANDIA',
+                     'BELO HORIZON', 'SAN FRANCISCO', 'ARIBEIRAO PRE']:
+            cleaned = re.sub(rf'\s*{re.escape(city)}.*$', '', cleaned, flags=re.IGNORECASE)
+        cleaned = re.sub(r'\s+', ' ', cleaned)
+        re.sub(r'\s*-?\s*US\$.*$', '', cleaned).strip()
+    return len(memos)
+
+
+def profile_sicoob(memos) -> int:
+    for description in memos:
+        SICOOB.clean(description)
+    return len(memos)
+
+
+def caixa_pages(count: int):
+    lines = statement_lines("Caixa", count)
+    return ['\n'.join(lines[start:start + LINES_PER_PAGE]) for start in range(0, len(lines), LINES_PER_PAGE)]
+
+
+def compiled_caixa(pages) -> list:
+    import contextlib
+    from processor import ExtractProcessor
+
+    processor = ExtractProcessor.__new__(ExtractProcessor)  # só o parser; sem caches nem histórico
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        return list(processor._cef_pdf_rows(pages))
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    text = synthetic_lines(count)
+    memos = [line[6:] for line in text.split('\n')[1:]]
+    cases = [
+        ('Santander', lambda: legacy_santander(text), lambda: sum(1 for _ in parse_lines(SANTANDER, text, 2025))),
+        ('BB', lambda: legacy_bb(text), lambda: sum(1 for _ in parse_lines(BANCO_DO_BRASIL, text, 2025))),
+        ('Sicoob (limpeza)', lambda: legacy_sicoob(memos), lambda: profile_sicoob(memos)),
+    ]
+    print(f"Corpus sintético: {count} linhas")
+    for name, legacy, compiled in cases:
+        legacy_count, legacy_time = timed(legacy)
+        compiled_count, compiled_time = timed(compiled)
+        print(f"{name:>17}: anterior {legacy_time / count * 1e6:6.2f} µs/linha ({legacy_count})  "
+              f"perfil {compiled_time / count * 1e6:6.2f} µs/linha ({compiled_count})  "
+              f"{legacy_time / compiled_time:4.1f}x")
+
+    caixa_rows, caixa_time = timed(compiled_caixa, caixa_pages(count))
+    print(f"{'Caixa':>17}: perfil {caixa_time / count * 1e6:6.2f} µs/linha ({len(caixa_rows)})")
+
+
+if __name__ == '__main__':
+    main()
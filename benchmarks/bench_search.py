@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark da pesquisa da conciliação manual: filtro anterior (lower() em
+cada nome a cada tecla) contra search_index.NameSearchIndex. Mede o tempo
+por consulta, sem a lista na tela.
+
+Uso: python benchmarks/bench_search.py [fornecedores]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search_index import NameSearchIndex  # noqa: E402
+from generators import supplier_catalog  # noqa: E402
+
+QUERIES = ["a", "me", "mer", "merc", "mercado", "sao joao", "distribuidora alimentos", "123", "xyz"]
+
+
+def legacy_filter(names, query):
+    query = query.lower()
+    return [name for name in names if query in name.lower()]
+
+
+def time_per_query(func, repeat: int = 20) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in QUERIES:
+            func(query)
+    return (time.perf_counter() - start) / (repeat * len(QUERIES)) * 1000
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    names = sorted({s['nome_fantasia'] or s['razao_social'] for s in supplier_catalog(count)})
+
+    start = time.perf_counter()
+    index = NameSearchIndex(names)
+    build = (time.perf_counter() - start) * 1000
+    print(f"{len(names)} nomes; índice montado em {build:.1f} ms")
+
+    print(f"   anterior: {time_per_query(lambda q: legacy_filter(names, q)):7.3f} ms por consulta")
+    print(f"     índice: {time_per_query(index.search):7.3f} ms por consulta")
+
+
+if __name__ == "__main__":
+    main()
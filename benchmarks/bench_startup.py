@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tempo de inicialização da interface: importação de main.py (sem abrir a
+janela) em um interpretador novo, contra a importação antecipada de todas
+as bibliotecas pesadas, como era feito antes de lazy_imports.
+
+Cada medição roda em um processo separado (importações ficam em cache no
+processo) e vale a melhor de N. Também confere quais bibliotecas pesadas
+ficaram carregadas depois de importar main.py; termina com código 1 se
+alguma delas foi importada na inicialização.
+
+Uso: python benchmarks/bench_startup.py [--repeticoes N]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from lazy_imports import DEPENDENCIES  # noqa: E402
+
+# Importação antecipada das bibliotecas, como no início de main.py antes da carga sob demanda
+EAGER_IMPORTS = "import pandas, openpyxl, pdfplumber, requests, fuzzywuzzy.fuzz, pytesseract, PIL.Image, fitz"
+
+_probe = """
+import sys, time, json
+start = time.perf_counter()
+{imports}
+seconds = time.perf_counter() - start
+print(json.dumps({{"segundos": seconds, "carregadas": [m for m in {modules!r} if m in sys.modules]}}))
+"""
+
+
+def import_time(imports: str) -> dict:
+    """
+    Importa em um interpretador novo e devolve o tempo de importação, o
+    tempo total do processo e as bibliotecas pesadas carregadas.
+    """
+    code = _probe.format(imports=imports, modules=list(DEPENDENCIES))
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-c", code], cwd=REPO_DIR, capture_output=True, text=True,
+                               check=True)
+    total = time.perf_counter() - start
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["processo_segundos"] = total
+    return result
+
+
+def best_of(imports: str, repeat: int) -> dict:
+    runs = [import_time(imports) for _ in range(max(1, repeat))]
+    return min(runs, key=lambda run: run["segundos"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de inicialização da interface.")
+    parser.add_argument("--repeticoes", type=int, default=5, help="processos por medição (vale o melhor)")
+    args = parser.parse_args()
+
+    lazy = best_of("import main", args.repeticoes)
+    eager = best_of(EAGER_IMPORTS + "\nimport main", args.repeticoes)
+    for name, run in [("sob demanda", lazy), ("antecipada", eager)]:
+        print(f"{name:>12}: importação {run['segundos']:6.3f} s  processo {run['processo_segundos']:6.3f} s  "
+              f"bibliotecas carregadas: {', '.join(run['carregadas']) or 'nenhuma'}")
+    if lazy["segundos"]:
+        print(f"{'ganho':>12}: {eager['segundos'] / lazy['segundos']:.1f}x")
+    return 1 if lazy["carregadas"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
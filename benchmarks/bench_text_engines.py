@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Paridade e tempo dos mecanismos da camada de texto (PyMuPDF e pdfplumber).
+
+Para cada extrato, extrai o texto com os dois mecanismos, aplica o parser
+do banco e confere se as transações são idênticas. Sem arquivos, usa PDFs
+sintéticos de todos os bancos; com arquivos ou pastas, usa os extratos
+informados (o banco é reconhecido pelo arquivo). Termina com código 1 se
+algum extrato divergir.
+
+Uso: python benchmarks/bench_text_engines.py [extratos ou pastas...] [--transacoes N]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_extraction import extract_pages, ENGINE_PYMUPDF, ENGINE_TEXT  # noqa: E402
+from bank_detection import detect_bank, statement_files  # noqa: E402
+from generators import write_statement_pdf, SUPPORTED_PDF_BANKS  # noqa: E402
+
+ENGINES = [ENGINE_TEXT, ENGINE_PYMUPDF]
+
+
+def run_engine(processor, file_path: str, bank: str, engine: str):
+    start = time.perf_counter()
+    pages = extract_pages(file_path, workers=1, text_engine=engine)
+    seconds = time.perf_counter() - start
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        transactions = processor._parse_pdf_pages(bank, [page.text for page in pages])
+    return transactions, seconds, len(pages)
+
+
+def first_difference(left, right) -> str:
+    for position, (a, b) in enumerate(zip(left, right)):
+        if a != b:
+            return f"transação {position + 1}: {a} != {b}"
+    return f"quantidades diferentes: {len(left)} != {len(right)}"
+
+
+def compare_file(processor, file_path: str, bank: str) -> bool:
+    results = {engine: run_engine(processor, file_path, bank, engine) for engine in ENGINES}
+    (reference, base_seconds, pages), (fast, fast_seconds, _) = results[ENGINE_TEXT], results[ENGINE_PYMUPDF]
+    same = reference == fast
+    print(f"{os.path.basename(file_path):<32} {bank:<16} {pages:>4} pág.  "
+          f"pdfplumber {base_seconds:7.3f} s  pymupdf {fast_seconds:7.3f} s  "
+          f"{base_seconds / fast_seconds if fast_seconds else float('inf'):5.1f}x  "
+          f"{len(reference):>5} transações  {'idênticas' if same else 'DIVERGEM'}")
+    if not same:
+        print(f"    {first_difference(reference, fast)}")
+    return same
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Paridade e tempo dos mecanismos de texto dos PDFs.")
+    parser.add_argument("extratos", nargs="*", help="extratos em PDF ou pastas (padrão: PDFs sintéticos)")
+    parser.add_argument("--transacoes", type=int, default=1000, help="transações por PDF sintético")
+    args = parser.parse_args()
+
+    from processor import ExtractProcessor
+
+    all_same = True
+    with tempfile.TemporaryDirectory() as tmp:
+        # O processador cria cache/ e dados/ no diretório atual
+        cwd = os.getcwd()
+        files = []
+        for path in args.extratos:
+            path = os.path.abspath(path)
+            files.extend(statement_files(path) if os.path.isdir(path) else [path])
+        os.chdir(tmp)
+        try:
+            processor = ExtractProcessor()
+            if files:
+                cases = [(path, detect_bank(path)) for path in files if path.lower().endswith('.pdf')]
+            else:
+                cases = []
+                for bank in SUPPORTED_PDF_BANKS:
+                    path = os.path.join(tmp, f"extrato_{bank}.pdf")
+                    write_statement_pdf(path, bank, args.transacoes, marketing_pages=2)
+                    cases.append((path, bank))
+            for path, bank in cases:
+                if bank is None:
+                    print(f"{os.path.basename(path):<32} banco não reconhecido, ignorado")
+                    continue
+                all_same = compare_file(processor, path, bank) and all_same
+        finally:
+            os.chdir(cwd)
+    return 0 if all_same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Geradores de dados sintéticos para os benchmarks.
+
+- OFX no formato exportado pelo Sicoob;
+- PDFs com camada de texto no formato dos extratos do Santander, Itaú,
+  Banco do Brasil e Caixa (as linhas seguem os padrões de bank_profiles),
+  e as mesmas faturas escaneadas (só imagem, para o OCR);
+- catálogos de fornecedores e categorias no formato da API da Omie;
+- o modelo da planilha de contas a pagar.
+
+Todos os geradores recebem uma semente, para que execuções diferentes
+usem exatamente os mesmos dados.
+"""
+
+import random
+from typing import List, Dict
+
+MERCHANTS = ['UBER *TRIP', 'IFOOD *RESTAURANTE', 'POSTO IPÊ AMARELO', 'SUPERMERCADO SÃO JOÃO',
+             'AMAZON MARKETPLACE', 'PADARIA PÃO DOURADO', 'FARMÁCIA DROGASIL', 'NETFLIX.COM',
+             'MERCADOLIVRE *LOJA', 'AUTO POSTO CENTRAL', 'RESTAURANTE SABOR', 'LOJAS AMERICANAS']
+PDF_MERCHANTS = [m.replace('Ê', 'E').replace('Ã', 'A').replace('Á', 'A') for m in MERCHANTS]
+CITIES = ['RIBEIRAO PRET', 'SAO PAULO', 'OSASCO', 'BELO HORIZON']
+
+LINES_PER_PAGE = 55
+
+SUPPORTED_PDF_BANKS = ["Santander", "Itaú", "Banco do Brasil", "Caixa"]
+
+
+def write_synthetic_ofx(file_path: str, count: int, seed: int = 42):
+    """
+    Gera um OFX SGML no formato exportado pelo Sicoob (cp1252), com cerca
+    de 10% de créditos.
+    """
+    rng = random.Random(seed)
+    with open(file_path, 'w', encoding='cp1252', newline='\r\n') as f:
+        f.write("OFXHEADER:100\nDATA:OFXSGML\nVERSION:102\nSECURITY:NONE\nENCODING:USASCII\n"
+                "CHARSET:1252\nCOMPRESSION:NONE\nOLDFILEUID:NONE\nNEWFILEUID:NONE\n\n")
+        f.write("<OFX>\n<CREDITCARDMSGSRSV1>\n<CCSTMTTRNRS>\n<CCSTMTRS>\n<BANKTRANLIST>\n")
+        for i in range(count):
+            amount = rng.uniform(1, 900) * (-1 if rng.random() < 0.9 else 1)
+            f.write("<STMTTRN>\n"
+                    "<TRNTYPE>DEBIT</TRNTYPE>\n"
+                    f"<DTPOSTED>2025{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}120000[-3:BRT]</DTPOSTED>\n"
+                    f"<TRNAMT>{amount:.2f}</TRNAMT>\n"
+                    f"<FITID>{i}</FITID>\n"
+                    f"<MEMO>{rng.choice(MERCHANTS)} {rng.randint(1, 12):02d}/12 {rng.choice(CITIES)}</MEMO>\n"
+                    "</STMTTRN>\n")
+        f.write("</BANKTRANLIST>\n</CCSTMTRS>\n</CCSTMTTRNRS>\n</CREDITCARDMSGSRSV1>\n</OFX>\n")
+
+
+def _value(rng: random.Random) -> str:
+    value = f"{rng.uniform(5, 2500):.2f}".replace('.', ',')
+    integer, cents = value.split(',')
+    if len(integer) > 3:
+        integer = f"{integer[:-3]}.{integer[-3:]}"
+    return f"{integer},{cents}"
+
+
+def statement_lines(bank: str, count: int, seed: int = 42) -> List[str]:
+    """
+    Linhas de texto de um extrato do banco, com cabeçalho, ruído de resumo
+    e count transações.
+    """
+    rng = random.Random(seed)
+    lines = [f"Fatura do cartão {bank}", "Vencimento 10/09/2025", "Resumo da fatura",
+             f"Saldo anterior {_value(rng)}", f"Pagamento efetuado -{_value(rng)}"]
+    if bank == "Caixa":
+        lines += ["COMPRAS (Cartão 1234)", "Data Descrição Cidade/País Valor Crédito/Débito"]
+
+    for i in range(count):
+        day, month = rng.randint(1, 28), rng.randint(1, 12)
+        merchant = rng.choice(PDF_MERCHANTS)
+        city = rng.choice(CITIES)
+        value = _value(rng)
+        if bank == "Santander":
+            suffix = f" {rng.randint(1, 12):02d}/12" if rng.random() < 0.2 else ""
+            lines.append(f"{day:02d}/{month:02d} {merchant}{suffix} R$ {value}")
+        elif bank == "Itaú":
+            lines.append(f"{day:02d}/{month:02d} {merchant} R${value}")
+        elif bank == "Banco do Brasil":
+            lines.append(f"{day:02d}/{month:02d} {merchant} {city} {value}")
+        elif bank == "Caixa":
+            lines.append(f"{day:02d}/{month:02d} {merchant} {city} {value} D")
+        else:
+            raise ValueError(f"Banco sem gerador de PDF: {bank}")
+        if i % 40 == 39:
+            lines.append(f"Total parcial {_value(rng)}")
+
+    if bank == "Caixa":
+        lines += ["Total COMPRAS", "Total final"]
+    lines += ["Limite disponível R$ 10.000,00", "Central de atendimento 4004 0000"]
+    return lines
+
+
+def _statement_document(lines: List[str]):
+    import fitz  # PyMuPDF; importado aqui para os geradores de OFX não dependerem dele
+
+    document = fitz.open()
+    for start in range(0, len(lines), LINES_PER_PAGE):
+        page = document.new_page()
+        y = 40
+        for line in lines[start:start + LINES_PER_PAGE]:
+            page.insert_text((36, y), line, fontsize=9)
+            y += 13
+    return document
+
+
+def write_statement_pdf(file_path: str, bank: str, count: int, seed: int = 42,
+                        marketing_pages: int = 0) -> int:
+    """
+    Gera um PDF com camada de texto no formato do banco. Retorna o número
+    de páginas. marketing_pages acrescenta páginas finais sem transações.
+    """
+    lines = statement_lines(bank, count, seed) + ["Confira nossas ofertas."] * (marketing_pages * LINES_PER_PAGE)
+    with _statement_document(lines) as document:
+        pages = len(document)
+        document.save(file_path)
+    return pages
+
+
+def write_scanned_statement_pdf(file_path: str, bank: str, count: int, seed: int = 42, dpi: int = 200) -> int:
+    """
+    Gera a fatura de write_statement_pdf como PDF escaneado: cada página é
+    uma imagem em tons de cinza, sem camada de texto. Retorna o número de páginas.
+    """
+    import fitz  # PyMuPDF
+
+    with _statement_document(statement_lines(bank, count, seed)) as source, fitz.open() as document:
+        for page in source:
+            pix = page.get_pixmap(matrix=fitz.Matrix(dpi / 72, dpi / 72), colorspace=fitz.csGRAY, alpha=False)
+            scanned = document.new_page(width=page.rect.width, height=page.rect.height)
+            scanned.insert_image(scanned.rect, pixmap=pix)
+        pages = len(document)
+        document.save(file_path)
+    return pages
+
+
+def supplier_catalog(count: int, seed: int = 42) -> List[Dict]:
+    """
+    Fornecedores no formato de ListarClientes, incluindo nomes parecidos com
+    as descrições geradas para os extratos.
+    """
+    rng = random.Random(seed)
+    words = ['COMERCIO', 'DISTRIBUIDORA', 'SERVICOS', 'ALIMENTOS', 'TRANSPORTES', 'INDUSTRIA',
+             'PAPELARIA', 'CONSTRUTORA', 'FARMACIA', 'MERCADO', 'POSTO', 'RESTAURANTE']
+    suffixes = ['LTDA', 'ME', 'EIRELI', 'S/A', '']
+    suppliers = []
+    for i in range(count):
+        if i < len(MERCHANTS):
+            fantasia = MERCHANTS[i].replace('*', ' ').title()
+        else:
+            fantasia = f"{rng.choice(words).title()} {rng.choice(words).title()} {i}"
+        suppliers.append({
+            'codigo_cliente_omie': 1000 + i,
+            'nome_fantasia': fantasia if rng.random() < 0.9 else "",
+            'razao_social': f"{fantasia.upper()} {rng.choice(suffixes)}".strip(),
+        })
+    return suppliers
+
+
+def category_catalog(count: int = 60) -> List[Dict]:
+    """
+    Categorias no formato de ListarCategorias.
+    """
+    return [{'codigo': f"2.01.{i:02d}", 'descricao': f"Despesa Categoria {i}"} for i in range(count)] + \
+        [{'codigo': "2.99.99", 'descricao': "Cartão de Credito"}]
+
+
+def build_template(file_path: str, filled_rows: int = 0):
+    """
+    Modelo sintético: cabeçalho nas linhas 1-5 e filled_rows linhas já preenchidas.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    worksheet = workbook.active
+    for col, title in zip("CDEFJK", ["Fornecedor", "Categoria", "Conta Corrente", "Valor", "Registro", "Vencimento"]):
+        worksheet[f"{col}5"] = title
+    for row in range(6, 6 + filled_rows):
+        worksheet.cell(row, 3, f"Fornecedor {row}")
+        worksheet.cell(row, 6, 10.0)
+    workbook.save(file_path)
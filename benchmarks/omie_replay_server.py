@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Servidor HTTP local que imita a API da Omie repetindo respostas gravadas.
+
+As respostas ficam em uma pasta, uma por página, no formato gravado por
+OmieClient(record_dir=...): geral_clientes_ListarClientes_p1.json etc.
+Páginas sem arquivo respondem como a Omie ("Não existem registros").
+Opcionalmente simula latência e o limite de requisições por app_key
+(HTTP 429), para exercitar o limitador e as novas tentativas do cliente.
+
+Uso:
+    python benchmarks/omie_replay_server.py pasta_respostas --porta 8765 --latencia 0.2 --limite 4
+    OMIE_BASE_URL=http://127.0.0.1:8765/api/v1/ python cli.py ...
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from collections import defaultdict, deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    responses_dir = "."
+    latency = 0.0
+    rate_limit = 0  # requisições por segundo por app_key; 0 = sem limite
+    _history = defaultdict(deque)
+    _history_lock = threading.Lock()
+    request_count = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, data: dict):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if status == 429:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _over_limit(self, app_key: str) -> bool:
+        if not self.rate_limit:
+            return False
+        now = time.monotonic()
+        with self._history_lock:
+            history = self._history[app_key]
+            while history and now - history[0] > 1.0:
+                history.popleft()
+            if len(history) >= self.rate_limit:
+                return True
+            history.append(now)
+            return False
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        type(self).request_count += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self._over_limit(request.get("app_key", "")):
+            self._send(429, {"faultstring": "Limite de requisições excedido", "faultcode": "SOAP-ENV:Client-429"})
+            return
+
+        endpoint = self.path.split("/api/v1/", 1)[-1].strip("/").replace("/", "_")
+        page = (request.get("param") or [{}])[0].get("pagina", 1)
+        file_path = os.path.join(self.responses_dir, f"{endpoint}_{request.get('call')}_p{page}.json")
+        if not os.path.exists(file_path):
+            self._send(500, {"faultstring": f"ERROR: Não existem registros para a página [{page}]!",
+                             "faultcode": "SOAP-ENV:Client-5113"})
+            return
+        with open(file_path, encoding="utf-8") as f:
+            self._send(200, json.load(f))
+
+
+def start_server(responses_dir: str, port: int = 0, latency: float = 0.0, rate_limit: int = 0):
+    """
+    Sobe o servidor em uma thread e devolve (servidor, URL base da API).
+    Com port=0 o sistema escolhe uma porta livre.
+    """
+    handler = type("Handler", (ReplayHandler,), {
+        "responses_dir": responses_dir, "latency": latency, "rate_limit": rate_limit,
+        "_history": defaultdict(deque), "request_count": 0,
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/api/v1/"
+
+
+def write_synthetic_responses(responses_dir: str, suppliers: list, categories: list, page_size: int = 500):
+    """
+    Grava respostas paginadas de ListarClientes e ListarCategorias a partir de listas prontas.
+    """
+    os.makedirs(responses_dir, exist_ok=True)
+    for records, prefix, key in [(suppliers, "geral_clientes_ListarClientes", "clientes_cadastro"),
+                                 (categories, "geral_categorias_ListarCategorias", "categoria_cadastro")]:
+        total_pages = max(1, -(-len(records) // page_size))
+        for page in range(1, total_pages + 1):
+            chunk = records[(page - 1) * page_size:page * page_size]
+            data = {"pagina": page, "total_de_paginas": total_pages, "registros": len(chunk),
+                    "total_de_registros": len(records), key: chunk}
+            with open(os.path.join(responses_dir, f"{prefix}_p{page}.json"), "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Repete respostas gravadas da API da Omie.")
+    parser.add_argument("pasta", help="pasta com as respostas gravadas")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--latencia", type=float, default=0.0, help="segundos de espera por requisição")
+    parser.add_argument("--limite", type=int, default=0, help="requisições por segundo por app_key")
+    args = parser.parse_args()
+    server, url = start_server(args.pasta, args.porta, args.latencia, args.limite)
+    print(f"Servidor em {url} (Ctrl+C para sair)", file=sys.stderr)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
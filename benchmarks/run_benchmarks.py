@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Executa o pipeline por etapas sobre dados sintéticos e mede cada uma.
+
+Etapas: inicialização da interface (importação de main.py em um processo
+novo), leitura do OFX (Sicoob), extração de texto dos PDFs, parser de cada
+banco, extração e parser em fluxo (páginas lidas só até o fim do extrato),
+conciliação de fornecedores, busca dos cadastros na Omie (servidor local de
+respostas, opcional) e gravação da planilha. Para cada etapa são
+medidos o tempo (melhor de N repetições) e o pico de memória alocada
+(tracemalloc, em uma execução separada para não distorcer o tempo).
+
+O resultado é gravado em JSON em benchmarks/resultados/, com data, commit,
+versão do Python e parâmetros, para comparar execuções ao longo do tempo:
+
+    python benchmarks/run_benchmarks.py --transacoes 2000 --fornecedores 5000
+    python benchmarks/run_benchmarks.py --comparar benchmarks/resultados/anterior.json
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import contextlib
+import subprocess
+import tracemalloc
+from datetime import datetime
+from typing import List, Dict, Callable, Optional, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+from generators import (write_synthetic_ofx, write_statement_pdf, supplier_catalog,  # noqa: E402
+                        category_catalog, build_template, SUPPORTED_PDF_BANKS)
+
+RESULTS_DIR = os.path.join(BENCH_DIR, "resultados")
+
+
+def measure(func: Callable[[], object], repeat: int) -> Tuple[object, float, int]:
+    """
+    Executa func repeat vezes e devolve (resultado, melhor tempo em segundos,
+    pico de memória em bytes). A memória é medida em uma execução à parte.
+    """
+    best = float('inf')
+    result = None
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, best, peak
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class BenchmarkRun:
+    """
+    Acumula os resultados das etapas e imprime uma linha por etapa.
+    """
+    def __init__(self, repeat: int):
+        self.repeat = repeat
+        self.stages: List[Dict] = []
+
+    def stage(self, name: str, func: Callable[[], object], items: Optional[Callable[[object], int]] = None,
+              bank: str = "") -> object:
+        # Os métodos do processador imprimem o andamento; aqui só interessa a medição
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            result, seconds, peak = measure(func, self.repeat)
+        count = items(result) if items else len(result)
+        self.stages.append({
+            "etapa": name,
+            "banco": bank,
+            "itens": count,
+            "segundos": round(seconds, 6),
+            "itens_por_segundo": round(count / seconds, 1) if seconds > 0 else None,
+            "pico_memoria_mb": round(peak / 1024 / 1024, 2),
+        })
+        label = f"{name} ({bank})" if bank else name
+        print(f"{label:<32} {seconds:9.3f} s  {count:>8} itens  pico {peak / 1024 / 1024:8.1f} MB")
+        return result
+
+
+def run(args) -> Dict:
+    from processor import ExtractProcessor
+    from supplier_index import SupplierIndex
+    from excel_writer import write_transactions
+
+    bench = BenchmarkRun(args.repeticoes)
+    with tempfile.TemporaryDirectory() as tmp:
+        # O processador cria cache/ e dados/ no diretório atual
+        os.chdir(tmp)
+        processor = ExtractProcessor()
+        processor.text_cache = None
+        processor.ocr_workers = 1
+
+        # Interpretador novo a cada repetição: mede a abertura do programa, não o cache de importação
+        bench.stage("inicializacao", lambda: subprocess.run([sys.executable, "-c", "import main"], cwd=REPO_DIR,
+                                                            check=True, capture_output=True),
+                    items=lambda _: 1)
+        ofx_path = os.path.join(tmp, "extrato.ofx")
+        write_synthetic_ofx(ofx_path, args.transacoes_ofx, args.semente)
+        transactions = bench.stage("ofx", lambda: processor._process_ofx(ofx_path), bank="Sicoob")
+
+        for bank in args.bancos:
+            pdf_path = os.path.join(tmp, f"extrato_{bank}.pdf")
+            pages = write_statement_pdf(pdf_path, bank, args.transacoes, args.semente, args.paginas_extras)
+            texts = bench.stage("pdf_texto", lambda: list(processor._iter_pdf_text(pdf_path)),
+                                items=lambda _: pages, bank=bank)
+            bench.stage("parser", lambda: processor._parse_pdf_pages(bank, texts), bank=bank)
+            # Extração e parser juntos, com as páginas consumidas em fluxo (para no fim do extrato)
+            bench.stage("pdf_fluxo", lambda: processor._process_pdf(pdf_path, bank), bank=bank)
+
+        suppliers = supplier_catalog(args.fornecedores, args.semente)
+        index = bench.stage("indice_fornecedores", lambda: SupplierIndex(suppliers), items=lambda i: len(i))
+        descriptions = [t.description for t in transactions]
+        bench.stage("conciliacao", lambda: [index.best_match(d) for d in descriptions])
+
+        if args.omie:
+            from omie_client import fetch_catalogs
+            from omie_replay_server import start_server, write_synthetic_responses
+
+            responses_dir = os.path.join(tmp, "respostas_omie")
+            write_synthetic_responses(responses_dir, suppliers, category_catalog())
+            server, url = start_server(responses_dir, latency=args.latencia_omie)
+            try:
+                bench.stage("omie", lambda: fetch_catalogs("benchmark", "segredo", base_url=url),
+                            items=lambda catalogs: sum(len(c) for c in catalogs))
+            finally:
+                server.shutdown()
+
+        template = os.path.join(tmp, "modelo.xlsx")
+        build_template(template, args.linhas_modelo)
+        output = os.path.join(tmp, "saida.xlsx")
+        bench.stage("planilha", lambda: write_transactions(template, output, transactions, "Conta", "10/09/2025"),
+                    items=lambda _: len(transactions))
+        os.chdir(REPO_DIR)
+
+    return {
+        "data": datetime.now().isoformat(timespec='seconds'),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "parametros": {k: v for k, v in vars(args).items() if k not in ("saida", "comparar")},
+        "etapas": bench.stages,
+    }
+
+
+def compare(current: Dict, previous_path: str):
+    """
+    Imprime a variação de tempo e memória de cada etapa em relação a uma execução anterior.
+    """
+    with open(previous_path, 'r', encoding='utf-8') as f:
+        previous = json.load(f)
+    before = {(s["etapa"], s["banco"]): s for s in previous.get("etapas", [])}
+    print(f"\nComparação com {os.path.basename(previous_path)} (commit {previous.get('commit')}):")
+    for stage in current["etapas"]:
+        old = before.get((stage["etapa"], stage["banco"]))
+        if not old:
+            continue
+        label = f"{stage['etapa']} ({stage['banco']})" if stage["banco"] else stage["etapa"]
+        speedup = old["segundos"] / stage["segundos"] if stage["segundos"] else float('inf')
+        print(f"{label:<32} {old['segundos']:9.3f} s -> {stage['segundos']:9.3f} s  ({speedup:4.2f}x)  "
+              f"memória {old['pico_memoria_mb']:.1f} -> {stage['pico_memoria_mb']:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline por etapas, com dados sintéticos.")
+    parser.add_argument("--transacoes", type=int, default=1000, help="transações por PDF")
+    parser.add_argument("--transacoes-ofx", type=int, default=20000, help="transações no OFX")
+    parser.add_argument("--paginas-extras", type=int, default=2, help="páginas sem transações no fim de cada PDF")
+    parser.add_argument("--fornecedores", type=int, default=5000, help="tamanho do catálogo de fornecedores")
+    parser.add_argument("--linhas-modelo", type=int, default=500, help="linhas já preenchidas no modelo")
+    parser.add_argument("--bancos", nargs="+", default=SUPPORTED_PDF_BANKS, choices=SUPPORTED_PDF_BANKS)
+    parser.add_argument("--repeticoes", type=int, default=3, help="repetições por etapa (vale a melhor)")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--omie", action="store_true", help="inclui a busca na Omie via servidor local")
+    parser.add_argument("--latencia-omie", type=float, default=0.05, help="latência simulada por requisição")
+    parser.add_argument("--saida", help="arquivo JSON de resultado (padrão: benchmarks/resultados/<data>.json)")
+    parser.add_argument("--comparar", help="resultado anterior para comparação")
+    args = parser.parse_args()
+
+    result = run(args)
+
+    output = args.saida or os.path.join(RESULTS_DIR, datetime.now().strftime("%Y%m%d_%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"\nResultado gravado em {output}")
+
+    if args.comparar:
+        compare(result, args.comparar)
+
+
+if __name__ == "__main__":
+    main()
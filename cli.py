@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Execução pela linha de comando, sem interface gráfica.
+
+Processa um ou mais extratos de um cliente (extração, conciliação com a
+Omie e gravação da planilha) e escreve um resumo em JSON na saída padrão.
+As mensagens de andamento vão para a saída de erro. Não importa o tkinter,
+então pode rodar em servidor, agendado para o fechamento do mês.
+
+Exemplo:
+    python cli.py --cliente "Aurora Hotel" --banco Santander \\
+        --conta "Cartão Santander" --vencimento 10/09/2025 fatura1.pdf fatura2.pdf
+
+Sem --banco, o banco de cada arquivo é reconhecido pelo início do arquivo;
+pastas informadas no lugar de arquivos têm todos os extratos processados.
+
+Itens que não forem conciliados automaticamente vão para a planilha com a
+descrição do extrato, como quando a conciliação manual é fechada sem edição.
+Linhas com data inexistente não entram na planilha: são listadas na saída
+de erro e no resumo ("linhas_rejeitadas"), o extrato fica com status
+"incompleto" e o código de saída é 1.
+"""
+
+import os
+import sys
+import json
+import argparse
+import threading
+import contextlib
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict
+
+try:
+    from processor import ExtractProcessor, AUTO_DETECT
+    from pdf_extraction import default_ocr_workers, TEXT_ENGINES
+    from bank_detection import statement_files
+    from transaction_ledger import without_duplicates
+    from omie_cache import OmieCatalogCache
+except ImportError as e:
+    print(json.dumps({"status": "erro", "mensagem": f"Biblioteca necessária não encontrada: {e}"},
+                     ensure_ascii=False))
+    sys.exit(2)
+
+SUPPORTED_BANKS = ["Sicoob", "Banco do Brasil", "Caixa", "Itaú", "Santander"]
+
+
+def _due_date(value: str) -> str:
+    try:
+        datetime.strptime(value, "%d/%m/%Y")
+    except ValueError:
+        raise argparse.ArgumentTypeError("use o formato DD/MM/AAAA")
+    return value
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Processa extratos de cartão e gera a planilha de contas a pagar da Omie."
+    )
+    parser.add_argument("arquivos", nargs="+", help="arquivos de extrato (.ofx ou .pdf) ou pastas com extratos")
+    parser.add_argument("--cliente", required=True, help="nome do cliente (como em credenciais/)")
+    parser.add_argument("--banco", default="auto", choices=["auto"] + SUPPORTED_BANKS,
+                        help="banco dos extratos (padrão: reconhecido em cada arquivo)")
+    parser.add_argument("--conta", required=True, help="conta corrente (coluna E)")
+    parser.add_argument("--vencimento", required=True, type=_due_date, help="data de vencimento DD/MM/AAAA")
+    parser.add_argument("--processos", type=int, default=min(4, os.cpu_count() or 1),
+                        help="quantidade de extratos processados ao mesmo tempo")
+    parser.add_argument("--planilha-base", help="planilha modelo da Omie (padrão: a mesma da interface)")
+    parser.add_argument("--saida", help="pasta onde as planilhas geradas são salvas (padrão: Área de Trabalho)")
+    parser.add_argument("--forcar-atualizacao", action="store_true",
+                        help="baixa novamente os cadastros da Omie em vez de usar o cache")
+    parser.add_argument("--duplicadas", choices=["ignorar", "incluir", "erro"], default="ignorar",
+                        help="o que fazer com transações já exportadas antes (padrão: ignorar)")
+    parser.add_argument("--motor-texto", default="banco", choices=["banco"] + list(TEXT_ENGINES),
+                        help="leitura da camada de texto dos PDFs (padrão: a definida para cada banco)")
+    parser.add_argument("--perfil", action="store_true",
+                        help="grava perfis do cProfile e do tracemalloc junto com o log da execução")
+    return parser
+
+
+def process_file(file_path: str, args: argparse.Namespace, ocr_workers: int,
+                 save_lock: threading.Lock, catalog_cache: OmieCatalogCache) -> Dict:
+    """
+    Processa um extrato e devolve o resumo dele. catalog_cache é o cache
+    da Omie compartilhado pelos extratos do lote.
+    """
+    messages: List[Dict] = []
+    processor = ExtractProcessor()
+    processor.catalog_cache = catalog_cache
+    processor.ocr_workers = ocr_workers
+    if args.planilha_base:
+        processor.base_file = args.planilha_base
+    if args.saida:
+        processor.output_dir = args.saida
+    if args.motor_texto != "banco":
+        processor.text_engines["*"] = args.motor_texto
+    processor.notify = lambda level, title, message: messages.append(
+        {"nivel": level, "titulo": title, "mensagem": message}
+    )
+    if args.perfil:
+        processor.profile = True
+    trace = processor.start_trace(f"{args.cliente} - {args.banco} - {os.path.basename(file_path)}")
+    summary = {"arquivo": file_path, "status": "erro", "mensagens": messages}
+
+    try:
+        if not os.path.exists(file_path):
+            messages.append({"nivel": "error", "titulo": "Erro", "mensagem": "Arquivo não encontrado."})
+            return summary
+
+        # Os cadastros já foram baixados antes (ver main); aqui vêm do cache
+        bank = AUTO_DETECT if args.banco == "auto" else args.banco
+        transactions = processor._process_and_reconcile(bank, file_path, args.cliente)
+        summary["banco"] = processor.last_bank
+        if processor.rejected_rows:
+            # Linhas que não viraram transação: o lote termina com erro para que alguém as confira
+            summary["linhas_rejeitadas"] = [{"data": date_text, "descricao": description, "valor": value}
+                                            for date_text, description, value in processor.rejected_rows]
+            for date_text, description, value in processor.rejected_rows:
+                print(f"{os.path.basename(file_path)}: data inválida, linha não importada: "
+                      f"{date_text} {description} {value:.2f}", file=sys.stderr)
+        if not transactions:
+            summary["status"] = "sem_transacoes"
+            return summary
+
+        reconciled = sum(1 for t in transactions if t.supplier)
+        summary.update({
+            "transacoes": len(transactions),
+            "conciliadas": reconciled,
+            "pendentes": len(transactions) - reconciled,
+            "valor_total": sum(t.cents for t in transactions) / 100,
+            "paginas_ocr": processor.last_page_engines.count("tesseract"),
+        })
+
+        # Gravação em série: evita disputar o mesmo nome de arquivo e limita a memória.
+        # A verificação de duplicadas fica dentro do bloqueio para que extratos
+        # sobrepostos do mesmo lote também sejam detectados
+        with save_lock:
+            duplicates = processor.find_duplicates(args.cliente, args.conta, transactions)
+            summary["duplicadas"] = len(duplicates)
+            keys = None
+            if duplicates and args.duplicadas == "erro":
+                messages.append({"nivel": "error", "titulo": "Duplicadas",
+                                 "mensagem": f"{len(duplicates)} transação(ões) já exportada(s) antes."})
+                return summary
+            if duplicates and args.duplicadas == "ignorar":
+                transactions, keys = without_duplicates(transactions, duplicates)
+            summary["exportadas"] = len(transactions)
+            if not transactions:
+                summary["status"] = "ja_exportado"
+                return summary
+            result = processor.process_and_save(transactions, args.conta, args.vencimento, client=args.cliente,
+                                                keys=keys)
+        summary["planilha"] = processor.last_output_path
+        summary["status"] = "ok" if result.startswith("✅") else "erro"
+        if summary["status"] == "ok" and processor.rejected_rows:
+            summary["status"] = "incompleto"
+        if summary["status"] == "erro":
+            messages.append({"nivel": "error", "titulo": "Erro", "mensagem": result})
+    except Exception as e:
+        messages.append({"nivel": "error", "titulo": "Erro", "mensagem": str(e)})
+    finally:
+        summary["tempos"] = trace.summary()
+        summary["log"] = trace.finish(summary["status"])
+    return summary
+
+
+def expand_inputs(paths: List[str]) -> List[str]:
+    """
+    Troca cada pasta pelos extratos (.ofx e .pdf) que ela contém.
+    """
+    files = []
+    for path in paths:
+        files.extend(statement_files(path) if os.path.isdir(path) else [path])
+    return files
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    files = expand_inputs(args.arquivos)
+    report = {"cliente": args.cliente, "banco": args.banco, "arquivos": []}
+
+    with contextlib.redirect_stdout(sys.stderr):
+        # Baixa (ou valida o cache de) fornecedores e categorias uma única vez; o cache
+        # vencido é atualizado aqui mesmo, e os extratos usam a mesma instância do cache
+        warmup = ExtractProcessor()
+        credentials = warmup._load_credentials(args.cliente)
+        if not credentials or not all([credentials.get("app_key"), credentials.get("app_secret")]):
+            report["status"] = "erro"
+            report["mensagem"] = "Credenciais ausentes ou incompletas."
+        elif not files:
+            report["status"] = "erro"
+            report["mensagem"] = "Nenhum extrato (.ofx ou .pdf) encontrado."
+        else:
+            catalog_cache = warmup.catalog_cache
+            catalog_cache.load(args.cliente, credentials["app_key"], credentials["app_secret"],
+                               force_refresh=args.forcar_atualizacao, background_refresh=False)
+
+            workers = max(1, min(args.processos, len(files)))
+            ocr_workers = max(1, default_ocr_workers() // workers)
+            save_lock = threading.Lock()
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                report["arquivos"] = list(executor.map(
+                    lambda path: process_file(path, args, ocr_workers, save_lock, catalog_cache), files
+                ))
+            all_ok = all(item["status"] in ("ok", "ja_exportado") for item in report["arquivos"])
+            report["status"] = "ok" if all_ok else "erro"
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0 if report["status"] == "ok" else 1
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
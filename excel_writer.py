@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gravação das transações na planilha de contas a pagar da Omie.
+
+A planilha base (modelo) é aberta uma única vez e salva direto no arquivo de
+saída, sem copiar o modelo e reabri-lo. A primeira linha livre é encontrada
+em uma só varredura da coluna C e as linhas são gravadas por índice
+numérico, sem montar coordenadas como "C6".
+
+Valores e datas são gravados com o tipo certo: o valor como número exato
+(Decimal, a partir dos centavos) e as datas de registro e vencimento como
+datas do Excel no formato dd/mm/aaaa, e não como texto.
+"""
+
+import os
+from datetime import date
+from typing import List, Optional
+
+from lazy_imports import lazy_import
+from transaction_records import Transaction, parse_due_date
+
+openpyxl = lazy_import("openpyxl")
+
+# Inserção inicia na linha 6
+START_ROW = 6
+
+# Colunas (1 = A): C fornecedor, D categoria, E conta corrente,
+# F valor, J data de registro, K data de vencimento
+COL_SUPPLIER = 3
+COL_CATEGORY = 4
+COL_ACCOUNT = 5
+COL_VALUE = 6
+COL_REGISTER_DATE = 10
+COL_DUE_DATE = 11
+
+# Formato de exibição das células de data
+DATE_NUMBER_FORMAT = "DD/MM/YYYY"
+
+
+def first_empty_row(worksheet, column: int = COL_SUPPLIER, start_row: int = START_ROW) -> int:
+    """
+    Primeira linha, a partir de start_row, com a coluna indicada vazia.
+    """
+    row = start_row
+    for (value,) in worksheet.iter_rows(min_row=start_row, min_col=column, max_col=column, values_only=True):
+        if value is None:
+            return row
+        row += 1
+    return row
+
+
+def transaction_rows(transactions: List[Transaction], account: str, due_date):
+    """
+    Converte as transações em tuplas (fornecedor, categoria, conta, valor,
+    data de registro, data de vencimento), na ordem das colunas.
+    """
+    for transaction in transactions:
+        yield (
+            transaction.supplier or transaction.description,
+            transaction.category,
+            account,
+            transaction.amount,
+            transaction.date,
+            due_date,
+        )
+
+
+def write_transactions(template_path: str, output_path: str, transactions: List[Transaction],
+                       account: str, due_date: str, start_row: int = START_ROW,
+                       sheet_name: Optional[str] = None) -> int:
+    """
+    Abre o modelo, grava as transações a partir da primeira linha livre e
+    salva em output_path (o modelo não é alterado). due_date em dd/mm/aaaa
+    vira data; outro texto é gravado como foi informado. Retorna a linha
+    inicial.
+    """
+    workbook = openpyxl.load_workbook(template_path)
+    worksheet = workbook[sheet_name] if sheet_name else workbook.active
+
+    row = first_empty_row(worksheet, COL_SUPPLIER, start_row)
+    first_row = row
+    cell = worksheet.cell
+    due_date = parse_due_date(due_date)
+    due_is_date = isinstance(due_date, date)
+    for supplier, category, account_value, value, register_date, due in transaction_rows(transactions, account, due_date):
+        cell(row, COL_SUPPLIER, supplier)
+        cell(row, COL_CATEGORY, category)
+        cell(row, COL_ACCOUNT, account_value)
+        cell(row, COL_VALUE, value)
+        cell(row, COL_REGISTER_DATE, register_date).number_format = DATE_NUMBER_FORMAT
+        due_cell = cell(row, COL_DUE_DATE, due)
+        if due_is_date:
+            due_cell.number_format = DATE_NUMBER_FORMAT
+        row += 1
+
+    # Salva em arquivo temporário e renomeia: uma falha não deixa planilha pela metade
+    directory = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(directory, exist_ok=True)
+    temp_path = output_path + ".tmp"
+    try:
+        workbook.save(temp_path)
+        os.replace(temp_path, output_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return first_row
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Leitura vetorizada (pandas) da fatura da Caixa exportada em planilha.
+
+A planilha já chega como DataFrame (pd.read_excel), então datas, valores e
+descrições são convertidos coluna a coluna, com as mesmas regras do perfil
+da Caixa em bank_profiles, em vez de um laço Python por linha. Os extratos
+em PDF continuam com os laços compilados de bank_profiles, mais rápidos nas
+faturas reais e sem precisar importar o pandas.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Tuple, Optional
+
+from bank_profiles import CAIXA
+from lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+
+_amount = re.compile(r'^-?\d+(?:\.\d+)?$')
+
+
+def to_amounts(values: pd.Series) -> pd.Series:
+    """
+    Valores no formato brasileiro ("1.234,56") em float; inválidos viram NaN.
+    A conversão é a mesma de parse_value (float do Python), para o
+    resultado ser idêntico ao do parser por linha.
+    """
+    normalized = values.str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+    try:
+        return normalized.astype(float)
+    except (TypeError, ValueError):
+        pass
+    # Há valores inválidos: converte só os que têm o formato esperado
+    valid = normalized.str.contains(_amount, na=False)
+    amounts = pd.Series(float('nan'), index=values.index)
+    amounts[valid] = normalized[valid].astype(float)
+    return amounts
+
+
+def format_dates(dates: pd.Series, year: int) -> pd.Series:
+    """
+    Versão vetorizada de format_statement_date: "dd/mm" e "dd/mm/aa"
+    viram "dd/mm/aaaa"; datas já com o ano completo ficam como vieram.
+    """
+    parts = dates.str.replace(' ', '', regex=False).str.extract(r'^(\d{1,2})/(\d{1,2})(?:/(\d+))?$')
+    year_part = parts[2]
+    full_year = year_part.where(year_part.str.len() != 2, '20' + year_part).fillna(str(year))
+    formatted = parts[0].str.zfill(2) + '/' + parts[1].str.zfill(2) + '/' + full_year
+    unchanged = parts[0].isna() | (year_part.notna() & (year_part.str.len() != 2))
+    return formatted.where(~unchanged, dates)
+
+
+def clean_descriptions(profile: BankProfile, descriptions: pd.Series) -> pd.Series:
+    """
+    Regras de limpeza do perfil aplicadas à coluna inteira (ver BankProfile.clean).
+    """
+    for pattern, repl in profile.cleanup:
+        descriptions = descriptions.str.replace(pattern, repl, regex=True)
+    descriptions = descriptions.str.strip()
+    if profile.postprocess:
+        descriptions = descriptions.map(profile.postprocess)
+    return descriptions
+
+
+def _column(names: pd.Series, *prefixes: str, exclude: Tuple[str, ...] = ()) -> Optional[int]:
+    for prefix in prefixes:
+        for column, name in names.items():
+            if name.startswith(prefix) and not any(word in name for word in exclude):
+                return column
+    return None
+
+
+def parse_caixa_excel(sheet: pd.DataFrame, default_year: int) -> pd.DataFrame:
+    """
+    Transações (colunas data, fornecedor, valor) da fatura da Caixa
+    exportada em planilha, lida com header=None. O cabeçalho é a primeira
+    linha com as colunas "Data" e "Descrição"; ficam só os débitos (coluna
+    Crédito/Débito igual a "D" ou, sem ela, valores positivos).
+    """
+    text = sheet.astype(str).apply(lambda column: column.str.strip().str.lower())
+    is_header = text.eq('data').any(axis=1) & text.apply(lambda column: column.str.startswith('descri')).any(axis=1)
+    if not is_header.any():
+        raise ValueError("Cabeçalho com as colunas Data e Descrição não encontrado na planilha.")
+    header = is_header.idxmax()
+    names = text.loc[header]
+    date_col = _column(names, 'data')
+    description_col = _column(names, 'descri')
+    value_col = _column(names, 'valor r$', 'valor', exclude=('u$', 'us$', 'original', 'dólar', 'dolar'))
+    sign_col = _column(names, 'crédito/débito', 'credito/debito', 'débito/crédito', 'debito/credito', 'd/c')
+    if value_col is None:
+        raise ValueError("Coluna de valor não encontrada na planilha.")
+
+    body = sheet.loc[sheet.index > header]
+    raw_dates = body[date_col]
+    date_text = raw_dates.astype(str).str.strip()
+    dates = format_dates(date_text.where(date_text.str.contains(r'^\d{1,2}/\d{1,2}', na=False)), default_year)
+    # Datas gravadas como data do Excel (não como texto)
+    stamps = pd.to_datetime(raw_dates.where(dates.isna()), errors='coerce')
+    dates = dates.fillna(stamps.dt.strftime('%d/%m/%Y'))
+
+    raw_values = body[value_col]
+    values = pd.to_numeric(raw_values, errors='coerce')
+    text_values = raw_values.astype(str).str.replace(r'[R$\s]', '', regex=True)
+    values = values.fillna(to_amounts(text_values))
+
+    if sign_col is not None:
+        debit = body[sign_col].astype(str).str.strip().str.upper().str.startswith('D')
+        values = values.abs().where(debit)
+    else:
+        values = values.where(values > 0)
+
+    descriptions = body[description_col].astype(str).str.strip()
+    descriptions = descriptions.where(~descriptions.str.contains(CAIXA.keyword_sets['section_end']))
+    frame = pd.DataFrame({'data': dates, 'fornecedor': descriptions, 'valor': values}).dropna()
+    frame = frame[(frame['fornecedor'] != "") & (frame['fornecedor'].str.lower() != "nan")]
+    frame = frame.assign(fornecedor=clean_descriptions(CAIXA, frame['fornecedor']))
+    return frame[frame['fornecedor'] != ""]
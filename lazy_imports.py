@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Importação sob demanda das bibliotecas pesadas.
+
+pandas, openpyxl, pdfplumber, requests, fuzzywuzzy, pytesseract, Pillow e
+PyMuPDF levam, juntas, alguns segundos para importar, e cada uma só é usada
+por algumas etapas (planilhas, PDFs, OCR, API da Omie, conciliação). Os
+módulos do programa as declaram com lazy_import; a biblioteca só é
+importada no primeiro acesso a um de seus atributos, pela etapa que precisa
+dela, e a janela abre sem esperar por nenhuma.
+
+Se a biblioteca não estiver instalada, o primeiro acesso levanta
+MissingDependency, com o pacote a instalar e a etapa que o usa. Para avisar
+logo ao abrir o programa, missing_dependencies confere quais estão
+instaladas sem importá-las.
+"""
+
+import importlib
+import importlib.util
+import threading
+from types import ModuleType
+from typing import Dict, List, Optional, Tuple
+
+# Módulo: (pacote do pip, etapa que o usa)
+DEPENDENCIES: Dict[str, Tuple[str, str]] = {
+    "pandas": ("pandas", "leitura de planilhas e dos extratos"),
+    "openpyxl": ("openpyxl", "gravação da planilha"),
+    "pdfplumber": ("pdfplumber", "camada de texto dos PDFs"),
+    "requests": ("requests", "API da Omie"),
+    "fuzzywuzzy": ("fuzzywuzzy", "conciliação de fornecedores"),
+    "pytesseract": ("pytesseract", "OCR de PDFs escaneados"),
+    "PIL": ("pillow", "OCR de PDFs escaneados"),
+    "fitz": ("PyMuPDF", "leitura dos PDFs"),
+}
+
+TESSERACT_URL = "https://github.com/tesseract-ocr/tesseract"
+
+
+def install_command(packages: Optional[List[str]] = None) -> str:
+    """
+    Comando do pip para instalar os pacotes (padrão: todas as dependências).
+    """
+    if packages is None:
+        packages = [package for package, _ in DEPENDENCIES.values()]
+    return "pip install " + " ".join(packages)
+
+
+class MissingDependency(ImportError):
+    """
+    Biblioteca necessária não instalada, com o comando para instalá-la.
+    """
+    def __init__(self, module_name: str, cause: Optional[BaseException] = None):
+        package, usage = DEPENDENCIES.get(module_name.split('.')[0], (module_name.split('.')[0], ""))
+        self.package = package
+        message = f"Biblioteca necessária não encontrada: {package}"
+        if usage:
+            message += f" ({usage})"
+        message += f". Instale com: {install_command([package])}"
+        if cause is not None and str(cause):
+            message += f" [{cause}]"
+        super().__init__(message, name=module_name)
+
+
+class LazyModule:
+    """
+    Representa um módulo que só é importado no primeiro acesso a um atributo.
+    """
+    def __init__(self, name: str):
+        self._name = name
+        self._module: Optional[ModuleType] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    try:
+                        self._module = importlib.import_module(self._name)
+                    except ImportError as e:
+                        raise MissingDependency(self._name, e) from e
+        return self._module
+
+    def __getattr__(self, attribute: str):
+        return getattr(self._load(), attribute)
+
+    def __repr__(self) -> str:
+        state = "importado" if self._module is not None else "não importado"
+        return f"<módulo sob demanda {self._name} ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """
+    Declara o módulo (ex: "pandas", "PIL.Image") para importação sob demanda.
+    """
+    return LazyModule(name)
+
+
+def missing_dependencies() -> List[str]:
+    """
+    Pacotes do pip das dependências não instaladas. Só procura os módulos
+    (importlib.util.find_spec), sem importá-los.
+    """
+    return [package for module_name, (package, _) in DEPENDENCIES.items()
+            if importlib.util.find_spec(module_name) is None]
@@ -17,647 +17,47 @@ Inserção inicia na linha 6.
 """
 
 import os
-import re
 import sys
-import shutil
-import json
 import html
+import queue
+import threading
+import multiprocessing
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from datetime import datetime
 from typing import List, Dict, Tuple, Optional
-import xml.etree.ElementTree as ET
-
-try:
-    import pandas as pd
-    from openpyxl import load_workbook
-    from openpyxl.styles import PatternFill, Font, Border, Side, Alignment
-    import PyPDF2
-    import pdfplumber
-    import requests
-    from fuzzywuzzy import fuzz
-    from omie_api import get_clientes_as_fornecedores, get_categorias
-    import pytesseract
-    from PIL import Image
-    import fitz  # PyMuPDF
-except ImportError as e:
+
+# As bibliotecas pesadas (pandas, openpyxl, pdfplumber, requests, fuzzywuzzy,
+# pytesseract, Pillow e PyMuPDF) são importadas sob demanda, pela etapa que as
+# usa (ver lazy_imports); aqui só se confere se estão instaladas
+from lazy_imports import missing_dependencies, install_command, TESSERACT_URL
+from omie_cache import format_age
+from reconciliation_memory import ReconciliationMemory
+from search_index import NameSearchIndex
+from supplier_index import SupplierIndex
+from processor import ExtractProcessor, ProcessingCancelled, AUTO_DETECT
+from bank_detection import detect_bank
+from transaction_records import Transaction, DEFAULT_CATEGORY
+from transaction_ledger import without_duplicates
+
+_missing = missing_dependencies()
+if _missing:
     messagebox.showerror(
         "Erro",
-        f"Erro: Biblioteca necessária não encontrada: {e}\n\n"
+        f"Erro: Biblioteca necessária não encontrada: {', '.join(_missing)}\n\n"
         "Instale as dependências com:\n"
-        "pip install pandas openpyxl PyPDF2 pdfplumber requests fuzzywuzzy pytesseract pillow PyMuPDF\n\n"
-        "Também instale o Tesseract OCR: https://github.com/tesseract-ocr/tesseract"
+        f"{install_command(_missing)}\n\n"
+        f"Também instale o Tesseract OCR: {TESSERACT_URL}"
     )
     sys.exit(1)
 
-class ExtractProcessor:
-    """
-    Classe principal para processar extratos de cartão de crédito
-    e conciliar com a Omie.
-    """
-    def __init__(self):
-        self.supported_banks = ["Sicoob", "Banco do Brasil", "Caixa", "Itaú", "Santander"]
-        self.file_formats = {
-            "Sicoob": "OFX",
-            "Banco do Brasil": "PDF",
-            "Caixa": "PDF",
-            "Itaú": "PDF",
-            "Santander": "PDF"  # Alterado de OFX para PDF
-        }
-        self.omie_suppliers = []
-        self.omie_categories = []
-
-    def _load_credentials(self, client_name: str) -> Optional[Dict]:
-        file_path = f"credenciais/{client_name.replace(' ', '_').lower()}.json"
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            messagebox.showerror("Erro de Credenciais", f"Arquivo de credenciais para '{client_name}' não encontrado.")
-            return None
-        except json.JSONDecodeError:
-            messagebox.showerror("Erro de Credenciais", "Arquivo de credenciais inválido.")
-            return None
-    
-    def _process_and_reconcile(self, bank: str, extract_file: str, client: str) -> Optional[List[Dict]]:
-        transactions = self._process_extract(extract_file, self.file_formats[bank], bank)
-        
-        if not transactions:
-            messagebox.showinfo("Aviso", "Nenhuma transação encontrada no extrato.")
-            return None
-
-        credentials = self._load_credentials(client)
-        if not credentials:
-            return None
-        
-        app_key = credentials.get("app_key")
-        app_secret = credentials.get("app_secret")
-        
-        if not all([app_key, app_secret]):
-            messagebox.showerror("Erro", "Credenciais de API incompletas.")
-            return None
-
-        self.omie_suppliers = get_clientes_as_fornecedores(app_key, app_secret)
-        self.omie_categories = get_categorias(app_key, app_secret)
-
-        if not self.omie_suppliers:
-            messagebox.showinfo("Aviso", "Nenhum fornecedor encontrado na Omie para este cliente.")
-            return transactions
-        
-        for transaction in transactions:
-            description = transaction['fornecedor']
-            best_match = None
-            highest_score = 0
-            
-            for supplier in self.omie_suppliers:
-                omie_name = supplier.get('nome_fantasia') or supplier.get('razao_social')
-                if omie_name:
-                    score = fuzz.ratio(description.lower(), omie_name.lower())
-                    if score > highest_score:
-                        highest_score = score
-                        best_match = omie_name
-
-            if highest_score > 80:
-                transaction['fornecedor_omie'] = best_match
-            else:
-                transaction['fornecedor_omie'] = ""
-                
-        return transactions
-
-    def process_and_save(self, transactions: List[Dict], account: str, due_date: str) -> str:
-        """
-        Processa e salva os dados na planilha final.
-        """
-        # NOVO CAMINHO: A linha abaixo foi alterada para o novo local da planilha
-        base_file = "C:\\Bitrix24\\Aurora Hotel\\Automação\\Omie_Contas_Pagar_v1_1_5.xlsx"
-        
-        if not os.path.exists(base_file):
-            return f"ERRO: Arquivo base '{base_file}' não encontrado!"
-
-        new_file_path = self._create_new_excel_file(base_file)
-        if new_file_path:
-            self._insert_into_excel(new_file_path, transactions, account, due_date)
-            return f"✅ Processamento concluído! {len(transactions)} transações inseridas.\n\nArquivo atualizado: {new_file_path}"
-        else:
-            return "Erro ao criar a nova planilha."
-
-    def _create_new_excel_file(self, base_file: str) -> str:
-        try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            new_file_name = f"Omie_Contas_Pagar_Atualizada_{timestamp}.xlsx"
-            desktop_path = os.path.join(os.path.expanduser('~'), 'Desktop')
-            new_file_path = os.path.join(desktop_path, new_file_name)
-            shutil.copy2(base_file, new_file_path)
-            return new_file_path
-        except Exception as e:
-            print(f"Erro ao criar nova planilha: {e}")
-            return ""
-
-    def _process_extract(self, file_path: str, file_format: str, bank: str) -> List[Dict]:
-        if file_format == "OFX":
-            return self._process_ofx(file_path)
-        elif file_format == "PDF":
-            return self._process_pdf(file_path, bank)
-        elif file_format == "Excel":
-            return self._process_excel(file_path, bank)
-        else:
-            messagebox.showerror("Erro", f"Formato {file_format} não implementado ainda.")
-            return []
-    
-    def _process_ofx(self, file_path: str) -> List[Dict]:
-        transactions = []
-        try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                content = file.read()
-        except UnicodeDecodeError:
-            with open(file_path, 'r', encoding='latin-1') as file:
-                content = file.read()
-
-        transaction_pattern = r'<STMTTRN>(.*?)</STMTTRN>'
-        matches = re.findall(transaction_pattern, content, re.DOTALL)
-
-        print(f"Total de transações encontradas no arquivo: {len(matches)}")
-
-        for match in matches:
-            trntype_match = re.search(r'<TRNTYPE>(.*?)</TRNTYPE>', match)
-            date_match = re.search(r'<DTPOSTED>(\d{8}).*?</DTPOSTED>', match)
-            amount_match = re.search(r'<TRNAMT>(-?\d+\.?\d*)', match)
-            memo_match = re.search(r'<MEMO>(.*?)</MEMO>', match)
-
-            if all([trntype_match, date_match, amount_match, memo_match]):
-                amount = float(amount_match.group(1).strip())
-                
-                if amount < 0:
-                    amount = abs(amount)
-                    ofx_date = date_match.group(1).strip()
-                    parsed_date = self._parse_ofx_date(ofx_date)
-                    memo = memo_match.group(1).strip()
-                    fornecedor = self._clean_sicoob_description(memo)
-                    
-                    transactions.append({
-                        'fornecedor': fornecedor,
-                        'categoria': 'Cartão de Credito',
-                        'valor': amount,
-                        'data_registro': parsed_date
-                    })
-                else:
-                    print(f"Ignorando transação com valor positivo: {memo_match.group(1).strip()}")
-
-        return transactions
-
-    def _parse_ofx_date(self, ofx_date: str) -> str:
-        date_part = ofx_date[:8]
-        try:
-            dt = datetime.strptime(date_part, "%Y%m%d")
-            return dt.strftime("%d/%m/%Y")
-        except ValueError:
-            return "01/01/2025"
-
-    def _clean_description(self, description: str) -> str:
-        cleaned = re.sub(r'\s+', ' ', description)
-        cleaned = cleaned.strip()
-        if len(cleaned) > 50:
-            cleaned = cleaned[:50] + "..."
-        return cleaned
-
-    def _clean_sicoob_description(self, description: str) -> str:
-        cleaned = re.sub(r'\s+\d{2}/\d{2}\s+', ' ', description)
-        cities = ['RIBEIRAO PRET', 'RIBEIRAO PRE', 'SAO PAULO', 'OSASCO', 'HORTOLANDIA', 
-                  'BELO HORIZON', 'SAN FRANCISCO', 'ARIBEIRAO PRE']
-        for city in cities:
-            cleaned = re.sub(rf'\s*{re.escape(city)}.*$', '', cleaned, flags=re.IGNORECASE)
-        cleaned = re.sub(r'\s+', ' ', cleaned)
-        cleaned = re.sub(r'\s*-?\s*US\$.*$', '', cleaned)
-        return cleaned.strip()
-
-    def _extract_text_with_ocr(self, file_path: str) -> str:
-        """
-        Extrai texto de PDF usando OCR quando necessário.
-        """
-        text = ""
-        try:
-            # Tenta primeiro com pdfplumber (para PDFs com texto)
-            with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-            
-            # Se não conseguiu extrair texto suficiente, tenta OCR
-            if len(text.strip()) < 100:
-                print("PDF parece ser uma imagem. Aplicando OCR...")
-                
-                # Usa PyMuPDF para converter páginas em imagens
-                pdf_document = fitz.open(file_path)
-                
-                for page_num in range(len(pdf_document)):
-                    page = pdf_document[page_num]
-                    pix = page.get_pixmap(matrix=fitz.Matrix(300/72, 300/72))  # 300 DPI
-                    img_data = pix.tobytes("png")
-                    
-                    # Converte para PIL Image
-                    from io import BytesIO
-                    img = Image.open(BytesIO(img_data))
-                    
-                    # Aplica OCR
-                    try:
-                        page_text = pytesseract.image_to_string(img, lang='por')
-                        text += page_text + "\n"
-                    except Exception as e:
-                        print(f"Erro no OCR da página {page_num + 1}: {e}")
-                
-                pdf_document.close()
-                
-        except Exception as e:
-            print(f"Erro ao processar PDF: {e}")
-            messagebox.showerror("Erro", f"Erro ao processar PDF: {e}")
-            
-        return text
-
-    def _process_pdf(self, file_path: str, bank: str) -> List[Dict]:
-        transactions = []
-        try:
-            # Usa o novo método que suporta OCR
-            text = self._extract_text_with_ocr(file_path)
-            
-            if bank == "Itaú":
-                transactions = self._parse_itau_pdf(text)
-            elif bank == "Banco do Brasil":
-                transactions = self._parse_bb_pdf(text)
-            elif bank == "Caixa":
-                transactions = self._parse_cef_pdf(text)
-            elif bank == "Sicoob":
-                transactions = self._parse_sicoob_pdf(text)
-            elif bank == "Santander":
-                transactions = self._parse_santander_pdf(text)
-                
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro ao processar PDF: {e}")
-            raise
-        return transactions
-    
-    def _parse_santander_pdf(self, text: str) -> List[Dict]:
-        """
-        Parser específico para extratos do Santander.
-        """
-        transactions = []
-        lines = text.split('\n')
-
-        # Tenta encontrar o ano da fatura de forma mais robusta
-        current_year = datetime.now().year
-        year_match = re.search(r'Vencimento\s+\d{2}/\d{2}/(20\d{2})', text, re.IGNORECASE)
-        if year_match:
-            current_year = int(year_match.group(1))
-
-        # Palavras-chave para ignorar
-        ignore_keywords = ['TOTAL', 'SALDO', 'PAGAMENTO', 'FATURA', 'ANTERIOR', 'CRÉDITO', 
-                          'DÉBITO AUTOM', 'ENCARGOS', 'ANUIDADE DIFERENCIADA', 'RESUMO',
-                          'LIMITE', 'DISPONÍVEL']
-        
-        # Padrão de regex unificado para capturar transações
-        # Captura data (com ou sem ano), descrição e valor, garantindo que "R$"
-        # não seja parte da descrição.
-        pattern = r'(\d{2}/\d{2}(?:/\d{2,4})?)\s+(.+?)\s+(?:R\$)?\s*([\d.,]+,\d{2})'
-
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            # Pula linhas com palavras-chave de resumo ou que sejam de crédito
-            if any(keyword in line.upper() for keyword in ignore_keywords):
-                continue
-            if re.search(r'-\s*[\d.,]+,\d{2}', line): # Ignora valores negativos
-                continue
-            
-            match = re.search(pattern, line)
-            
-            if match:
-                date_str = match.group(1)
-                description = match.group(2).strip()
-                value_str = match.group(3)
-
-                try:
-                    value = float(value_str.replace('.', '').replace(',', '.'))
-                    if value > 0:
-                        # Limpa a descrição
-                        clean_description = self._clean_santander_description(description)
-
-                        # Validação final para evitar descrições vazias ou "R$"
-                        if not clean_description or clean_description.upper() == 'R$':
-                            continue
-                        clean_description = self._clean_santander_description(description)
-
-                        # Formata a data, adicionando o ano se necessário
-                        date_parts = date_str.split('/')
-                        if len(date_parts) == 2:
-                            date_formatted = f"{date_parts[0]}/{date_parts[1]}/{current_year}"
-                        else:
-                            # Garante que o ano tenha 4 dígitos
-                            day, month, year_part = date_parts
-                            if len(year_part) == 2:
-                                date_formatted = f"{day}/{month}/20{year_part}"
-                            else:
-                                date_formatted = date_str
-
-                        transactions.append({
-                            'fornecedor': clean_description,
-                            'categoria': 'Cartão de Credito',
-                            'valor': value,
-                            'data_registro': date_formatted
-                        })
-                        
-                except ValueError as e:
-                    print(f"Erro ao processar a linha (Santander): '{line}'. Erro: {e}")
-                    continue
-        
-        print(f"Total de transações encontradas (Santander): {len(transactions)}")
-        return transactions
-    
-    def _clean_santander_description(self, description: str) -> str:
-        """
-        Limpa a descrição das transações do Santander.
-        """
-        # Remove informações de parcelamento (ex: 01/12)
-        cleaned = re.sub(r'\s+\d{2}/\d{2}\s*$', '', description).strip()
-        # Remove códigos no final (ex: "EMCT06D06")
-        cleaned = re.sub(r'\s+[A-Z0-9]{6,8}$', '', cleaned).strip()
-        # Remove asteriscos e excesso de espaços
-        cleaned = re.sub(r'[*]', ' ', cleaned).strip()
-        cleaned = re.sub(r'\s+', ' ', cleaned)
-
-        # Remove "R$" se for a única coisa que sobrou
-        if cleaned.upper() == 'R$':
-            return ""
-
-        # Capitaliza as palavras para um formato mais limpo
-        return ' '.join(word.capitalize() for word in cleaned.split())
-
-    def _parse_itau_pdf(self, text: str) -> List[Dict]:
-        transactions = []
-        pattern = r"(\d{2}/\d{2})\s+([^\n]+?)\s+R\$?([\d\.]+,\d{2})"
-        lines = text.split('\n')
-        full_text = ' '.join(lines)
-        current_year = datetime.now().year
-        year_match = re.search(r'(\d{2}/\d{2}/(\d{4}))', full_text)
-        if year_match:
-            current_year = int(year_match.group(2))
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            if any(word in line for word in ['Total', 'Saldo', 'Pagamento', 'Encargos', 'Tarifas', 'Custo Efetivo']):
-                continue
-            match = re.search(pattern, line)
-            if match:
-                date_str = match.group(1).strip()
-                description = match.group(2).strip()
-                value_str = match.group(3).strip()
-                if '-' in value_str:
-                    continue
-                clean_description = self._clean_itau_description(description)
-                try:
-                    value = float(value_str.replace('.', '').replace(',', '.'))
-                    date_formatted = self._convert_date_itau(date_str, current_year)
-                    transactions.append({
-                        'fornecedor': clean_description,
-                        'categoria': 'Cartão de Credito',
-                        'valor': value,
-                        'data_registro': date_formatted
-                    })
-                except ValueError as e:
-                    print(f"Erro ao converter valor '{value_str}': {e}")
-                    continue
-        return transactions
-
-    def _clean_itau_description(self, description: str) -> str:
-        cleaned = re.sub(r'\s*\d{2}/\d{2}$', '', description)
-        cleaned = re.sub(r'\s*un\d{2}/\d{2}$', '', cleaned)
-        cleaned = re.sub(r'\s+', ' ', cleaned)
-        return cleaned.strip()
-
-    def _parse_bb_pdf(self, text: str) -> List[Dict]:
-        transactions = []
-        current_year = datetime.now().year
-        year_match = re.search(r'(\d{2}/\d{2}/(\d{4}))', text)
-        if year_match:
-            current_year = int(year_match.group(2))
-        lines = text.split('\n')
-        pattern = r"(\d{2}/\d{2})\s+(.*?)\s+([\d\.]+,\d{2})"
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            if any(word in line for word in ['LANÇAMENTOS', 'TOTAL', 'FATURA', 'SALDO', 'RESUMO', 'ANTERIOR', 'PARCIAL']):
-                continue
-            if ' - ' in line or '-R$' in line or 'CRÉDITO' in line.upper() or 'ESTORNO' in line.upper():
-                continue
-            match = re.search(pattern, line)
-            if match:
-                date_str = match.group(1).strip()
-                description = match.group(2).strip()
-                value_str = match.group(3).strip()
-                try:
-                    value = float(value_str.replace('.', '').replace(',', '.'))
-                    date_formatted = self._convert_date_bb(date_str, current_year)
-                    clean_description = self._clean_bb_description(description)
-                    transactions.append({
-                        'fornecedor': clean_description,
-                        'categoria': 'Cartão de Credito',
-                        'valor': value,
-                        'data_registro': date_formatted
-                    })
-                except ValueError as e:
-                    print(f"Erro ao converter valor '{value_str}': {e}")
-                    continue
-        return transactions
-
-    def _clean_bb_description(self, description: str) -> str:
-        cleaned = re.sub(r'\s*PARC\s+\d{2}/\d{2}', '', description, flags=re.IGNORECASE)
-        cities = ['RIBEIRAO PRET', 'RIBEIRAO PRE', 'SAO PAULO', 'OSASCO', 'HORTOLANDIA', 
-                  'BELO HORIZON', 'SAN FRANCISCO']
-        for city in cities:
-            pattern = r'\s+' + re.escape(city) + r'\s*$'
-            cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE)
-        cleaned = re.sub(r'\s+', ' ', cleaned)
-        return cleaned.strip()
-
-    def _convert_date_itau(self, date_str: str, year: int) -> str:
-        try:
-            parts = date_str.replace(' ', '').split('/')
-            day = parts[0].zfill(2)
-            month = parts[1].zfill(2)
-            return f"{day}/{month}/{year}"
-        except:
-            return "01/01/2025"
-    
-    def _convert_date_bb(self, date_str: str, year: int) -> str:
-        try:
-            parts = date_str.replace(' ', '').split('/')
-            day = parts[0].zfill(2)
-            month = parts[1].zfill(2)
-            return f"{day}/{month}/{year}"
-        except:
-            return "01/01/2025"
-
-    def _parse_cef_pdf(self, text: str) -> List[Dict]:
-        transactions = []
-        current_year = datetime.now().year
-        year_match = re.search(r'(\d{2}/\d{2}/(\d{4}))', text)
-        if year_match:
-            current_year = int(year_match.group(2))
-        lines = text.split('\n')
-        processing_section = False
-        current_section = ""
-        target_sections = ["ANUIDADE", "COMPRAS", "COMPRAS PARCELADAS"]
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            for section in target_sections:
-                if section in line and ("Cartão" in line or section == line):
-                    processing_section = True
-                    current_section = section
-                    break
-            if processing_section:
-                if any(ignore_section in line for ignore_section in ["OUTROS", "Demonstrativo", "Total final", "Valor total desta fatura", "Total COMPRAS", "Total COMPRAS PARCELADAS"]):
-                    processing_section = False
-                    current_section = ""
-                    continue
-                if re.search(r'^[A-Z\s]+\s*\(Cartão\s+\d+\)', line) and not any(section in line for section in target_sections):
-                    processing_section = False
-                    current_section = ""
-                    continue
-                if any(header in line for header in ["Data", "Descrição", "Cidade/País", "Valor U$$", "Crédito/Débito", "Total", "Valor Original", "Cotação"]):
-                    continue
-                pattern = r'(\d{2}/\d{2})\s+(.+?)\s+([A-Z][A-Z\s]*[A-Z])\s+([\d\.]+,\d{2})\s*D\s*$'
-                match = re.search(pattern, line)
-                if match:
-                    date_str = match.group(1).strip()
-                    description = match.group(2).strip()
-                    city = match.group(3).strip()
-                    value_str = match.group(4).strip()
-                    try:
-                        value = float(value_str.replace('.', '').replace(',', '.'))
-                        date_formatted = self._convert_date_cef(date_str, current_year)
-                        clean_description = self._clean_cef_description(description)
-                        transactions.append({
-                            'fornecedor': self._clean_description(clean_description),
-                            'categoria': 'Cartão de Credito',
-                            'valor': value,
-                            'data_registro': date_formatted
-                        })
-                    except ValueError as e:
-                        print(f"Erro ao converter valor '{value_str}': {e}")
-                        continue
-                elif current_section == "ANUIDADE":
-                    anuidade_pattern = r'^([A-Z\s\d/]+?)\s+([\d\.]+,\d{2})\s*D\s*$'
-                    match = re.search(anuidade_pattern, line)
-                    if match:
-                        description = match.group(1).strip()
-                        value_str = match.group(2).strip()
-                        try:
-                            value = float(value_str.replace('.', '').replace(',', '.'))
-                            date_formatted = f"01/08/{current_year}"
-                            transactions.append({
-                                'fornecedor': self._clean_description(description),
-                                'categoria': 'Cartão de Credito', 
-                                'valor': value,
-                                'data_registro': date_formatted
-                            })
-                        except ValueError as e:
-                            print(f"Erro ao processar anuidade '{value_str}': {e}")
-                            continue
-                else:
-                    alt_pattern = r'(\d{2}/\d{2})\s+(.+)\s+([\d\.]+,\d{2})\s*D'
-                    match = re.search(alt_pattern, line)
-                    if match:
-                        date_str = match.group(1).strip()
-                        full_description = match.group(2).strip()
-                        value_str = match.group(3).strip()
-                        desc_parts = full_description.rsplit(' ', 2)
-                        if len(desc_parts) >= 2:
-                            description = ' '.join(desc_parts[:-1])
-                        else:
-                            description = full_description
-                        try:
-                            value = float(value_str.replace('.', '').replace(',', '.'))
-                            date_formatted = self._convert_date_cef(date_str, current_year)
-                            clean_description = self._clean_cef_description(description)
-                            transactions.append({
-                                'fornecedor': self._clean_description(clean_description),
-                                'categoria': 'Cartão de Credito',
-                                'valor': value,
-                                'data_registro': date_formatted
-                            })
-                        except ValueError as e:
-                            print(f"Erro no padrão alternativo '{value_str}': {e}")
-                            continue
-        return transactions
-
-    def _clean_cef_description(self, description: str) -> str:
-        description = re.sub(r'\s+\d{2}\s+DE\s+\d{2}', '', description, flags=re.IGNORECASE)
-        description = re.sub(r'\s+\d{2}/\d{2}$', '', description)
-        description = re.sub(r'\s+\d{1,2}/\s*\d{1,2}', '', description)
-        description = re.sub(r'\s+-\s+\d+', '', description)
-        description = re.sub(r'\s+\d{6}', '', description)
-        description = re.sub(r'\*', ' ', description)
-        description = re.sub(r'\s+', ' ', description)
-        return description.strip()
-    
-    def _convert_date_cef(self, date_str: str, year: int) -> str:
-        try:
-            parts = date_str.replace(' ', '').split('/')
-            day = parts[0].zfill(2)
-            month = parts[1].zfill(2)
-            return f"{day}/{month}/{year}"
-        except:
-            return "01/01/2025"
-
-    def _parse_sicoob_pdf(self, text: str) -> List[Dict]:
-        messagebox.showinfo("Aviso", "Lógica para Sicoob (PDF) ainda não implementada.")
-        return []
-
-    def _process_excel(self, file_path: str, bank: str) -> List[Dict]:
-        transactions = []
-        try:
-            df = pd.read_excel(file_path)
-            if bank == "Caixa":
-                transactions = self._parse_cef_excel(df)
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro ao processar Excel: {e}")
-        return transactions
-
-    def _parse_cef_excel(self, df: pd.DataFrame) -> List[Dict]:
-        messagebox.showinfo("Aviso", "Lógica para Caixa (Excel) ainda não implementada.")
-        return []
-    
-    def _insert_into_excel(self, file_path: str, transactions: List[Dict], account: str, due_date: str):
-        workbook = load_workbook(file_path)
-        worksheet = workbook.active
-        start_row = 6
-        current_row = start_row
-
-        while worksheet[f'C{current_row}'].value is not None:
-            current_row += 1
-
-        for transaction in transactions:
-            final_fornecedor = transaction.get('fornecedor_omie') or transaction['fornecedor']
-            
-            worksheet[f'C{current_row}'] = final_fornecedor
-            worksheet[f'D{current_row}'] = transaction['categoria']
-            worksheet[f'E{current_row}'] = account
-            worksheet[f'F{current_row}'] = transaction['valor']
-            worksheet[f'J{current_row}'] = transaction['data_registro']
-            worksheet[f'K{current_row}'] = due_date
-            current_row += 1
-        
-        workbook.save(file_path)
-
 class ReconciliationWindow(tk.Toplevel):
-    def __init__(self, parent, transactions: List[Dict], omie_suppliers: List[Dict], omie_categories: List[Dict]):
+    # Espera (ms) após a última tecla antes de filtrar as listas
+    SEARCH_DEBOUNCE_MS = 150
+    # Intervalo (ms) entre as leituras das sugestões calculadas em segundo plano
+    SUGGESTION_POLL_MS = 50
+
+    def __init__(self, parent, transactions: List[Transaction], omie_suppliers: List[Dict], omie_categories: List[Dict],
+                 memory: Optional[ReconciliationMemory] = None, supplier_index: Optional[SupplierIndex] = None):
         super().__init__(parent)
         self.title("Conciliação Manual de Fornecedores e Categorias")
         self.geometry("1250x600")
@@ -667,16 +67,32 @@ class ReconciliationWindow(tk.Toplevel):
         self.transactions = transactions
         self.omie_suppliers = omie_suppliers
         self.omie_categories = omie_categories
+        self.memory = memory
+        self.edited_items = set()
         
-        self.supplier_names = sorted([s.get('nome_fantasia') or s.get('razao_social') for s in omie_suppliers] + ["Cartão de Credito"])
+        self.supplier_names = sorted([s.get('nome_fantasia') or s.get('razao_social') for s in omie_suppliers] + [DEFAULT_CATEGORY])
         
         self.category_names = sorted([html.unescape(c.get('descricao')) for c in omie_categories if c.get('descricao') and html.unescape(c.get('descricao')).strip().lower() != 'disponível'])
 
-        self.unreconciled_transactions = [t for t in transactions if not t.get('fornecedor_omie')]
-        self.tree_items = {}
+        # Índices de pesquisa montados uma vez; a cada tecla só o índice é consultado
+        self.supplier_search = NameSearchIndex(self.supplier_names)
+        self.category_search = NameSearchIndex(self.category_names)
+        self._filter_jobs = {}
+        self._last_queries = {}
+
+        self.unreconciled_transactions = [t for t in transactions if not t.supplier]
+        self.tree_items: Dict[str, Transaction] = {}
+
+        # Sugestões de fornecedor por linha: [(nome, nota), ...], preenchidas em segundo plano
+        self.supplier_index = supplier_index
+        self.suggestions: Dict[str, List[Tuple[str, int]]] = {}
+        self._suggestion_queue: "queue.Queue[tuple]" = queue.Queue()
+        self._suggestion_job = None
+        self._closed = threading.Event()
 
         self.create_widgets()
         self.populate_treeview()
+        self._start_suggestions()
 
     def create_widgets(self):
         main_frame = ttk.Frame(self, padding="10")
@@ -688,7 +104,7 @@ class ReconciliationWindow(tk.Toplevel):
         extrato_title = ttk.Label(extrato_frame, text="Itens do Extrato a Conciliar:", font=("Helvetica", 10, "bold"))
         extrato_title.pack(pady=(0, 10))
 
-        columns = ('data_registro', 'fornecedor', 'valor', 'fornecedor_omie', 'categoria_omie')
+        columns = ('data_registro', 'fornecedor', 'valor', 'fornecedor_omie', 'categoria_omie', 'sugestao')
         self.tree = ttk.Treeview(extrato_frame, columns=columns, show='headings') # Corrigido: Removida a palavra 'grid'
         
         self.tree.heading('data_registro', text='Data')
@@ -696,12 +112,14 @@ class ReconciliationWindow(tk.Toplevel):
         self.tree.heading('valor', text='Valor')
         self.tree.heading('fornecedor_omie', text='Fornecedor Omie')
         self.tree.heading('categoria_omie', text='Categoria Omie')
+        self.tree.heading('sugestao', text='Sugestão (duplo clique aceita)')
         
         self.tree.column('data_registro', width=80, anchor=tk.CENTER)
         self.tree.column('fornecedor', width=250)
         self.tree.column('valor', width=90, anchor=tk.E)
         self.tree.column('fornecedor_omie', width=250)
         self.tree.column('categoria_omie', width=150)
+        self.tree.column('sugestao', width=220)
 
         scrollbar_y = ttk.Scrollbar(extrato_frame, orient=tk.VERTICAL, command=self.tree.yview)
         scrollbar_x = ttk.Scrollbar(extrato_frame, orient=tk.HORIZONTAL, command=self.tree.xview)
@@ -712,6 +130,7 @@ class ReconciliationWindow(tk.Toplevel):
         self.tree.pack(fill=tk.BOTH, expand=True)
 
         self.tree.bind('<Double-1>', self.on_double_click)
+        self.tree.bind('<Button-3>', self.show_suggestion_menu)
         
         self.notebook = ttk.Notebook(main_frame)
         self.notebook.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(10, 0))
@@ -734,9 +153,10 @@ class ReconciliationWindow(tk.Toplevel):
 
         self.supplier_listbox = tk.Listbox(self.supplier_tab)
         self.supplier_listbox.pack(fill=tk.BOTH, expand=True)
-
-        for name in self.supplier_names:
-            self.supplier_listbox.insert(tk.END, name)
+        self.supplier_info = ttk.Label(self.supplier_tab, text="", foreground="gray")
+        self.supplier_info.pack(anchor=tk.W)
+        self._apply_filter('fornecedores', self.search_entry, self.supplier_search,
+                           self.supplier_listbox, self.supplier_info)
 
         self.search_entry.bind('<KeyRelease>', self.filter_suppliers)
         self.supplier_listbox.bind('<Double-1>', self.on_listbox_double_click)
@@ -753,9 +173,10 @@ class ReconciliationWindow(tk.Toplevel):
 
         self.category_listbox = tk.Listbox(self.category_tab)
         self.category_listbox.pack(fill=tk.BOTH, expand=True)
-        
-        for name in self.category_names:
-            self.category_listbox.insert(tk.END, name)
+        self.category_info = ttk.Label(self.category_tab, text="", foreground="gray")
+        self.category_info.pack(anchor=tk.W)
+        self._apply_filter('categorias', self.search_entry_cat, self.category_search,
+                           self.category_listbox, self.category_info)
 
         self.search_entry_cat.bind('<KeyRelease>', self.filter_categories)
         self.category_listbox.bind('<Double-1>', self.on_category_listbox_double_click)
@@ -763,6 +184,10 @@ class ReconciliationWindow(tk.Toplevel):
         button_frame = ttk.Frame(self)
         button_frame.pack(pady=10)
         
+        accept_button = ttk.Button(button_frame, text="Aceitar Sugestões Selecionadas",
+                                   command=self.accept_selected_suggestions)
+        accept_button.pack(side=tk.LEFT, padx=10)
+
         save_button = ttk.Button(button_frame, text="Salvar e Fechar", command=self.save_and_close)
         save_button.pack(side=tk.LEFT, padx=10)
 
@@ -772,14 +197,115 @@ class ReconciliationWindow(tk.Toplevel):
         for transaction in self.unreconciled_transactions:
             # NOVO: Ordem dos valores ajustada para combinar com a nova ordem das colunas
             item_id = self.tree.insert('', tk.END, values=(
-                transaction['data_registro'],
-                transaction['fornecedor'],
-                f"{transaction['valor']:.2f}",
+                transaction.date_text,
+                transaction.description,
+                f"{transaction.amount:.2f}",
                 '',
-                'Cartão de Credito'
+                transaction.category,
+                'calculando...' if self.supplier_index is not None else ''
             ))
             self.tree_items[item_id] = transaction
 
+    def _start_suggestions(self):
+        """
+        Calcula as sugestões de cada linha em uma thread, para a janela abrir
+        na hora; as linhas são atualizadas à medida que ficam prontas.
+        """
+        if self.supplier_index is None or not self.tree_items:
+            return
+        rows = [(item_id, transaction.description) for item_id, transaction in self.tree_items.items()]
+        supplier_index = self.supplier_index
+
+        def worker():
+            computed = {}
+            for item_id, description in rows:
+                if self._closed.is_set():
+                    return
+                # Descrições repetidas (ex: parcelas) são calculadas uma vez
+                if description not in computed:
+                    try:
+                        computed[description] = supplier_index.suggestions(description)
+                    except Exception as e:
+                        print(f"Erro ao calcular sugestões para '{description}': {e}")
+                        computed[description] = []
+                self._suggestion_queue.put((item_id, computed[description]))
+            self._suggestion_queue.put((None, None))
+
+        threading.Thread(target=worker, name="sugestoes", daemon=True).start()
+        self._suggestion_job = self.after(self.SUGGESTION_POLL_MS, self._poll_suggestions)
+
+    def _poll_suggestions(self):
+        self._suggestion_job = None
+        try:
+            while True:
+                item_id, suggestions = self._suggestion_queue.get_nowait()
+                if item_id is None:
+                    return
+                self.suggestions[item_id] = suggestions
+                self._set_value(item_id, 5, self._suggestion_text(suggestions))
+        except queue.Empty:
+            pass
+        self._suggestion_job = self.after(self.SUGGESTION_POLL_MS, self._poll_suggestions)
+
+    @staticmethod
+    def _suggestion_text(suggestions: List[Tuple[str, int]]) -> str:
+        if not suggestions:
+            return "sem sugestão"
+        name, score = suggestions[0]
+        text = f"{name} ({score}%)"
+        if len(suggestions) > 1:
+            text += f" +{len(suggestions) - 1}"
+        return text
+
+    def _set_value(self, item_id: str, column: int, value: str):
+        values = list(self.tree.item(item_id, 'values'))
+        values[column] = value
+        self.tree.item(item_id, values=values)
+
+    def _set_supplier(self, item_id: str, supplier: str):
+        self._set_value(item_id, 3, supplier)
+        self.tree_items[item_id].set_supplier(supplier)
+        self.edited_items.add(item_id)
+
+    def accept_suggestion(self, item_id: str, rank: int = 0) -> bool:
+        suggestions = self.suggestions.get(item_id)
+        if not suggestions or rank >= len(suggestions):
+            return False
+        self._set_supplier(item_id, suggestions[rank][0])
+        return True
+
+    def accept_selected_suggestions(self):
+        selected = self.tree.selection()
+        if not selected:
+            messagebox.showwarning("Aviso", "Selecione as linhas do extrato cujas sugestões serão aceitas.", parent=self)
+            return
+        for item_id in selected:
+            self.accept_suggestion(item_id)
+
+    def show_suggestion_menu(self, event):
+        item_id = self.tree.identify_row(event.y)
+        if not item_id:
+            return
+        self.tree.selection_set(item_id)
+        self.tree.focus(item_id)
+        menu = tk.Menu(self, tearoff=0)
+        suggestions = self.suggestions.get(item_id)
+        if suggestions:
+            for rank, (name, score) in enumerate(suggestions):
+                menu.add_command(label=f"{name} ({score}%)",
+                                 command=lambda rank=rank: self.accept_suggestion(item_id, rank))
+        else:
+            menu.add_command(label="sem sugestões" if item_id in self.suggestions else "calculando...",
+                             state=tk.DISABLED)
+        menu.tk_popup(event.x_root, event.y_root)
+
+    def destroy(self):
+        self._closed.set()
+        if self._suggestion_job is not None:
+            self.after_cancel(self._suggestion_job)
+            self._suggestion_job = None
+        super().destroy()
+
     def on_double_click(self, event):
         selected_item = self.tree.identify_row(event.y)
         column_id = self.tree.identify_column(event.x)
@@ -792,22 +318,46 @@ class ReconciliationWindow(tk.Toplevel):
             self.notebook.select(self.supplier_tab)
         elif column_id == '#5': # Coluna de Categoria Omie
             self.notebook.select(self.category_tab)
+        elif column_id == '#6': # Coluna de Sugestão: aceita a primeira sugestão
+            self.accept_suggestion(selected_item)
         
         self.tree.selection_set(selected_item)
         
     def filter_suppliers(self, event):
-        search_term = self.search_entry.get().lower()
-        self.supplier_listbox.delete(0, tk.END)
-        for name in self.supplier_names:
-            if search_term in name.lower():
-                self.supplier_listbox.insert(tk.END, name)
+        self._schedule_filter('fornecedores', self.search_entry, self.supplier_search,
+                              self.supplier_listbox, self.supplier_info)
 
     def filter_categories(self, event):
-        search_term = self.search_entry_cat.get().lower()
-        self.category_listbox.delete(0, tk.END)
-        for name in self.category_names:
-            if search_term in name.lower():
-                self.category_listbox.insert(tk.END, name)
+        self._schedule_filter('categorias', self.search_entry_cat, self.category_search,
+                              self.category_listbox, self.category_info)
+
+    def _schedule_filter(self, key: str, entry, search_index: NameSearchIndex, listbox, info_label):
+        # Cada tecla adia a pesquisa; só a última, após a pausa na digitação, é executada
+        job = self._filter_jobs.pop(key, None)
+        if job is not None:
+            self.after_cancel(job)
+        self._filter_jobs[key] = self.after(
+            self.SEARCH_DEBOUNCE_MS, lambda: self._apply_filter(key, entry, search_index, listbox, info_label)
+        )
+
+    def _apply_filter(self, key: str, entry, search_index: NameSearchIndex, listbox, info_label):
+        self._filter_jobs.pop(key, None)
+        query = entry.get()
+        if self._last_queries.get(key) == query:
+            return
+        self._last_queries[key] = query
+
+        names, truncated = search_index.search(query)
+        listbox.delete(0, tk.END)
+        if names:
+            listbox.insert(tk.END, *names)
+        if truncated:
+            info_label.config(text=f"Mostrando os primeiros {len(names)} resultados. "
+                                   "Digite mais para refinar a pesquisa.")
+        elif not names:
+            info_label.config(text="Nenhum item encontrado.")
+        else:
+            info_label.config(text="")
 
     def on_listbox_double_click(self, event):
         selected_supplier_index = self.supplier_listbox.curselection()
@@ -821,12 +371,7 @@ class ReconciliationWindow(tk.Toplevel):
             messagebox.showwarning("Aviso", "Por favor, selecione uma linha do extrato para alterar.")
             return
 
-        values = list(self.tree.item(selected_tree_item, 'values'))
-        # NOVO: Índice da coluna de Fornecedor Omie agora é 3 (4ª coluna)
-        values[3] = selected_supplier
-        self.tree.item(selected_tree_item, values=values)
-        
-        self.tree_items[selected_tree_item]['fornecedor_omie'] = selected_supplier
+        self._set_supplier(selected_tree_item, selected_supplier)
     
     def on_category_listbox_double_click(self, event):
         selected_category_index = self.category_listbox.curselection()
@@ -845,20 +390,47 @@ class ReconciliationWindow(tk.Toplevel):
         values[4] = selected_category
         self.tree.item(selected_tree_item, values=values)
 
-        self.tree_items[selected_tree_item]['categoria'] = selected_category
+        self.tree_items[selected_tree_item].set_category(selected_category)
+        self.edited_items.add(selected_tree_item)
             
     def save_and_close(self):
+        # Memoriza as escolhas manuais para as próximas conciliações deste cliente
+        if self.memory is not None:
+            for item_id in self.edited_items:
+                transaction = self.tree_items.get(item_id)
+                if transaction and transaction.supplier:
+                    try:
+                        self.memory.remember(transaction.description, transaction.supplier, transaction.category)
+                    except Exception as e:
+                        print(f"Erro ao memorizar conciliação: {e}")
         self.destroy()
 
 # A classe App foi totalmente refeita para usar uma interface mais bonita e organizada.
 # A lógica interna dos métodos foi mantida, mas a forma de construir os elementos visuais
 # foi modernizada.
 class App(tk.Tk):
+    # Intervalo (ms) entre as leituras da fila de eventos do processamento
+    POLL_INTERVAL_MS = 100
+    # Intervalo (ms) entre as verificações do carregamento antecipado dos cadastros
+    PREFETCH_POLL_MS = 200
+
     def __init__(self):
         super().__init__()
         self.title("Automatizador de Extratos e Conciliação Omie")
         self.state("zoomed")  # Define um tamanho inicial para a janela
         self.processor = ExtractProcessor()
+
+        # O processamento roda em uma thread separada e só conversa com a
+        # interface por esta fila; os widgets são tocados apenas na thread do Tk
+        self.events: "queue.Queue[tuple]" = queue.Queue()
+        self.worker: Optional[threading.Thread] = None
+        self.review_done = threading.Event()
+        # Respostas do operador às perguntas feitas pela thread de processamento
+        self.replies: "queue.Queue[Optional[bool]]" = queue.Queue()
+        # Conciliação manual aberta (modal), fechada também pelo cancelamento
+        self.reconciliation_window: Optional[ReconciliationWindow] = None
+        self.processor.notify = lambda level, title, message: self.events.put(("notify", level, title, message))
+        self.processor.progress_callback = lambda message, fraction: self.events.put(("progress", message, fraction))
         self.clients = ["Aurora Hotel", "Elias Carnes", "Ipê Amarelo", "Boteco Napoleão"]
         
         # Configurar o estilo para um visual mais moderno
@@ -879,29 +451,51 @@ class App(tk.Tk):
 
         # Reorganizar campos de entrada em frames de 2 colunas
         self.create_input_field(main_frame, "Selecione o cliente:", self.clients, is_combo=True, var_name='client_combo')
-        self.create_input_field(main_frame, "Selecione o banco:", self.processor.supported_banks, is_combo=True, var_name='bank_combo')
+        self.create_input_field(main_frame, "Selecione o banco:", [AUTO_DETECT] + self.processor.supported_banks, is_combo=True, var_name='bank_combo')
         self.create_file_field(main_frame, "Arquivo de Extrato:", var_name='file_entry')
         self.create_input_field(main_frame, "Conta Corrente:", var_name='account_entry')
         self.create_input_field(main_frame, "Data de Vencimento (DD/MM/AAAA):", var_name='due_date_entry')
 
+        self.force_refresh_var = tk.BooleanVar(value=False)
+        force_refresh_check = ttk.Checkbutton(main_frame, text="Forçar atualização dos cadastros da Omie",
+                                              variable=self.force_refresh_var, command=self.on_client_selected)
+        force_refresh_check.pack(anchor=tk.W, padx=5, pady=(5, 0))
+
+        # Andamento do carregamento dos cadastros do cliente selecionado
+        prefetch_frame = ttk.Frame(main_frame, padding="5 5")
+        prefetch_frame.pack(fill=tk.X)
+        self.prefetch_label = ttk.Label(prefetch_frame, text="", foreground="gray")
+        self.prefetch_label.pack(side=tk.LEFT)
+        self.prefetch_bar = ttk.Progressbar(prefetch_frame, orient='horizontal', mode='indeterminate', length=150)
+        self._prefetch = None
+        self._prefetch_job = None
+
         # Botões
         button_frame = ttk.Frame(main_frame)
         button_frame.pack(pady=20)
         
-        process_button = ttk.Button(button_frame, text="Processar", command=self.process_data)
-        process_button.pack(side=tk.LEFT, padx=10)
+        self.process_button = ttk.Button(button_frame, text="Processar", command=self.process_data)
+        self.process_button.pack(side=tk.LEFT, padx=10)
+
+        self.cancel_button = ttk.Button(button_frame, text="Cancelar", command=self.cancel_processing,
+                                        state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.LEFT, padx=10)
         
-        exit_button = ttk.Button(button_frame, text="Sair", command=self.destroy)
+        exit_button = ttk.Button(button_frame, text="Sair", command=self.on_close)
         exit_button.pack(side=tk.LEFT, padx=10)
 
         self.status_label = ttk.Label(main_frame, text="", font=("Helvetica", 10), foreground="blue", wraplength=500)
         self.status_label.pack(pady=(10, 0))
 
-        # Adiciona a barra de progresso
-        self.progress_bar = ttk.Progressbar(main_frame, orient='horizontal', mode='indeterminate')
+        # Adiciona a barra de progresso (exibida apenas durante o processamento)
+        self.progress_bar = ttk.Progressbar(main_frame, orient='horizontal', mode='determinate', maximum=100)
 
         # Binds
         self.client_combo.bind("<<ComboboxSelected>>", self.on_client_selected)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # O cliente já vem selecionado: os cadastros dele começam a carregar com a janela aberta
+        self.after_idle(self.on_client_selected)
 
     def create_input_field(self, parent_frame, label_text, values=None, is_combo=False, var_name=''):
         field_frame = ttk.Frame(parent_frame, padding="5 5")
@@ -934,12 +528,61 @@ class App(tk.Tk):
         browse_button = ttk.Button(field_frame, text="Procurar...", command=self.browse_file)
         browse_button.pack(side=tk.LEFT, padx=(5, 0))
 
-    def on_client_selected(self, event):
-        # Lógica para quando um cliente é selecionado (se precisar de alguma ação)
-        pass
+    def show_notification(self, level: str, title: str, message: str):
+        if level == "error":
+            messagebox.showerror(title, message)
+        elif level == "warning":
+            messagebox.showwarning(title, message)
+        else:
+            messagebox.showinfo(title, message)
+
+    def on_client_selected(self, event=None):
+        """
+        Começa a carregar as credenciais e os cadastros da Omie do cliente
+        em segundo plano; o processamento usa o resultado (ou espera o
+        carregamento em andamento) em vez de buscar de novo.
+        """
+        client = self.client_combo.get()
+        if not client:
+            return
+        self._prefetch = self.processor.prefetch_catalogs(client, self.force_refresh_var.get())
+        if self._prefetch_job is None:
+            self._poll_prefetch()
+
+    def _poll_prefetch(self):
+        self._prefetch_job = None
+        prefetch = self._prefetch
+        if prefetch is None:
+            return
+        if not prefetch.future.done():
+            self.prefetch_label.config(text=f"Carregando os cadastros da Omie de {prefetch.client}...",
+                                       foreground="gray")
+            if not self.prefetch_bar.winfo_ismapped():
+                self.prefetch_bar.pack(side=tk.LEFT, padx=(10, 0))
+                self.prefetch_bar.start(10)
+            self._prefetch_job = self.after(self.PREFETCH_POLL_MS, self._poll_prefetch)
+            return
+
+        self.prefetch_bar.stop()
+        self.prefetch_bar.pack_forget()
+        error = prefetch.future.exception()
+        if error is not None:
+            self.prefetch_label.config(text=f"Cadastros da Omie de {prefetch.client} não carregados ({error}). "
+                                            "Eles serão buscados ao processar.", foreground="orange")
+            return
+        suppliers, categories, age = prefetch.future.result()
+        origin = "atualizados agora" if age is None else f"em cache há {format_age(age)}"
+        self.prefetch_label.config(text=f"Cadastros da Omie de {prefetch.client} prontos: {len(suppliers)} "
+                                        f"fornecedores e {len(categories)} categorias ({origin}).",
+                                   foreground="green")
+
+    def _catalog_age_text(self) -> str:
+        if self.processor.catalog_age is None:
+            return "Cadastros da Omie atualizados agora."
+        return f"Cadastros da Omie em cache há {format_age(self.processor.catalog_age)}."
 
     def browse_file(self):
-        filetypes = [("Arquivos de Extrato", "*.ofx *.pdf"), ("Todos os arquivos", "*.*")]
+        filetypes = [("Arquivos de Extrato", "*.ofx *.pdf *.xls *.xlsx"), ("Todos os arquivos", "*.*")]
         filename = filedialog.askopenfilename(
             title="Selecione o arquivo de extrato",
             filetypes=filetypes
@@ -947,6 +590,15 @@ class App(tk.Tk):
         if filename:
             self.file_entry.delete(0, tk.END)
             self.file_entry.insert(0, filename)
+            # Só o início do arquivo é lido (cabeçalho do OFX ou texto da 1ª página do PDF)
+            detected = detect_bank(filename)
+            if detected:
+                self.bank_combo.set(detected)
+                self.status_label.config(text=f"Banco reconhecido pelo arquivo: {detected}", foreground="blue")
+            else:
+                # Escaneados e planilhas da Caixa costumam não ser reconhecidos: mantém a escolha do usuário
+                self.status_label.config(text="Banco não reconhecido pelo arquivo. Confira o banco selecionado.",
+                                         foreground="orange")
     
     def process_data(self):
         bank = self.bank_combo.get()
@@ -958,34 +610,167 @@ class App(tk.Tk):
         if not all([bank, file_path, account, due_date, client]):
             messagebox.showwarning("Aviso", "Preencha todos os campos antes de processar.")
             return
+        if self.worker and self.worker.is_alive():
+            return
+
+        self.processor.cancel_event.clear()
+        self.replies = queue.Queue()
+        self._set_running(True)
+        self.status_label.config(text="Processando e conciliando...", foreground="blue")
+        self.worker = threading.Thread(
+            target=self._run_pipeline, name="processamento", daemon=True,
+            args=(bank, file_path, client, account, due_date, self.force_refresh_var.get())
+        )
+        self.worker.start()
+        self.after(self.POLL_INTERVAL_MS, self._poll_events)
 
+    def _run_pipeline(self, bank: str, file_path: str, client: str, account: str, due_date: str,
+                      force_refresh: bool):
+        """
+        Executado na thread de processamento: não toca em widgets, só envia
+        eventos pela fila. A conciliação manual é pedida à thread do Tk e esta
+        thread espera até a janela ser fechada.
+        """
+        trace = self.processor.start_trace(f"{client} - {bank} - {os.path.basename(file_path)}")
+        status = "erro"
         try:
-            self.status_label.config(text="Processando e conciliando...", foreground="blue")
-            self.update_idletasks()
-            
-            transactions = self.processor._process_and_reconcile(bank, file_path, client)
-            
+            transactions = self.processor._process_and_reconcile(
+                bank, file_path, client, force_refresh=force_refresh
+            )
+
             if not transactions:
-                self.status_label.config(text="Erro ou nenhuma transação para processar.", foreground="red")
+                status = "sem_transacoes"
+                self.events.put(("finished", "Erro ou nenhuma transação para processar.\n\n" + trace.summary(), "red"))
                 return
 
-            default_category = "Cartão de Credito"
-            for t in transactions:
-                t['categoria'] = default_category
-
-            unreconciled = [t for t in transactions if not t.get('fornecedor_omie')]
+            # Linhas já exportadas em execuções anteriores (extratos sobrepostos)
+            duplicates = self.processor.find_duplicates(client, account, transactions)
+            keys = None
+            if duplicates:
+                answer = self._ask(
+                    "Transações já exportadas",
+                    f"{len(duplicates)} de {len(transactions)} transações deste extrato já foram exportadas "
+                    f"antes para a conta '{account}' (mesma data, valor e descrição).\n\n"
+                    "Sim: ignorar as transações repetidas\n"
+                    "Não: gravar todas mesmo assim\n"
+                    "Cancelar: interromper o processamento"
+                )
+                if answer is None:
+                    raise ProcessingCancelled("Processamento cancelado.")
+                if answer:
+                    transactions, keys = without_duplicates(transactions, duplicates)
+                if not transactions:
+                    status = "ja_exportado"
+                    self.events.put(("finished", "Todas as transações deste extrato já haviam sido exportadas. "
+                                                 "Nenhuma planilha foi gerada.", "orange"))
+                    return
+
+            unreconciled = [t for t in transactions if not t.supplier]
             
             if unreconciled:
-                reconciliation_window = ReconciliationWindow(self, transactions, self.processor.omie_suppliers, self.processor.omie_categories)
-                self.wait_window(reconciliation_window)
-                
-            result = self.processor.process_and_save(transactions, account, due_date)
-            self.status_label.config(text=result, foreground="green" if "✅" in result else "red")
-                
+                with trace.span("conciliacao_manual", pendentes=len(unreconciled)):
+                    self.review_done.clear()
+                    self.events.put(("review", transactions))
+                    self.review_done.wait()
+                self.processor._check_cancelled()
+
+            self.processor._report_progress("Gravando a planilha...", 0.95)
+            result = self.processor.process_and_save(transactions, account, due_date, client=client, keys=keys)
+            status = "ok" if "✅" in result else "erro"
+            result += f"\n\n{self._catalog_age_text()}\n\n{trace.summary()}"
+            self.events.put(("finished", result, "green" if "✅" in result else "red"))
+
+        except ProcessingCancelled:
+            status = "cancelado"
+            self.events.put(("finished", "Processamento cancelado.", "orange"))
         except Exception as e:
-            messagebox.showerror("Erro", f"Ocorreu um erro: {e}")
-            self.status_label.config(text=f"Erro: {e}", foreground="red")
+            self.events.put(("error", e))
+        finally:
+            trace.finish(status)
+
+    def _ask(self, title: str, message: str) -> Optional[bool]:
+        """
+        Pergunta sim/não/cancelar ao operador a partir da thread de
+        processamento e espera a resposta (None = cancelar).
+        """
+        self.events.put(("ask", title, message))
+        return self.replies.get()
+
+    def _poll_events(self):
+        """
+        Lê os eventos da thread de processamento (na thread do Tk) e
+        reagenda a leitura enquanto o processamento não terminar.
+        """
+        try:
+            while True:
+                kind, *payload = self.events.get_nowait()
+                if kind == "progress":
+                    message, fraction = payload
+                    self.status_label.config(text=message, foreground="blue")
+                    self.progress_bar.config(value=fraction * 100)
+                elif kind == "notify":
+                    self.show_notification(*payload)
+                elif kind == "review":
+                    self._open_reconciliation(*payload)
+                elif kind == "ask":
+                    title, message = payload
+                    self.replies.put(messagebox.askyesnocancel(title, message, parent=self))
+                elif kind == "finished":
+                    text, color = payload
+                    self.status_label.config(text=text, foreground=color)
+                    self._set_running(False)
+                    return
+                elif kind == "error":
+                    error = payload[0]
+                    messagebox.showerror("Erro", f"Ocorreu um erro: {error}")
+                    self.status_label.config(text=f"Erro: {error}", foreground="red")
+                    self._set_running(False)
+                    return
+        except queue.Empty:
+            pass
+        self.after(self.POLL_INTERVAL_MS, self._poll_events)
+
+    def _open_reconciliation(self, transactions: List[Transaction]):
+        self.status_label.config(text="Aguardando a conciliação manual...", foreground="blue")
+        try:
+            self.reconciliation_window = ReconciliationWindow(
+                self, transactions, self.processor.omie_suppliers, self.processor.omie_categories,
+                memory=self.processor.memory, supplier_index=self.processor._get_supplier_index())
+            self.wait_window(self.reconciliation_window)
+        finally:
+            self.reconciliation_window = None
+            # Libera a thread de processamento mesmo se a janela falhar
+            self.review_done.set()
+
+    def _set_running(self, running: bool):
+        self.process_button.config(state=tk.DISABLED if running else tk.NORMAL)
+        self.cancel_button.config(state=tk.NORMAL if running else tk.DISABLED)
+        if running:
+            self.progress_bar.config(value=0)
+            self.progress_bar.pack(fill=tk.X, pady=(10, 0))
+        else:
+            self.progress_bar.pack_forget()
+
+    def cancel_processing(self):
+        if self.worker and self.worker.is_alive():
+            self.processor.cancel()
+            self.review_done.set()
+            self.replies.put(None)
+            # A thread já não espera pela conciliação: a janela modal não pode continuar prendendo a principal
+            window = self.reconciliation_window
+            if window is not None and window.winfo_exists():
+                window.grab_release()
+                window.destroy()
+            self.status_label.config(text="Cancelando...", foreground="orange")
+
+    def on_close(self):
+        self.cancel_processing()
+        if self._prefetch_job is not None:
+            self.after_cancel(self._prefetch_job)
+            self._prefetch_job = None
+        self.destroy()
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Necessário para o pool de OCR no executável do Windows
     app = App()
     app.mainloop()
\ No newline at end of file
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Leitor de OFX em fluxo contínuo (streaming).
+
+O arquivo é lido em blocos e percorrido uma única vez, sem carregar todo o
+conteúdo em memória. Funciona com OFX 1.x (SGML, com ou sem tags de
+fechamento nos campos) e OFX 2.x (XML). Cada <STMTTRN> é entregue assim que
+termina, como um dicionário {TAG: valor}.
+
+A codificação é detectada uma vez, pelo cabeçalho. Quando o cabeçalho não é
+conclusivo (USASCII/NONE, comum nos bancos brasileiros), o texto é lido como
+UTF-8 e bytes inválidos são interpretados como latin-1, sem reler o arquivo.
+"""
+
+import re
+import codecs
+from typing import Dict, Iterator, BinaryIO
+
+CHUNK_SIZE = 1024 * 1024
+HEADER_SAMPLE_SIZE = 4096
+
+_tag_pattern = re.compile(r'<(/?)([A-Za-z0-9_.]+)[^>]*>([^<]*)')
+_xml_encoding_pattern = re.compile(rb'<\?xml[^>]*encoding=["\']([A-Za-z0-9_.-]+)["\']', re.IGNORECASE)
+_charset_pattern = re.compile(rb'^\s*CHARSET:\s*([A-Za-z0-9_-]+)', re.IGNORECASE | re.MULTILINE)
+_encoding_pattern = re.compile(rb'^\s*ENCODING:\s*([A-Za-z0-9_-]+)', re.IGNORECASE | re.MULTILINE)
+
+FALLBACK_ERROR_HANDLER = 'ofx_latin1_fallback'
+
+
+def _latin1_fallback(error: UnicodeDecodeError):
+    return error.object[error.start:error.end].decode('latin-1'), error.end
+
+
+codecs.register_error(FALLBACK_ERROR_HANDLER, _latin1_fallback)
+
+
+def detect_encoding(header: bytes) -> str:
+    """
+    Determina a codificação a partir do início do arquivo OFX.
+    """
+    if header.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    match = _xml_encoding_pattern.search(header)
+    if match:
+        return match.group(1).decode('ascii').lower()
+    charset = _charset_pattern.search(header)
+    if charset:
+        value = charset.group(1).decode('ascii').upper()
+        if value in ('1252', 'WINDOWS-1252'):
+            return 'cp1252'
+        if value in ('ISO-8859-1', '8859-1', 'LATIN1'):
+            return 'latin-1'
+    encoding = _encoding_pattern.search(header)
+    if encoding and encoding.group(1).decode('ascii').upper() in ('UTF-8', 'UTF8'):
+        return 'utf-8'
+    return 'utf-8'
+
+
+def iter_ofx_transactions(stream: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Dict[str, str]]:
+    """
+    Percorre um OFX aberto em modo binário e gera um dicionário por
+    <STMTTRN>, com os valores dos campos sem espaços nas pontas.
+    """
+    header = stream.read(HEADER_SAMPLE_SIZE)
+    encoding = detect_encoding(header)
+    try:
+        decoder = codecs.getincrementaldecoder(encoding)(errors=FALLBACK_ERROR_HANDLER)
+    except LookupError:
+        decoder = codecs.getincrementaldecoder('utf-8')(errors=FALLBACK_ERROR_HANDLER)
+
+    current = None
+    buffer = decoder.decode(header)
+    while True:
+        chunk = stream.read(chunk_size)
+        final = not chunk
+        buffer += decoder.decode(chunk, final=final)
+
+        # Só processa até o último '<': a tag seguinte pode estar incompleta
+        cut = len(buffer) if final else buffer.rfind('<')
+        if cut > 0:
+            for closing, tag, value in _tag_pattern.findall(buffer, 0, cut):
+                tag = tag.upper()
+                if tag == 'STMTTRN':
+                    if current is not None:
+                        yield current
+                    current = None if closing else {}
+                elif current is not None and not closing:
+                    current[tag] = value.strip()
+            buffer = buffer[cut:]
+
+        if final:
+            break
+
+    if current is not None:
+        yield current
+
+
+def iter_ofx_file(file_path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[Dict[str, str]]:
+    """
+    Abre o arquivo e gera as transações (ver iter_ofx_transactions).
+    """
+    with open(file_path, 'rb') as stream:
+        yield from iter_ofx_transactions(stream, chunk_size)
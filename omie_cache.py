@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache local dos cadastros da Omie (fornecedores e categorias).
+
+Os cadastros ficam em um banco SQLite, por cliente e app_key. Uma execução
+usa a cópia local imediatamente; quando ela passa do TTL, a atualização é
+feita em segundo plano e vale para a próxima execução. Sem cópia local, ou
+com atualização forçada, a busca na Omie é feita na hora.
+"""
+
+import os
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+from contextlib import closing, contextmanager
+from typing import Iterator, List, Dict, Tuple, Optional, Callable
+
+from omie_client import fetch_catalogs
+
+DEFAULT_CACHE_PATH = os.path.join("cache", "omie_cadastros.sqlite3")
+DEFAULT_TTL_SECONDS = 12 * 60 * 60
+
+KIND_SUPPLIERS = "fornecedores"
+KIND_CATEGORIES = "categorias"
+
+
+def format_age(seconds: Optional[float]) -> str:
+    """
+    Formata a idade do cache para exibição (ex: "2h 15min").
+    """
+    if seconds is None:
+        return "sem cache"
+    minutes = int(seconds // 60)
+    if minutes < 1:
+        return "menos de 1min"
+    hours, minutes = divmod(minutes, 60)
+    if hours >= 24:
+        days, hours = divmod(hours, 24)
+        return f"{days}d {hours}h"
+    if hours:
+        return f"{hours}h {minutes}min"
+    return f"{minutes}min"
+
+
+class OmieCatalogCache:
+    """
+    Armazena fornecedores e categorias da Omie em SQLite com TTL.
+    """
+    def __init__(self, db_path: str = DEFAULT_CACHE_PATH, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._init_db()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # Uma conexão por operação (o cache é usado também pela thread de atualização),
+        # com a transação confirmada e a conexão fechada ao sair do with
+        with closing(sqlite3.connect(self.db_path, timeout=30)) as conn, conn:
+            yield conn
+
+    def _init_db(self):
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS catalogos ("
+                " cliente TEXT NOT NULL,"
+                " app_key TEXT NOT NULL,"
+                " tipo TEXT NOT NULL,"
+                " atualizado_em REAL NOT NULL,"
+                " dados BLOB NOT NULL,"
+                " PRIMARY KEY (cliente, app_key, tipo))"
+            )
+
+    @staticmethod
+    def _key_hash(app_key: str) -> str:
+        return hashlib.sha256(str(app_key).encode('utf-8')).hexdigest()
+
+    def get(self, client: str, app_key: str, kind: str) -> Optional[Tuple[List[Dict], float]]:
+        """
+        Retorna (registros, idade em segundos) ou None se não houver cache.
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT atualizado_em, dados FROM catalogos WHERE cliente = ? AND app_key = ? AND tipo = ?",
+                (client, self._key_hash(app_key), kind)
+            ).fetchone()
+        if not row:
+            return None
+        updated_at, payload = row
+        try:
+            records = json.loads(zlib.decompress(payload).decode('utf-8'))
+        except (zlib.error, ValueError) as e:
+            print(f"Cache da Omie corrompido ({client}/{kind}): {e}")
+            return None
+        return records, max(0.0, time.time() - updated_at)
+
+    def put(self, client: str, app_key: str, kind: str, records: List[Dict]):
+        payload = zlib.compress(json.dumps(records, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO catalogos (cliente, app_key, tipo, atualizado_em, dados) VALUES (?, ?, ?, ?, ?)",
+                (client, self._key_hash(app_key), kind, time.time(), payload)
+            )
+
+    def _fetch_and_store(self, client: str, app_key: str, app_secret: str) -> Tuple[List[Dict], List[Dict]]:
+        # Fornecedores e categorias são buscados em paralelo, com as páginas em paralelo
+        suppliers, categories = fetch_catalogs(app_key, app_secret)
+        # Lista vazia costuma indicar falha na API; não sobrescreve o cache
+        if suppliers:
+            self.put(client, app_key, KIND_SUPPLIERS, suppliers)
+        if categories:
+            self.put(client, app_key, KIND_CATEGORIES, categories)
+        return suppliers, categories
+
+    def refresh_in_background(self, client: str, app_key: str, app_secret: str,
+                              on_done: Optional[Callable[[], None]] = None) -> bool:
+        """
+        Atualiza os cadastros em uma thread separada. Retorna False se já
+        houver uma atualização em andamento para o mesmo cliente.
+        """
+        key = (client, self._key_hash(app_key))
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+
+        def worker():
+            try:
+                self._fetch_and_store(client, app_key, app_secret)
+                print(f"Cache da Omie atualizado em segundo plano ({client}).")
+                if on_done:
+                    on_done()
+            except Exception as e:
+                print(f"Erro ao atualizar o cache da Omie ({client}): {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=worker, name=f"omie-cache-{client}", daemon=True).start()
+        return True
+
+    def load(self, client: str, app_key: str, app_secret: str,
+             force_refresh: bool = False,
+             background_refresh: bool = True) -> Tuple[List[Dict], List[Dict], Optional[float]]:
+        """
+        Retorna (fornecedores, categorias, idade do cache em segundos).
+        A idade é None quando os dados acabaram de ser buscados na Omie.
+        Com background_refresh=False, o cache vencido é atualizado na hora
+        (em lote, uma thread daemon morreria com o processo antes de gravar).
+        """
+        if not force_refresh:
+            cached_suppliers = self.get(client, app_key, KIND_SUPPLIERS)
+            cached_categories = self.get(client, app_key, KIND_CATEGORIES)
+            if cached_suppliers and cached_categories:
+                suppliers, suppliers_age = cached_suppliers
+                categories, categories_age = cached_categories
+                age = max(suppliers_age, categories_age)
+                if age <= self.ttl_seconds:
+                    return suppliers, categories, age
+                if background_refresh:
+                    self.refresh_in_background(client, app_key, app_secret)
+                    return suppliers, categories, age
+                try:
+                    fresh_suppliers, fresh_categories = self._fetch_and_store(client, app_key, app_secret)
+                except Exception as e:
+                    print(f"Erro ao atualizar o cache da Omie ({client}): {e}")
+                    return suppliers, categories, age
+                if fresh_suppliers and fresh_categories:
+                    return fresh_suppliers, fresh_categories, None
+                return suppliers, categories, age
+
+        suppliers, categories = self._fetch_and_store(client, app_key, app_secret)
+        return suppliers, categories, None
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cliente assíncrono da API da Omie.
+
+- Uma sessão HTTP (requests.Session com pool de conexões) por app_key,
+  reaproveitada entre chamadas e execuções.
+- Listagens paginadas: a primeira página informa o total de páginas e as
+  demais são buscadas em paralelo.
+- Limite de requisições por app_key (token bucket) e novas tentativas com
+  espera exponencial quando a Omie recusa por excesso de uso.
+
+As requisições usam requests em threads (asyncio.to_thread), sem depender
+de bibliotecas HTTP assíncronas. A URL base é configurável, o que permite
+apontar o cliente para um servidor local que repete respostas gravadas
+(benchmarks/omie_replay_server.py); com record_dir, as respostas reais são
+gravadas nesse formato.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import json
+import time
+import random
+import asyncio
+import threading
+from typing import List, Dict, Tuple, Optional
+
+from lazy_imports import lazy_import
+
+requests = lazy_import("requests")
+
+OMIE_BASE_URL = os.environ.get("OMIE_BASE_URL", "https://app.omie.com.br/api/v1/")
+
+# A Omie limita as requisições por app_key; 4/s com rajada de 4 fica abaixo do limite
+DEFAULT_RATE = 4.0
+DEFAULT_BURST = 4
+DEFAULT_CONCURRENCY = 4
+DEFAULT_PAGE_SIZE = 500
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 60.0
+REQUEST_TIMEOUT = 60
+
+ENDPOINT_CLIENTES = "geral/clientes/"
+ENDPOINT_CATEGORIAS = "geral/categorias/"
+
+_no_records_pattern = re.compile(r'n[ãa]o existem registros', re.IGNORECASE)
+_wait_seconds_pattern = re.compile(r'(\d+)\s*segundos', re.IGNORECASE)
+_throttle_pattern = re.compile(r'redundante|bloquead|limite|MISUSE', re.IGNORECASE)
+
+
+class OmieError(Exception):
+    """
+    Erro retornado pela API da Omie (ou falha de comunicação).
+    """
+
+
+class _RetryableError(OmieError):
+    def __init__(self, message: str, wait: Optional[float] = None):
+        super().__init__(message)
+        self.wait = wait
+
+
+class TokenBucket:
+    """
+    Limitador de taxa compartilhado entre threads e loops asyncio.
+    Cada chamada reserva uma ficha e devolve quanto tempo esperar por ela.
+    """
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        # Ninguém usa a app_key antes deste instante (ver pause)
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self.paused_until)
+            # Durante a pausa o balde não se enche: updated fica no fim dela
+            if start > self.updated:
+                self.tokens = min(self.capacity, self.tokens + (start - self.updated) * self.rate)
+                self.updated = start
+            self.tokens -= 1
+            wait = start - now
+            if self.tokens < 0:
+                wait += -self.tokens / self.rate
+            return wait
+
+    def pause(self, seconds: float):
+        """
+        Ninguém usa a app_key pelos próximos segundos. Várias recusas ao
+        mesmo tempo compartilham uma única pausa (vale o prazo mais distante).
+        """
+        with self._lock:
+            deadline = time.monotonic() + seconds
+            if deadline > self.paused_until:
+                self.paused_until = deadline
+                self.tokens = min(self.tokens, 0.0)
+                self.updated = max(self.updated, deadline)
+
+    async def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+_sessions: Dict[str, requests.Session] = {}
+_limiters: Dict[str, TokenBucket] = {}
+_registry_lock = threading.Lock()
+
+
+def get_session(app_key: str, pool_size: int = DEFAULT_CONCURRENCY) -> requests.Session:
+    """
+    Sessão HTTP (com pool de conexões) da app_key, criada uma única vez.
+    """
+    with _registry_lock:
+        session = _sessions.get(app_key)
+        if session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[app_key] = session
+        return session
+
+
+def get_limiter(app_key: str, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST) -> TokenBucket:
+    with _registry_lock:
+        limiter = _limiters.get(app_key)
+        if limiter is None:
+            limiter = _limiters[app_key] = TokenBucket(rate, burst)
+        return limiter
+
+
+class OmieClient:
+    """
+    Cliente de uma app_key da Omie.
+    """
+    def __init__(self, app_key: str, app_secret: str, base_url: str = OMIE_BASE_URL,
+                 concurrency: int = DEFAULT_CONCURRENCY, max_retries: int = MAX_RETRIES,
+                 record_dir: Optional[str] = None):
+        self.app_key = app_key
+        self.app_secret = app_secret
+        self.base_url = base_url.rstrip('/') + '/'
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.record_dir = record_dir
+        self.session = get_session(app_key, concurrency)
+        self.limiter = get_limiter(app_key)
+
+    def _post(self, endpoint: str, payload: Dict) -> Dict:
+        try:
+            response = self.session.post(self.base_url + endpoint, json=payload, timeout=REQUEST_TIMEOUT)
+        except requests.RequestException as e:
+            raise _RetryableError(f"Falha de comunicação com a Omie: {e}")
+
+        try:
+            data = response.json()
+        except ValueError:
+            data = {}
+        fault = data.get('faultstring', '') if isinstance(data, dict) else ''
+
+        if response.status_code == 200 and not fault:
+            return data
+        if _no_records_pattern.search(fault):
+            return {}
+        if response.status_code == 429 or (response.status_code >= 500 and (not fault or _throttle_pattern.search(fault))):
+            retry_after = response.headers.get('Retry-After')
+            wait_match = _wait_seconds_pattern.search(fault)
+            wait = float(retry_after) if retry_after and retry_after.isdigit() else (
+                float(wait_match.group(1)) if wait_match else None)
+            raise _RetryableError(fault or f"HTTP {response.status_code}", wait)
+        raise OmieError(fault or f"HTTP {response.status_code}")
+
+    def _record(self, endpoint: str, call: str, param: Dict, data: Dict):
+        os.makedirs(self.record_dir, exist_ok=True)
+        name = f"{endpoint.strip('/').replace('/', '_')}_{call}_p{param.get('pagina', 1)}.json"
+        with open(os.path.join(self.record_dir, name), 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    async def call(self, endpoint: str, call: str, param: Dict) -> Dict:
+        """
+        Executa uma chamada da API, respeitando o limite da app_key.
+        """
+        payload = {"call": call, "app_key": self.app_key, "app_secret": self.app_secret, "param": [param]}
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire()
+            try:
+                data = await asyncio.to_thread(self._post, endpoint, payload)
+                if self.record_dir:
+                    self._record(endpoint, call, param, data)
+                return data
+            except _RetryableError as e:
+                if attempt == self.max_retries:
+                    raise OmieError(str(e))
+                wait = e.wait or min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.0)
+                print(f"Omie ({call}) recusou a requisição: {e}. Nova tentativa em {wait:.1f}s.")
+                # A pausa vale para todas as chamadas da app_key; o acquire() seguinte espera por ela
+                self.limiter.pause(wait)
+        raise OmieError(f"Falha em {call}")
+
+    async def list_all(self, endpoint: str, call: str, list_key: str,
+                       page_size: int = DEFAULT_PAGE_SIZE, extra_param: Optional[Dict] = None) -> List[Dict]:
+        """
+        Busca todas as páginas de uma listagem. A primeira página informa o
+        total; as demais são buscadas em paralelo e reunidas em ordem.
+        """
+        def param(page: int) -> Dict:
+            return {"pagina": page, "registros_por_pagina": page_size, **(extra_param or {})}
+
+        first = await self.call(endpoint, call, param(1))
+        records = list(first.get(list_key, []))
+        total_pages = int(first.get('total_de_paginas') or 1)
+        if total_pages <= 1:
+            return records
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(page: int) -> List[Dict]:
+            async with semaphore:
+                data = await self.call(endpoint, call, param(page))
+                return data.get(list_key, [])
+
+        pages = await asyncio.gather(*(fetch(page) for page in range(2, total_pages + 1)))
+        for page_records in pages:
+            records.extend(page_records)
+        return records
+
+    async def list_clientes(self) -> List[Dict]:
+        return await self.list_all(ENDPOINT_CLIENTES, "ListarClientes", "clientes_cadastro",
+                                   extra_param={"apenas_importado_api": "N"})
+
+    async def list_categorias(self) -> List[Dict]:
+        return await self.list_all(ENDPOINT_CATEGORIAS, "ListarCategorias", "categoria_cadastro")
+
+
+def fetch_catalogs(app_key: str, app_secret: str, **client_options) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Busca fornecedores (clientes da Omie) e categorias ao mesmo tempo.
+    Em caso de erro, a lista correspondente volta vazia.
+    """
+    async def run():
+        client = OmieClient(app_key, app_secret, **client_options)
+        results = await asyncio.gather(client.list_clientes(), client.list_categorias(), return_exceptions=True)
+        catalogs = []
+        for name, result in zip(("fornecedores", "categorias"), results):
+            if isinstance(result, Exception):
+                print(f"Erro ao buscar {name} na Omie: {result}")
+                result = []
+            catalogs.append(result)
+        return tuple(catalogs)
+
+    return asyncio.run(run())
+
+
+def _run_listing(app_key: str, app_secret: str, method: str, name: str) -> List[Dict]:
+    try:
+        return asyncio.run(getattr(OmieClient(app_key, app_secret), method)())
+    except OmieError as e:
+        print(f"Erro ao buscar {name} na Omie: {e}")
+        return []
+
+
+def get_clientes_as_fornecedores(app_key: str, app_secret: str) -> List[Dict]:
+    return _run_listing(app_key, app_secret, "list_clientes", "fornecedores")
+
+
+def get_categorias(app_key: str, app_secret: str) -> List[Dict]:
+    return _run_listing(app_key, app_secret, "list_categorias", "categorias")
@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Extração de texto de PDFs, com OCR apenas nas páginas que precisam.
+
+Cada página é classificada individualmente: páginas com camada de texto usam
+o texto do mecanismo escolhido; páginas só com imagem vão para o OCR. O OCR renderiza
+as páginas com PyMuPDF e as reconhece com Tesseract em um pool de processos,
+uma página por tarefa. O texto volta na ordem original das páginas e uma
+falha em uma página não interrompe as demais.
+
+Há dois mecanismos para a camada de texto: o PyMuPDF (rápido; as palavras
+são reagrupadas em linhas pela posição vertical, como faz o pdfplumber) e o
+pdfplumber, que também serve de reserva quando o PyMuPDF falha em uma
+página. Cada banco escolhe o seu em bank_profiles (text_engine).
+
+No OCR, o pixmap do PyMuPDF (em tons de cinza) vai direto para a imagem do
+Pillow, sem codificar e decodificar um PNG. Cada página é lida primeiro em
+OCR_PROBE_DPI; se a confiança média do Tesseract ficar abaixo de
+OCR_MIN_CONFIDENCE, só a região da tabela de transações (as linhas com data
+e valor encontradas na primeira leitura) é renderizada e lida de novo na
+resolução completa, e o restante da página fica com a primeira leitura.
+
+As páginas são geradas uma a uma (iter_pages): o parser consome o texto
+enquanto a extração avança e, ao parar de consumir (ex: depois do total da
+fatura), as páginas restantes nunca são extraídas nem passam pelo OCR.
+
+As funções executadas nos processos filhos ficam neste módulo (e não em
+main.py) para que possam ser importadas sem abrir a interface.
+"""
+
+import os
+import re
+import time
+from collections import deque
+from contextlib import closing
+from concurrent.futures import ProcessPoolExecutor, Future
+from typing import List, Dict, Tuple, Optional, Callable, Iterator, NamedTuple
+
+from lazy_imports import lazy_import
+from text_cache import PageTextCache, file_hash
+
+fitz = lazy_import("fitz")  # PyMuPDF
+pdfplumber = lazy_import("pdfplumber")
+pytesseract = lazy_import("pytesseract")
+Image = lazy_import("PIL.Image")
+
+DEFAULT_OCR_DPI = 300
+DEFAULT_OCR_LANG = 'por'
+
+# Primeira leitura do OCR em resolução menor; a resolução completa só é usada,
+# na região da tabela, quando a confiança média das palavras fica abaixo do mínimo
+OCR_PROBE_DPI = 200
+OCR_MIN_CONFIDENCE = 80
+# Folga (em pontos) acima e abaixo das linhas de transação na região da tabela
+OCR_REGION_MARGIN = 12
+
+# Páginas com menos caracteres que isso (e com imagem) são tratadas como escaneadas
+MIN_PAGE_TEXT_CHARS = 30
+
+ENGINE_TEXT = 'pdfplumber'
+ENGINE_PYMUPDF = 'pymupdf'
+ENGINE_OCR = 'tesseract'
+
+# Mecanismos da camada de texto aceitos por iter_pages
+TEXT_ENGINES = (ENGINE_PYMUPDF, ENGINE_TEXT)
+DEFAULT_TEXT_ENGINE = ENGINE_PYMUPDF
+
+# Palavras com topo a até essa distância (em pontos) ficam na mesma linha (padrão do pdfplumber)
+LINE_Y_TOLERANCE = 3
+
+# Documento aberto uma vez por processo do pool
+_worker_document = None
+
+# Linha de transação na leitura de OCR: uma data (dd/mm) e, depois dela, um valor (1.234,56)
+_table_line = re.compile(r'\d{1,2}/\d{1,2}.*\d,\d{2}')
+
+
+class OcrStats(NamedTuple):
+    """
+    Medições do OCR de uma página.
+    """
+    render_seconds: float
+    ocr_seconds: float
+    dpi: int  # resolução da leitura final
+    confidence: float  # confiança média (0 a 100) da primeira leitura
+    image_bytes: int  # maior imagem renderizada (pico de memória da página)
+    region: bool  # True se a leitura em resolução completa ficou só na região da tabela
+
+    def counts(self) -> Dict:
+        return {"renderizacao_segundos": round(self.render_seconds, 4), "ocr_segundos": round(self.ocr_seconds, 4),
+                "dpi": self.dpi, "confianca": round(self.confidence, 1),
+                "imagem_mb": round(self.image_bytes / 1024 / 1024, 2), "regiao_tabela": self.region}
+
+
+class OcrLine(NamedTuple):
+    top: float  # em pontos do PDF
+    bottom: float
+    text: str
+    confidences: List[float]
+
+    @property
+    def middle(self) -> float:
+        return (self.top + self.bottom) / 2
+
+
+def default_ocr_workers() -> int:
+    """
+    Número padrão de processos de OCR: todos os núcleos menos um.
+    """
+    return max(1, (os.cpu_count() or 1) - 1)
+
+
+def _render(page, dpi: int, clip=None):
+    """
+    Renderiza a página (ou o trecho clip) em tons de cinza e devolve
+    (imagem do Pillow, tamanho do buffer). O buffer do pixmap é passado
+    direto ao Pillow, sem PNG no meio.
+    """
+    pix = page.get_pixmap(matrix=fitz.Matrix(dpi / 72, dpi / 72), colorspace=fitz.csGRAY, alpha=False, clip=clip)
+    return Image.frombytes("L", (pix.width, pix.height), pix.samples_mv), len(pix.samples_mv)
+
+
+def _ocr_lines(image, lang: str, dpi: int, offset: float = 0.0) -> List[OcrLine]:
+    """
+    Linhas reconhecidas pelo Tesseract, na ordem de leitura, com a posição
+    vertical convertida para pontos do PDF (offset = topo do trecho renderizado).
+    """
+    data = pytesseract.image_to_data(image, lang=lang, output_type=pytesseract.Output.DICT)
+    scale = 72 / dpi
+    lines: Dict[Tuple[int, int, int], list] = {}
+    for i, word in enumerate(data['text']):
+        if not word or not word.strip():
+            continue
+        key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+        top = offset + data['top'][i] * scale
+        bottom = top + data['height'][i] * scale
+        entry = lines.get(key)
+        if entry is None:
+            lines[key] = [top, bottom, [word], [float(data['conf'][i])]]
+        else:
+            entry[0] = min(entry[0], top)
+            entry[1] = max(entry[1], bottom)
+            entry[2].append(word)
+            entry[3].append(float(data['conf'][i]))
+    return [OcrLine(top, bottom, ' '.join(words), confidences) for top, bottom, words, confidences in lines.values()]
+
+
+def _mean_confidence(lines: List[OcrLine]) -> float:
+    confidences = [c for line in lines for c in line.confidences if c >= 0]
+    return sum(confidences) / len(confidences) if confidences else 0.0
+
+
+def _table_region(lines: List[OcrLine], page_rect):
+    """
+    Faixa da página (largura inteira) com as linhas de transação, ou None
+    se nenhuma foi reconhecida. A faixa é alargada para não cortar ao meio
+    nenhuma linha da primeira leitura: cada linha fica inteira dentro ou
+    inteira fora dela.
+    """
+    rows = [line for line in lines if _table_line.search(line.text)]
+    if not rows:
+        return None
+    top = min(line.top for line in rows) - OCR_REGION_MARGIN
+    bottom = max(line.bottom for line in rows) + OCR_REGION_MARGIN
+    for line in lines:
+        if line.top < top < line.bottom:
+            top = line.top
+        if line.top < bottom < line.bottom:
+            bottom = line.bottom
+    return fitz.Rect(page_rect.x0, max(page_rect.y0, top - 1), page_rect.x1, min(page_rect.y1, bottom + 1))
+
+
+def _render_and_ocr(document, page_num: int, dpi: int, lang: str) -> Tuple[str, OcrStats]:
+    """
+    OCR de uma página escaneada. A primeira leitura, em OCR_PROBE_DPI, é da
+    página inteira: numa página sem camada de texto não há como saber onde
+    fica a tabela antes de lê-la, e os parsers precisam do que está fora
+    dela (o vencimento que dá o ano da fatura, os títulos de seção da Caixa,
+    a linha de fim do extrato, o texto usado no reconhecimento do banco).
+    Só a releitura em resolução completa fica restrita à região da tabela.
+    """
+    page = document[page_num]
+    probe_dpi = min(OCR_PROBE_DPI, dpi)
+
+    start = time.perf_counter()
+    image, image_bytes = _render(page, probe_dpi)
+    render_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    lines = _ocr_lines(image, lang, probe_dpi)
+    ocr_seconds = time.perf_counter() - start
+    del image
+    confidence = _mean_confidence(lines)
+    if probe_dpi >= dpi or confidence >= OCR_MIN_CONFIDENCE:
+        text = '\n'.join(line.text for line in lines)
+        return text, OcrStats(render_seconds, ocr_seconds, probe_dpi, confidence, image_bytes, False)
+
+    # Leitura incerta: a tabela (ou a página, se nenhuma linha de transação foi reconhecida) é lida de novo
+    region = _table_region(lines, page.rect)
+    start = time.perf_counter()
+    image, full_bytes = _render(page, dpi, clip=region)
+    render_seconds += time.perf_counter() - start
+    start = time.perf_counter()
+    table_lines = _ocr_lines(image, lang, dpi, offset=region.y0 if region else 0.0)
+    ocr_seconds += time.perf_counter() - start
+    del image
+    if region is not None:
+        # Cabeçalho e rodapé (ex: vencimento da fatura) ficam com a primeira leitura
+        table_lines = ([line for line in lines if line.middle < region.y0] + table_lines +
+                       [line for line in lines if line.middle > region.y1])
+    text = '\n'.join(line.text for line in table_lines)
+    return text, OcrStats(render_seconds, ocr_seconds, dpi, confidence, max(image_bytes, full_bytes),
+                          region is not None)
+
+
+def _init_worker(file_path: str):
+    global _worker_document
+    _worker_document = fitz.open(file_path)
+
+
+def _ocr_page_worker(page_num: int, dpi: int, lang: str) -> Tuple[int, str, Optional[str], float, Optional[OcrStats]]:
+    start = time.perf_counter()
+    try:
+        text, stats = _render_and_ocr(_worker_document, page_num, dpi, lang)
+        return page_num, text, None, time.perf_counter() - start, stats
+    except Exception as e:
+        return page_num, "", str(e), time.perf_counter() - start, None
+
+
+class PageText(NamedTuple):
+    """
+    Texto de uma página e o mecanismo que o produziu.
+    """
+    page_number: int  # índice a partir de 0
+    text: str
+    engine: str
+    seconds: float = 0.0  # tempo de extração (0 quando veio do cache)
+    ocr: Optional[OcrStats] = None  # medições do OCR (só em páginas recém-reconhecidas)
+
+
+def _needs_ocr(text: str, has_images: bool) -> bool:
+    return len(text.strip()) < MIN_PAGE_TEXT_CHARS and has_images
+
+
+def _engine_settings(engine: str, dpi: int, lang: str) -> str:
+    if engine != ENGINE_OCR:
+        return ""
+    return f"{dpi}dpi:{lang}:prova{OCR_PROBE_DPI}:conf{OCR_MIN_CONFIDENCE}"
+
+
+def _document_settings(dpi: int, lang: str, text_engine: str = ENGINE_TEXT) -> str:
+    settings = f"{dpi}dpi:{lang}:min{MIN_PAGE_TEXT_CHARS}"
+    # O pdfplumber mantém a chave anterior, para não invalidar o cache existente
+    return settings if text_engine == ENGINE_TEXT else f"{settings}:{text_engine}"
+
+
+def pymupdf_page_text(page) -> str:
+    """
+    Texto de uma página do PyMuPDF em linhas, no formato do
+    extract_text() do pdfplumber: palavras com o topo na mesma altura
+    (até LINE_Y_TOLERANCE) formam uma linha, da esquerda para a direita,
+    separadas por um espaço.
+    """
+    words = page.get_text("words")
+    words.sort(key=lambda w: (w[1], w[0]))
+    lines = []
+    current: List[Tuple[float, str]] = []
+    line_top = None
+    for x0, top, _, _, word, *_ in words:
+        if line_top is None or top - line_top > LINE_Y_TOLERANCE:
+            if current:
+                lines.append(' '.join(w for _, w in sorted(current)))
+            current = []
+            line_top = top
+        current.append((x0, word))
+    if current:
+        lines.append(' '.join(w for _, w in sorted(current)))
+    return '\n'.join(lines)
+
+
+class _PdfplumberReader:
+    """
+    Camada de texto pelo pdfplumber.
+    """
+    def __init__(self, file_path: str):
+        self._pdf = pdfplumber.open(file_path)
+
+    def __len__(self) -> int:
+        return len(self._pdf.pages)
+
+    def page_text(self, page_num: int) -> Tuple[str, bool, str]:
+        """
+        (texto, se a página tem imagens, mecanismo usado).
+        """
+        page = self._pdf.pages[page_num]
+        try:
+            return page.extract_text() or "", bool(page.images), ENGINE_TEXT
+        finally:
+            # Libera os objetos de layout da página: a memória fica limitada às páginas à frente
+            page.flush_cache()
+
+    def close(self):
+        self._pdf.close()
+
+
+class _PyMuPDFReader:
+    """
+    Camada de texto pelo PyMuPDF; páginas em que ele falha vão para o pdfplumber.
+    """
+    def __init__(self, file_path: str):
+        self._file_path = file_path
+        self._document = fitz.open(file_path)
+        self._fallback: Optional[_PdfplumberReader] = None
+
+    def __len__(self) -> int:
+        return len(self._document)
+
+    def page_text(self, page_num: int) -> Tuple[str, bool, str]:
+        try:
+            page = self._document[page_num]
+            return pymupdf_page_text(page), bool(page.get_images()), ENGINE_PYMUPDF
+        except Exception as e:
+            print(f"PyMuPDF falhou na página {page_num + 1} ({e}); usando o pdfplumber.")
+            if self._fallback is None:
+                self._fallback = _PdfplumberReader(self._file_path)
+            return self._fallback.page_text(page_num)
+
+    def close(self):
+        self._document.close()
+        if self._fallback is not None:
+            self._fallback.close()
+
+
+_TEXT_READERS = {
+    ENGINE_TEXT: _PdfplumberReader,
+    ENGINE_PYMUPDF: _PyMuPDFReader,
+}
+
+
+def iter_pages(file_path: str, dpi: int = DEFAULT_OCR_DPI, lang: str = DEFAULT_OCR_LANG,
+               workers: Optional[int] = None,
+               progress: Optional[Callable[[int, int, int], None]] = None,
+               cache: Optional[PageTextCache] = None,
+               text_engine: str = DEFAULT_TEXT_ENGINE) -> Iterator[PageText]:
+    """
+    Gera o texto das páginas do PDF, em ordem, decidindo página a página
+    entre a camada de texto (lida por text_engine) e o OCR.
+
+    Quem consome pode parar a qualquer momento (break ou close()): as
+    páginas seguintes não são extraídas e o OCR ainda pendente é cancelado.
+    Páginas com texto são lidas uma de cada vez; com OCR em andamento, até
+    `workers` páginas à frente são classificadas e enviadas ao pool, para
+    manter os processos ocupados.
+
+    progress(entregues, total, página) é chamado a cada página entregue;
+    uma exceção lançada por ele interrompe a extração. Com cache, as
+    páginas já extraídas (mesmo conteúdo e mesma configuração de OCR) são
+    devolvidas sem nova extração nem OCR.
+    """
+    if text_engine not in _TEXT_READERS:
+        raise ValueError(f"Mecanismo de texto desconhecido: {text_engine}")
+    digest = None
+    engines: List[str] = []
+    delivered = 0
+    if cache is not None:
+        digest = file_hash(file_path)
+        known = cache.get_engines(digest, _document_settings(dpi, lang, text_engine))
+        if known:
+            # Documento lido por completo antes: entrega do cache enquanto as páginas existirem lá
+            for page_num, engine in enumerate(known):
+                text = cache.get_page(digest, page_num, engine, _engine_settings(engine, dpi, lang))
+                if text is None:
+                    break
+                engines.append(engine)
+                delivered += 1
+                if progress:
+                    progress(delivered, len(known), page_num)
+                yield PageText(page_num, text, engine)
+            if delivered == len(known):
+                print(f"Texto do extrato recuperado do cache ({delivered} página(s)).")
+                return
+
+    workers = workers or default_ocr_workers()
+    executor = None
+    ocr_document = None
+    pending = deque()  # (página, PageText pronto ou Future do OCR, se é texto novo)
+    total = 0
+    try:
+        with closing(_TEXT_READERS[text_engine](file_path)) as reader:
+            total = len(reader)
+            next_page = delivered
+
+            def ocr_in_flight() -> bool:
+                return any(isinstance(item, Future) for _, item, _ in pending)
+
+            while next_page < total or pending:
+                while next_page < total and (not pending or (ocr_in_flight() and len(pending) < workers)):
+                    page_num = next_page
+                    next_page += 1
+                    start = time.perf_counter()
+                    item = _cached_page(cache, digest, page_num, dpi, lang, text_engine)
+                    fresh = item is None
+                    if fresh:
+                        text, has_images, engine = reader.page_text(page_num)
+                        if not _needs_ocr(text, has_images):
+                            item = PageText(page_num, text, engine, time.perf_counter() - start)
+                        elif workers > 1:
+                            if executor is None:
+                                print("Página sem texto encontrada. Aplicando OCR...")
+                                executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                               initargs=(file_path,))
+                            item = executor.submit(_ocr_page_worker, page_num, dpi, lang)
+                        else:
+                            if ocr_document is None:
+                                print("Página sem texto encontrada. Aplicando OCR...")
+                                ocr_document = fitz.open(file_path)
+                            start = time.perf_counter()
+                            try:
+                                (text, stats), error = _render_and_ocr(ocr_document, page_num, dpi, lang), None
+                            except Exception as e:
+                                text, stats, error = "", None, str(e)
+                            item = _ocr_result(page_num, text, error, time.perf_counter() - start, stats)
+                    pending.append((page_num, item, fresh))
+
+                page_num, item, fresh = pending.popleft()
+                if isinstance(item, Future):
+                    try:
+                        item = _ocr_result(*item.result())
+                    except Exception as e:
+                        # Falha do processo filho (ex: processo encerrado) afeta só a página
+                        item = _ocr_result(page_num, "", str(e))
+                if cache is not None and fresh:
+                    cache.put_page(digest, page_num, item.engine, _engine_settings(item.engine, dpi, lang), item.text)
+                engines.append(item.engine)
+                delivered += 1
+                if progress:
+                    progress(delivered, total, page_num)
+                yield item
+    except GeneratorExit:
+        if delivered < total:
+            print(f"Leitura do PDF encerrada na página {delivered} de {total}; as demais não foram extraídas.")
+        raise
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if ocr_document is not None:
+            ocr_document.close()
+
+    if cache is not None:
+        cache.put_engines(digest, _document_settings(dpi, lang, text_engine), engines)
+
+
+def _ocr_result(page_num: int, text: str, error: Optional[str], seconds: float = 0.0,
+                stats: Optional[OcrStats] = None) -> PageText:
+    if error:
+        print(f"Erro no OCR da página {page_num + 1}: {error}")
+    return PageText(page_num, text, ENGINE_OCR, seconds, stats)
+
+
+def _cached_page(cache: Optional[PageTextCache], digest: Optional[str], page_num: int,
+                 dpi: int, lang: str, text_engine: str) -> Optional[PageText]:
+    # Páginas gravadas por uma leitura interrompida: o mecanismo é o da entrada encontrada
+    if cache is None:
+        return None
+    for engine in (text_engine, ENGINE_OCR):
+        text = cache.get_page(digest, page_num, engine, _engine_settings(engine, dpi, lang))
+        if text is not None:
+            return PageText(page_num, text, engine)
+    return None
+
+
+def extract_pages(file_path: str, dpi: int = DEFAULT_OCR_DPI, lang: str = DEFAULT_OCR_LANG,
+                  workers: Optional[int] = None,
+                  progress: Optional[Callable[[int, int, int], None]] = None,
+                  cache: Optional[PageTextCache] = None,
+                  text_engine: str = DEFAULT_TEXT_ENGINE) -> List[PageText]:
+    """
+    Extrai o texto de todas as páginas do PDF (ver iter_pages).
+    """
+    return list(iter_pages(file_path, dpi=dpi, lang=lang, workers=workers, progress=progress, cache=cache,
+                           text_engine=text_engine))
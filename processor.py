@@ -0,0 +1,680 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Processamento dos extratos: leitura (OFX, PDF, Excel), conciliação com a
+Omie e gravação na planilha de contas a pagar.
+
+Este módulo não depende do tkinter, para poder ser usado tanto pela
+interface (main.py) quanto pela linha de comando (cli.py). Avisos e erros
+são enviados a ExtractProcessor.notify; a interface o troca por caixas de
+mensagem.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sys
+import json
+import time
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from contextlib import nullcontext, closing
+from datetime import datetime, date
+from typing import List, Dict, Optional, Callable, Iterable, Iterator, Tuple, Union, Any
+
+from lazy_imports import lazy_import
+from omie_cache import OmieCatalogCache
+from supplier_index import SupplierIndex
+from reconciliation_memory import ReconciliationMemory
+from pdf_extraction import iter_pages, default_ocr_workers, ENGINE_OCR, DEFAULT_TEXT_ENGINE
+from text_cache import PageTextCache
+from ofx_parser import iter_ofx_file
+from excel_writer import write_transactions
+from transaction_ledger import TransactionLedger, LedgerKey
+from bank_detection import detect_bank
+from run_trace import RunTrace, Span
+from bank_profiles import (BANK_PROFILES, PROFILES_BY_NAME, CAIXA, CAIXA_SECTIONS, SICOOB,
+                           parse_lines, parse_value, format_statement_date, statement_lines)
+from frame_parsers import parse_caixa_excel
+from transaction_records import Transaction, DEFAULT_CATEGORY, Row, from_rows, to_cents
+
+pd = lazy_import("pandas")
+
+
+# Planilha modelo e pasta onde as planilhas geradas são salvas
+DEFAULT_BASE_FILE = "C:\\Bitrix24\\Aurora Hotel\\Automação\\Omie_Contas_Pagar_v1_1_5.xlsx"
+DEFAULT_OUTPUT_DIR = os.path.join(os.path.expanduser('~'), 'Desktop')
+
+
+# Faixas da barra de progresso (fração do total) de cada etapa
+PROGRESS_EXTRACTION = (0.0, 0.65)
+PROGRESS_OMIE = 0.7
+PROGRESS_MATCHING = (0.75, 0.95)
+PROGRESS_REPORT_EVERY = 50  # transações entre avisos de progresso da conciliação
+REJECTED_ROWS_SHOWN = 20  # linhas com data inválida listadas no aviso
+
+
+# Valor de banco que pede o reconhecimento automático pelo arquivo
+AUTO_DETECT = "Automático"
+
+# Formato de leitura pela extensão do arquivo (as demais seguem o banco)
+FORMATS_BY_EXTENSION = {'.ofx': "OFX", '.pdf': "PDF", '.xls': "Excel", '.xlsx': "Excel"}
+
+# Carregamento antecipado dos cadastros: validade do resultado (segundos) e
+# intervalo entre as verificações de cancelamento enquanto ele é aguardado
+PREFETCH_MAX_AGE = 10 * 60
+PREFETCH_WAIT_STEP = 0.2
+
+
+class ProcessingCancelled(Exception):
+    """
+    Processamento interrompido a pedido do usuário.
+    """
+
+
+class CatalogPrefetch:
+    """
+    Carregamento antecipado das credenciais e dos cadastros da Omie de um
+    cliente, iniciado ao selecioná-lo. future recebe (fornecedores,
+    categorias, idade do cache) ou a exceção da falha.
+    """
+    def __init__(self, client: str, force_refresh: bool):
+        self.client = client
+        self.force_refresh = force_refresh
+        self.future: Future = Future()
+        self.finished_at: Optional[float] = None
+
+    def covers(self, client: str, force_refresh: bool) -> bool:
+        """
+        Se este carregamento serve para o cliente pedido: uma busca forçada
+        serve também para uma comum, mas não o contrário, e um resultado
+        antigo é descartado.
+        """
+        if client != self.client or (force_refresh and not self.force_refresh):
+            return False
+        return self.finished_at is None or time.time() - self.finished_at <= PREFETCH_MAX_AGE
+
+
+def print_notification(level: str, title: str, message: str):
+    """
+    Notificação padrão: escreve o aviso na saída de erro.
+    """
+    print(f"[{level.upper()}] {title}: {message}", file=sys.stderr)
+
+
+class ExtractProcessor:
+    """
+    Classe principal para processar extratos de cartão de crédito
+    e conciliar com a Omie.
+    """
+    def __init__(self):
+        self.supported_banks = ["Sicoob", "Banco do Brasil", "Caixa", "Itaú", "Santander"]
+        self.file_formats = {
+            "Sicoob": "OFX",
+            "Banco do Brasil": "PDF",
+            "Caixa": "PDF",
+            "Itaú": "PDF",
+            "Santander": "PDF"  # Alterado de OFX para PDF
+        }
+        self.omie_suppliers = []
+        self.omie_categories = []
+        self._supplier_index = None
+        self._indexed_suppliers = None
+        self.catalog_cache = OmieCatalogCache()
+        self.ledger = TransactionLedger()
+        self.catalog_age = None
+        self.memory = None
+        self.ocr_workers = default_ocr_workers()
+        self.last_page_engines: List[str] = []
+        self.last_output_path: Optional[str] = None
+        self.last_bank: Optional[str] = None
+        # Linhas do último extrato com data inexistente, que não viraram transação
+        self.rejected_rows: List[Row] = []
+        self.base_file = DEFAULT_BASE_FILE
+        self.output_dir = DEFAULT_OUTPUT_DIR
+        self.text_cache = PageTextCache()
+        # Mecanismo da camada de texto por banco, no lugar do definido no perfil
+        # (ou para todos os bancos, com a chave "*")
+        self.text_engines: Dict[str, str] = {}
+        # Medição das etapas da execução atual (ver start_trace); None = sem medição
+        self.trace: Optional[RunTrace] = None
+        # Perfil cProfile/tracemalloc: None segue a variável de ambiente AUTOMACAO_PERFIL
+        self.profile: Optional[bool] = None
+        # Chamado com (mensagem, fração concluída) durante etapas demoradas
+        self.progress_callback: Optional[Callable[[str, float], None]] = None
+        # Chamado com (nível, título, mensagem): "info", "warning" ou "error"
+        self.notify: Callable[[str, str, str], None] = print_notification
+        # Sinalizado por cancel(); verificado a cada aviso de progresso
+        self.cancel_event = threading.Event()
+        # Último carregamento antecipado dos cadastros (ver prefetch_catalogs)
+        self._prefetch: Optional[CatalogPrefetch] = None
+        self._prefetch_lock = threading.Lock()
+
+    def _report_progress(self, message: str, fraction: float):
+        # Cada aviso de progresso é também um ponto de cancelamento
+        self._check_cancelled()
+        print(message)
+        if self.progress_callback:
+            self.progress_callback(message, fraction)
+
+    def cancel(self):
+        """
+        Pede a interrupção do processamento em andamento (pode ser chamado
+        de outra thread). O processamento termina com ProcessingCancelled.
+        """
+        self.cancel_event.set()
+
+    def _check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise ProcessingCancelled("Processamento cancelado.")
+
+    def _notify(self, level: str, title: str, message: str):
+        self.notify(level, title, message)
+
+    def start_trace(self, label: str) -> RunTrace:
+        """
+        Inicia a medição de uma execução. Quem chamou encerra com trace.finish().
+        """
+        self.trace = RunTrace(label, profile=self.profile)
+        return self.trace
+
+    def _span(self, name: str, **counts):
+        if self.trace is None:
+            return nullcontext(Span(name, 0.0, counts))
+        return self.trace.span(name, **counts)
+
+    @staticmethod
+    def _read_credentials(client_name: str) -> Dict:
+        file_path = f"credenciais/{client_name.replace(' ', '_').lower()}.json"
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _load_credentials(self, client_name: str) -> Optional[Dict]:
+        try:
+            return self._read_credentials(client_name)
+        except FileNotFoundError:
+            self._notify("error", "Erro de Credenciais", f"Arquivo de credenciais para '{client_name}' não encontrado.")
+            return None
+        except json.JSONDecodeError:
+            self._notify("error", "Erro de Credenciais", "Arquivo de credenciais inválido.")
+            return None
+    
+    def prefetch_catalogs(self, client: str, force_refresh: bool = False) -> CatalogPrefetch:
+        """
+        Carrega em segundo plano as credenciais e os cadastros da Omie do
+        cliente, para o processamento encontrá-los prontos. Se já houver um
+        carregamento em andamento (ou recente) que sirva, ele é reaproveitado.
+        """
+        with self._prefetch_lock:
+            current = self._prefetch
+            if current is not None and current.covers(client, force_refresh):
+                return current
+            prefetch = CatalogPrefetch(client, force_refresh)
+            self._prefetch = prefetch
+        threading.Thread(target=self._run_prefetch, args=(prefetch,), name=f"omie-prefetch-{client}",
+                         daemon=True).start()
+        return prefetch
+
+    def _run_prefetch(self, prefetch: CatalogPrefetch):
+        if not prefetch.future.set_running_or_notify_cancel():
+            return
+        try:
+            credentials = self._read_credentials(prefetch.client)
+            app_key, app_secret = credentials.get("app_key"), credentials.get("app_secret")
+            if not all([app_key, app_secret]):
+                raise ValueError("Credenciais de API incompletas.")
+            result = self.catalog_cache.load(prefetch.client, app_key, app_secret,
+                                             force_refresh=prefetch.force_refresh)
+        except Exception as e:
+            print(f"Carregamento antecipado dos cadastros da Omie falhou ({prefetch.client}): {e}")
+            prefetch.finished_at = time.time()
+            prefetch.future.set_exception(e)
+        else:
+            prefetch.finished_at = time.time()
+            prefetch.future.set_result(result)
+
+    def _prefetched_catalogs(self, client: str, force_refresh: bool) -> Optional[Tuple[List[Dict], List[Dict], Any]]:
+        """
+        Cadastros do carregamento antecipado do cliente. Se ele ainda estiver
+        em andamento, espera por ele em vez de iniciar outra busca. None se
+        não houver carregamento que sirva ou se ele falhou (o processamento
+        segue pelo caminho normal, que avisa o erro).
+        """
+        with self._prefetch_lock:
+            prefetch = self._prefetch
+        if prefetch is None or not prefetch.covers(client, force_refresh):
+            return None
+        if not prefetch.future.done():
+            print("Aguardando os cadastros da Omie que já estão sendo carregados...")
+        while True:
+            self._check_cancelled()
+            try:
+                suppliers, categories, age = prefetch.future.result(timeout=PREFETCH_WAIT_STEP)
+                break
+            except FutureTimeout:
+                continue
+            except Exception:
+                return None
+        if age is not None:
+            age += time.time() - prefetch.finished_at
+        return suppliers, categories, age
+
+    def _load_catalogs(self, client: str, force_refresh: bool) -> Optional[Tuple[List[Dict], List[Dict], Any]]:
+        """
+        (fornecedores, categorias, idade do cache) do cliente: os do
+        carregamento antecipado, se houver, ou lidos agora do cache local
+        (que, vencido, é atualizado em segundo plano). None se as
+        credenciais faltarem ou estiverem incompletas.
+        """
+        catalogs = self._prefetched_catalogs(client, force_refresh)
+        if catalogs is not None:
+            return catalogs
+
+        with self._span("credenciais"):
+            credentials = self._load_credentials(client)
+        if not credentials:
+            return None
+
+        app_key = credentials.get("app_key")
+        app_secret = credentials.get("app_secret")
+
+        if not all([app_key, app_secret]):
+            self._notify("error", "Erro", "Credenciais de API incompletas.")
+            return None
+        return self.catalog_cache.load(client, app_key, app_secret, force_refresh=force_refresh)
+
+    def _resolve_bank(self, bank: Optional[str], extract_file: str) -> Optional[str]:
+        """
+        Confere o banco informado com o reconhecido no início do arquivo,
+        antes da extração completa. Com AUTO_DETECT, usa o reconhecido; um
+        banco escolhido pelo usuário é sempre mantido (a detecção só avisa).
+        """
+        with self._span("deteccao_banco") as span:
+            detected = detect_bank(extract_file)
+            span.count(banco=detected or "")
+
+        if not bank or bank == AUTO_DETECT:
+            if not detected:
+                self._notify("error", "Banco não reconhecido",
+                             "Não foi possível reconhecer o banco do extrato. Selecione o banco manualmente.")
+                return None
+            print(f"Banco reconhecido pelo arquivo: {detected}")
+            return detected
+        if detected and detected != bank:
+            self._notify("warning", "Banco diferente",
+                         f"O arquivo parece ser um extrato do {detected}, não do {bank}. "
+                         f"Usando a leitura do {bank}, como selecionado; se as transações não "
+                         f"vierem certas, selecione {detected} e processe de novo.")
+        return bank
+
+    def _process_and_reconcile(self, bank: str, extract_file: str, client: str,
+                               force_refresh: bool = False) -> Optional[List[Transaction]]:
+        self._report_progress("Lendo o extrato...", PROGRESS_EXTRACTION[0])
+        bank = self._resolve_bank(bank, extract_file)
+        self.last_bank = bank
+        if bank is None:
+            return None
+        # O formato segue a extensão: um OFX nunca vai para a leitura de PDF
+        extension = os.path.splitext(extract_file)[1].lower()
+        file_format = FORMATS_BY_EXTENSION.get(extension, self.file_formats[bank])
+        self.rejected_rows = []
+        with self._span("extracao", banco=bank) as span:
+            transactions = self._process_extract(extract_file, file_format, bank)
+            span.count(transacoes=len(transactions), rejeitadas=len(self.rejected_rows))
+        if self.rejected_rows:
+            self._notify("warning", "Datas inválidas", self._rejected_rows_message())
+        
+        if not transactions:
+            self._notify("info", "Aviso", "Nenhuma transação encontrada no extrato.")
+            return None
+
+        self._report_progress("Carregando fornecedores e categorias da Omie...", PROGRESS_OMIE)
+        with self._span("omie") as span:
+            catalogs = self._load_catalogs(client, force_refresh)
+            if catalogs is None:
+                return None
+            self.omie_suppliers, self.omie_categories, self.catalog_age = catalogs
+            span.count(fornecedores=len(self.omie_suppliers), categorias=len(self.omie_categories),
+                       cache=self.catalog_age is not None)
+
+        if not self.omie_suppliers:
+            self._notify("info", "Aviso", "Nenhum fornecedor encontrado na Omie para este cliente.")
+            return transactions
+        
+        with self._span("conciliacao", transacoes=len(transactions)) as span:
+            supplier_index = self._get_supplier_index()
+            comparisons_before = supplier_index.comparisons
+            learned_count = 0
+            self.memory = ReconciliationMemory(client)
+            start, end = PROGRESS_MATCHING
+            for position, transaction in enumerate(transactions):
+                if position % PROGRESS_REPORT_EVERY == 0:
+                    self._report_progress(f"Conciliando fornecedores ({position}/{len(transactions)})...",
+                                          start + (end - start) * position / len(transactions))
+                # Escolhas manuais anteriores têm prioridade sobre a comparação aproximada
+                learned = self.memory.lookup(transaction.description)
+                if learned and (learned['fornecedor'] in supplier_index or learned['fornecedor'] == DEFAULT_CATEGORY):
+                    transaction.set_supplier(learned['fornecedor'])
+                    transaction.set_category(learned['categoria'])
+                    learned_count += 1
+                    continue
+                best_match, _ = supplier_index.best_match(transaction.description)
+                transaction.supplier = best_match or ""
+            self.memory.flush_stats()
+            span.count(conciliadas=sum(1 for t in transactions if t.supplier),
+                       memorizadas=learned_count,
+                       candidatos_comparados=supplier_index.comparisons - comparisons_before)
+                
+        return transactions
+
+    def _rejected_rows_message(self) -> str:
+        lines = [f"{date_text}  {description}  {value:.2f}"
+                 for date_text, description, value in self.rejected_rows[:REJECTED_ROWS_SHOWN]]
+        if len(self.rejected_rows) > REJECTED_ROWS_SHOWN:
+            lines.append(f"... e mais {len(self.rejected_rows) - REJECTED_ROWS_SHOWN}")
+        return (f"{len(self.rejected_rows)} linha(s) do extrato têm data inexistente e não foram importadas. "
+                f"Confira e lance manualmente:\n\n" + "\n".join(lines))
+
+    def _get_supplier_index(self) -> SupplierIndex:
+        """
+        Retorna o índice de fornecedores, reconstruindo-o apenas quando
+        a lista de fornecedores da Omie muda.
+        """
+        if self._supplier_index is None or self._indexed_suppliers is not self.omie_suppliers:
+            self._supplier_index = SupplierIndex(self.omie_suppliers)
+            self._indexed_suppliers = self.omie_suppliers
+        return self._supplier_index
+
+    def find_duplicates(self, client: str, account: str, transactions: List[Transaction]) -> List[int]:
+        """
+        Índices das transações que já foram exportadas em execuções
+        anteriores (mesmo cliente, conta, data, valor e descrição).
+        """
+        with self._span("duplicadas", transacoes=len(transactions)) as span:
+            duplicates = self.ledger.find_duplicates(client, account, transactions)
+            span.count(duplicadas=len(duplicates))
+        return duplicates
+
+    def process_and_save(self, transactions: List[Transaction], account: str, due_date: str,
+                         client: Optional[str] = None, keys: Optional[List[LedgerKey]] = None) -> str:
+        """
+        Processa e salva os dados na planilha final. Com client, as
+        transações gravadas entram no histórico usado por find_duplicates
+        (keys: chaves de transaction_ledger.without_duplicates, quando as
+        repetidas foram retiradas do lote).
+        """
+        base_file = self.base_file
+        
+        if not os.path.exists(base_file):
+            return f"ERRO: Arquivo base '{base_file}' não encontrado!"
+
+        new_file_path = self._new_output_path()
+        self.last_output_path = None
+        try:
+            with self._span("planilha", linhas=len(transactions)):
+                write_transactions(base_file, new_file_path, transactions, account, due_date)
+        except Exception as e:
+            print(f"Erro ao criar nova planilha: {e}")
+            return "Erro ao criar a nova planilha."
+        self.last_output_path = new_file_path
+        if client:
+            try:
+                self.ledger.record(client, account, transactions, due_date, new_file_path, keys=keys)
+            except Exception as e:
+                self._notify("warning", "Histórico", f"A planilha foi gerada, mas o histórico de transações "
+                                                     f"não foi atualizado: {e}")
+        return f"✅ Processamento concluído! {len(transactions)} transações inseridas.\n\nArquivo atualizado: {new_file_path}"
+
+    def _new_output_path(self) -> str:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        new_file_path = os.path.join(self.output_dir, f"Omie_Contas_Pagar_Atualizada_{timestamp}.xlsx")
+        # Vários extratos podem ser gravados no mesmo segundo (ex: pela linha de comando)
+        suffix = 2
+        while os.path.exists(new_file_path):
+            new_file_path = os.path.join(self.output_dir, f"Omie_Contas_Pagar_Atualizada_{timestamp}_{suffix}.xlsx")
+            suffix += 1
+        return new_file_path
+
+    def _process_extract(self, file_path: str, file_format: str, bank: str) -> List[Transaction]:
+        if file_format == "OFX":
+            return self._process_ofx(file_path)
+        elif file_format == "PDF":
+            return self._process_pdf(file_path, bank)
+        elif file_format == "Excel":
+            return self._process_excel(file_path, bank)
+        else:
+            self._notify("error", "Erro", f"Formato {file_format} não implementado ainda.")
+            return []
+    
+    def _process_ofx(self, file_path: str) -> List[Transaction]:
+        transactions = []
+        total = 0
+        ignored_credits = 0
+        amount_pattern = re.compile(r'-?\d+\.?\d*')
+        date_pattern = re.compile(r'\d{8}')
+
+        # Leitura em fluxo: uma transação por vez, sem carregar o arquivo inteiro
+        for fields in iter_ofx_file(file_path):
+            total += 1
+            amount_match = amount_pattern.match(fields.get('TRNAMT', ''))
+            date_match = date_pattern.match(fields.get('DTPOSTED', ''))
+            memo = fields.get('MEMO')
+
+            if 'TRNTYPE' in fields and date_match and amount_match and memo is not None:
+                amount = float(amount_match.group(0))
+                
+                if amount < 0:
+                    transactions.append(Transaction(self._clean_sicoob_description(memo),
+                                                    self._parse_ofx_date(date_match.group(0)),
+                                                    to_cents(abs(amount))))
+                else:
+                    ignored_credits += 1
+
+        print(f"Total de transações encontradas no arquivo: {total}")
+        if ignored_credits:
+            print(f"Transações com valor positivo ignoradas: {ignored_credits}")
+        return transactions
+
+    def _parse_ofx_date(self, ofx_date: str) -> date:
+        date_part = ofx_date[:8]
+        try:
+            return datetime.strptime(date_part, "%Y%m%d").date()
+        except ValueError:
+            return date(2025, 1, 1)
+
+    def _clean_description(self, description: str) -> str:
+        cleaned = re.sub(r'\s+', ' ', description)
+        cleaned = cleaned.strip()
+        if len(cleaned) > 50:
+            cleaned = cleaned[:50] + "..."
+        return cleaned
+
+    def _clean_sicoob_description(self, description: str) -> str:
+        return SICOOB.clean(description)
+
+    def text_engine_for(self, bank: Optional[str]) -> str:
+        """
+        Mecanismo da camada de texto usado nos PDFs do banco.
+        """
+        if bank in self.text_engines:
+            return self.text_engines[bank]
+        if "*" in self.text_engines:
+            return self.text_engines["*"]
+        profile = PROFILES_BY_NAME.get(bank)
+        return profile.text_engine if profile else DEFAULT_TEXT_ENGINE
+
+    def _iter_pdf_text(self, file_path: str, bank: Optional[str] = None) -> Iterator[str]:
+        """
+        Gera o texto do PDF página a página, com OCR apenas nas páginas sem
+        camada de texto. Ao fechar o gerador (close() ou fim do with
+        closing(...)), as páginas restantes não são extraídas.
+        """
+        self.last_page_engines = []
+        pages = iter_pages(file_path, workers=self.ocr_workers, progress=self._on_page_done,
+                           cache=self.text_cache, text_engine=self.text_engine_for(bank))
+        with self._span("texto_pdf") as span:
+            try:
+                with closing(pages):
+                    for page in pages:
+                        self.last_page_engines.append(page.engine)
+                        if self.trace is not None and page.engine == ENGINE_OCR and page.seconds:
+                            self.trace.record("ocr_pagina", page.seconds, detail=True, pagina=page.page_number + 1,
+                                              **(page.ocr.counts() if page.ocr else {}))
+                        yield page.text
+            except ProcessingCancelled:
+                raise
+            except Exception as e:
+                print(f"Erro ao processar PDF: {e}")
+                self._notify("error", "Erro", f"Erro ao processar PDF: {e}")
+            finally:
+                ocr_count = self.last_page_engines.count(ENGINE_OCR)
+                span.count(paginas=len(self.last_page_engines), paginas_ocr=ocr_count)
+                print(f"Páginas extraídas: {len(self.last_page_engines) - ocr_count} por texto, {ocr_count} por OCR")
+
+    def _on_page_done(self, done: int, total: int, page_num: int):
+        start, end = PROGRESS_EXTRACTION
+        self._report_progress(f"Texto do PDF: página {page_num + 1} concluída ({done}/{total})",
+                              start + (end - start) * done / total)
+
+    def _extract_text_with_ocr(self, file_path: str, bank: Optional[str] = None) -> str:
+        """
+        Extrai o texto de todas as páginas do PDF de uma vez.
+        """
+        return "".join(text + "\n" for text in self._iter_pdf_text(file_path, bank) if text)
+
+    def _process_pdf(self, file_path: str, bank: str) -> List[Transaction]:
+        transactions = []
+        try:
+            # O parser consome as páginas conforme são extraídas e pode parar antes do fim
+            with closing(self._iter_pdf_text(file_path, bank)) as pages:
+                transactions = self._parse_pdf_pages(bank, pages)
+                
+        except ProcessingCancelled:
+            raise
+        except Exception as e:
+            self._notify("error", "Erro", f"Erro ao processar PDF: {e}")
+            raise
+        return transactions
+    
+    def _parse_pdf_pages(self, bank: str, pages: Union[str, Iterable[str]]) -> List[Transaction]:
+        """
+        Aplica ao texto do PDF o parser do banco.
+        """
+        if bank in BANK_PROFILES:
+            return self._parse_with_profile(bank, pages)
+        elif bank == "Caixa":
+            return self._parse_cef_pdf(pages)
+        elif bank == "Sicoob":
+            return self._parse_sicoob_pdf(pages)
+        return []
+
+    def _parse_with_profile(self, bank: str, pages: Union[str, Iterable[str]]) -> List[Transaction]:
+        """
+        Parser dos extratos lidos linha a linha (Santander, Itaú, BB e o PDF
+        do Sicoob), guiado pelo perfil do banco em bank_profiles. pages é o
+        texto inteiro ou o texto de cada página.
+        """
+        profile = PROFILES_BY_NAME[bank]
+        transactions = from_rows(parse_lines(profile, pages, datetime.now().year), self.rejected_rows)
+        print(f"Total de transações encontradas ({profile.name}): {len(transactions)}")
+        return transactions
+
+    def _parse_cef_pdf(self, pages: Union[str, Iterable[str]]) -> List[Transaction]:
+        return from_rows(self._cef_pdf_rows(pages), self.rejected_rows)
+
+    def _cef_pdf_rows(self, pages: Union[str, Iterable[str]]) -> Iterator[Tuple[str, str, float]]:
+        """
+        Parser por linha da fatura da Caixa: gera (data, descrição, valor).
+        """
+        profile = CAIXA
+        section_end = profile.keyword_sets['section_end']
+        column_header = profile.keyword_sets['column_header']
+        card_header = profile.patterns['card_header']
+        anuidade_pattern = profile.patterns['anuidade']
+        alt_pattern = profile.patterns['alt']
+        processing_section = False
+        current_section = ""
+        
+        for current_year, line in statement_lines(profile, pages, datetime.now().year):
+            # Depois do total final só há resumo e propaganda: as páginas restantes não são lidas
+            if profile.is_end(line):
+                break
+            for section in CAIXA_SECTIONS:
+                if section in line and ("Cartão" in line or section == line):
+                    processing_section = True
+                    current_section = section
+                    break
+            if processing_section:
+                if section_end.search(line):
+                    processing_section = False
+                    current_section = ""
+                    continue
+                if card_header.search(line) and not any(section in line for section in CAIXA_SECTIONS):
+                    processing_section = False
+                    current_section = ""
+                    continue
+                if column_header.search(line):
+                    continue
+                match = profile.line.search(line)
+                if match:
+                    date_str = match.group(1).strip()
+                    description = match.group(2).strip()
+                    value_str = match.group(4).strip()
+                    try:
+                        value = parse_value(value_str)
+                    except ValueError as e:
+                        print(f"Erro ao converter valor '{value_str}': {e}")
+                        continue
+                    yield format_statement_date(date_str, current_year), profile.clean(description), value
+                elif current_section == "ANUIDADE":
+                    match = anuidade_pattern.search(line)
+                    if match:
+                        description = match.group(1).strip()
+                        value_str = match.group(2).strip()
+                        try:
+                            value = parse_value(value_str)
+                        except ValueError as e:
+                            print(f"Erro ao processar anuidade '{value_str}': {e}")
+                            continue
+                        yield f"01/08/{current_year}", self._clean_description(description), value
+                else:
+                    match = alt_pattern.search(line)
+                    if match:
+                        date_str = match.group(1).strip()
+                        full_description = match.group(2).strip()
+                        value_str = match.group(3).strip()
+                        desc_parts = full_description.rsplit(' ', 2)
+                        if len(desc_parts) >= 2:
+                            description = ' '.join(desc_parts[:-1])
+                        else:
+                            description = full_description
+                        try:
+                            value = parse_value(value_str)
+                        except ValueError as e:
+                            print(f"Erro no padrão alternativo '{value_str}': {e}")
+                            continue
+                        yield format_statement_date(date_str, current_year), profile.clean(description), value
+
+    def _parse_sicoob_pdf(self, pages: Union[str, Iterable[str]]) -> List[Transaction]:
+        return self._parse_with_profile("Sicoob", pages)
+
+    def _process_excel(self, file_path: str, bank: str) -> List[Transaction]:
+        transactions = []
+        try:
+            # Sem cabeçalho fixo: o parser procura a linha de títulos das colunas
+            df = pd.read_excel(file_path, header=None)
+            if bank == "Caixa":
+                transactions = self._parse_cef_excel(df)
+            else:
+                self._notify("error", "Erro", f"Leitura de planilha não implementada para {bank}.")
+        except Exception as e:
+            self._notify("error", "Erro", f"Erro ao processar Excel: {e}")
+        return transactions
+
+    def _parse_cef_excel(self, df: pd.DataFrame) -> List[Transaction]:
+        frame = parse_caixa_excel(df, datetime.now().year)
+        transactions = from_rows(zip(frame['data'].tolist(), frame['fornecedor'].tolist(), frame['valor'].tolist()),
+                                 self.rejected_rows)
+        print(f"Total de transações encontradas (Caixa, planilha): {len(transactions)}")
+        return transactions
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Memória de conciliação: guarda, por cliente, as escolhas manuais de
+fornecedor e categoria feitas na tela de conciliação.
+
+As escolhas são indexadas pela descrição normalizada do extrato e
+carregadas em um dicionário no início da execução, de modo que a consulta
+é O(1) e acontece antes de qualquer comparação aproximada.
+"""
+
+import os
+import time
+import sqlite3
+from contextlib import closing, contextmanager
+from typing import Dict, Iterator, Optional
+
+from supplier_index import normalize_name
+
+DEFAULT_MEMORY_PATH = os.path.join("dados", "memoria_conciliacao.sqlite3")
+
+
+class ReconciliationMemory:
+    """
+    Mapeamento aprendido de descrição do extrato para fornecedor e
+    categoria da Omie, de um único cliente.
+    """
+    def __init__(self, client: str, db_path: str = DEFAULT_MEMORY_PATH):
+        self.client = client
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self._pending_hits: Dict[str, int] = {}
+        self._init_db()
+        self._mappings = self._load()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # Transação confirmada (ou desfeita) e conexão fechada ao sair do with
+        with closing(sqlite3.connect(self.db_path, timeout=30)) as conn, conn:
+            yield conn
+
+    def _init_db(self):
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS mapeamentos ("
+                " cliente TEXT NOT NULL,"
+                " descricao TEXT NOT NULL,"
+                " fornecedor TEXT NOT NULL,"
+                " categoria TEXT NOT NULL,"
+                " acertos INTEGER NOT NULL DEFAULT 0,"
+                " atualizado_em REAL NOT NULL,"
+                " PRIMARY KEY (cliente, descricao))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS estatisticas ("
+                " cliente TEXT PRIMARY KEY,"
+                " acertos INTEGER NOT NULL DEFAULT 0,"
+                " falhas INTEGER NOT NULL DEFAULT 0)"
+            )
+
+    def _load(self) -> Dict[str, Dict[str, str]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT descricao, fornecedor, categoria FROM mapeamentos WHERE cliente = ?",
+                (self.client,)
+            ).fetchall()
+        return {desc: {'fornecedor': supplier, 'categoria': category} for desc, supplier, category in rows}
+
+    def __len__(self) -> int:
+        return len(self._mappings)
+
+    def lookup(self, description: str) -> Optional[Dict[str, str]]:
+        """
+        Retorna {'fornecedor': ..., 'categoria': ...} para a descrição,
+        ou None se ela nunca foi conciliada manualmente.
+        """
+        key = normalize_name(description)
+        mapping = self._mappings.get(key) if key else None
+        if mapping is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._pending_hits[key] = self._pending_hits.get(key, 0) + 1
+        return mapping
+
+    def remember(self, description: str, supplier: str, category: str):
+        """
+        Registra (ou substitui) a escolha manual para a descrição.
+        """
+        key = normalize_name(description)
+        if not key or not supplier:
+            return
+        mapping = {'fornecedor': supplier, 'categoria': category}
+        if self._mappings.get(key) == mapping:
+            return
+        self._mappings[key] = mapping
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO mapeamentos (cliente, descricao, fornecedor, categoria, atualizado_em)"
+                " VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT (cliente, descricao) DO UPDATE SET"
+                " fornecedor = excluded.fornecedor, categoria = excluded.categoria,"
+                " atualizado_em = excluded.atualizado_em",
+                (self.client, key, supplier, category, time.time())
+            )
+
+    def flush_stats(self):
+        """
+        Grava os contadores de acertos e falhas acumulados na execução.
+        """
+        if not (self.hits or self.misses):
+            return
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE mapeamentos SET acertos = acertos + ? WHERE cliente = ? AND descricao = ?",
+                [(count, self.client, key) for key, count in self._pending_hits.items()]
+            )
+            conn.execute(
+                "INSERT INTO estatisticas (cliente, acertos, falhas) VALUES (?, ?, ?)"
+                " ON CONFLICT (cliente) DO UPDATE SET"
+                " acertos = acertos + excluded.acertos, falhas = falhas + excluded.falhas",
+                (self.client, self.hits, self.misses)
+            )
+        print(f"Memória de conciliação ({self.client}): {self.hits} acertos, {self.misses} falhas.")
+        self._pending_hits = {}
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Medição das etapas de uma execução (credenciais, extração do PDF, OCR por
+página, busca na Omie, conciliação e gravação da planilha).
+
+Cada etapa vira um intervalo com duração e contagens (páginas, transações,
+fornecedores, candidatos comparados). Ao final, a execução é gravada em um
+JSON em logs/execucoes/ e resumida em uma linha para a tela.
+
+Com perfil ligado (parâmetro profile ou variável de ambiente
+AUTOMACAO_PERFIL=1), a execução também grava um perfil do cProfile (.prof,
+abrir com snakeviz ou pstats) e as linhas que mais alocaram memória
+segundo o tracemalloc (.txt).
+"""
+
+import os
+import json
+import time
+import cProfile
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List, Dict, Optional
+
+DEFAULT_LOG_DIR = os.path.join("logs", "execucoes")
+PROFILE_ENV_VAR = "AUTOMACAO_PERFIL"
+TRACEMALLOC_TOP = 30
+
+# Nomes das etapas na tela
+STAGE_LABELS = {
+    "deteccao_banco": "Reconhecimento do banco",
+    "credenciais": "Credenciais",
+    "extracao": "Extração",
+    "texto_pdf": "Texto do PDF",
+    "ocr_pagina": "OCR da página",
+    "omie": "Omie",
+    "conciliacao": "Conciliação",
+    "conciliacao_manual": "Conciliação manual",
+    "duplicadas": "Duplicadas",
+    "planilha": "Planilha",
+}
+
+_tracemalloc_users = 0
+_tracemalloc_lock = threading.Lock()
+
+
+def profiling_requested() -> bool:
+    return os.environ.get(PROFILE_ENV_VAR, "").strip().lower() in ("1", "sim", "true", "yes")
+
+
+def _start_tracemalloc():
+    # O tracemalloc é global: só para quando a última execução com perfil terminar
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _tracemalloc_users += 1
+
+
+def _stop_tracemalloc() -> Optional[tracemalloc.Snapshot]:
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        snapshot = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        _tracemalloc_users = max(0, _tracemalloc_users - 1)
+        if _tracemalloc_users == 0:
+            tracemalloc.stop()
+    return snapshot
+
+
+class Span:
+    """
+    Uma etapa medida: nome, início (relativo ao início da execução),
+    duração e contagens.
+    """
+    def __init__(self, name: str, start: float, counts: Optional[Dict] = None, detail: bool = False):
+        self.name = name
+        self.start = start
+        self.seconds = 0.0
+        self.counts: Dict = dict(counts or {})
+        self.detail = detail
+
+    def count(self, **counts):
+        self.counts.update(counts)
+
+    def to_dict(self) -> Dict:
+        return {"etapa": self.name, "inicio_segundos": round(self.start, 4),
+                "segundos": round(self.seconds, 4), **self.counts}
+
+
+class RunTrace:
+    """
+    Intervalos medidos de uma execução. Pode receber etapas de várias threads.
+    """
+    def __init__(self, label: str = "", log_dir: str = DEFAULT_LOG_DIR, profile: Optional[bool] = None):
+        self.label = label
+        self.log_dir = log_dir
+        self.profile = profiling_requested() if profile is None else profile
+        self.started_at = datetime.now()
+        self.spans: List[Span] = []
+        self.log_path: Optional[str] = None
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self._profiler: Optional[cProfile.Profile] = None
+        self._finished = False
+        if self.profile:
+            # O cProfile mede a thread que iniciou a execução
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+            _start_tracemalloc()
+
+    @contextmanager
+    def span(self, name: str, **counts):
+        """
+        Mede o bloco como uma etapa. As contagens podem ser completadas
+        dentro do bloco com span.count(...).
+        """
+        span = Span(name, time.perf_counter() - self._t0, counts)
+        try:
+            yield span
+        finally:
+            span.seconds = time.perf_counter() - self._t0 - span.start
+            with self._lock:
+                self.spans.append(span)
+
+    def record(self, name: str, seconds: float, detail: bool = False, **counts):
+        """
+        Registra uma etapa medida em outro lugar (ex: OCR em outro processo).
+        Etapas de detalhe vão para o log, mas não para o resumo da tela.
+        """
+        span = Span(name, max(0.0, time.perf_counter() - self._t0 - seconds), counts, detail)
+        span.seconds = seconds
+        with self._lock:
+            self.spans.append(span)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._t0
+
+    def summary(self) -> str:
+        """
+        Resumo em uma linha, ex: "Extração 3.2s (12 páginas) · Omie 0.4s · Total 4.1s".
+        """
+        parts = []
+        with self._lock:
+            spans = [s for s in self.spans if not s.detail]
+        for span in sorted(spans, key=lambda s: s.start):
+            text = f"{STAGE_LABELS.get(span.name, span.name)} {span.seconds:.1f}s"
+            counts = [f"{value} {key.replace('_', ' ')}" for key, value in span.counts.items()
+                      if isinstance(value, int) and not isinstance(value, bool)]
+            if counts:
+                text += f" ({', '.join(counts)})"
+            parts.append(text)
+        parts.append(f"Total {self.elapsed():.1f}s")
+        return " · ".join(parts)
+
+    def to_dict(self, status: str = "") -> Dict:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start)
+        return {
+            "execucao": self.label,
+            "inicio": self.started_at.isoformat(timespec='seconds'),
+            "duracao_segundos": round(self.elapsed(), 4),
+            "status": status,
+            "etapas": [span.to_dict() for span in spans],
+        }
+
+    def finish(self, status: str = "ok") -> Optional[str]:
+        """
+        Encerra a execução, grava o JSON (e os perfis, se ligados) e
+        devolve o caminho do log. Chamadas seguintes não fazem nada.
+        """
+        if self._finished:
+            return self.log_path
+        self._finished = True
+
+        data = self.to_dict(status)
+        snapshot = None
+        if self._profiler is not None:
+            self._profiler.disable()
+            snapshot = _stop_tracemalloc()
+        try:
+            os.makedirs(self.log_dir, exist_ok=True)
+            base = os.path.join(self.log_dir, f"execucao_{self.started_at:%Y%m%d_%H%M%S}_{id(self):x}")
+            if self._profiler is not None:
+                self._profiler.dump_stats(base + ".prof")
+                data["perfil_cprofile"] = base + ".prof"
+            if snapshot is not None:
+                with open(base + "_memoria.txt", 'w', encoding='utf-8') as f:
+                    for stat in snapshot.statistics('lineno')[:TRACEMALLOC_TOP]:
+                        f.write(f"{stat}\n")
+                data["perfil_memoria"] = base + "_memoria.txt"
+            with open(base + ".json", 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            self.log_path = base + ".json"
+        except OSError as e:
+            print(f"Erro ao gravar o log da execução: {e}")
+        return self.log_path
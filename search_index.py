@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pesquisa por nome nas listas da conciliação manual (fornecedores e
+categorias).
+
+Os nomes são normalizados uma única vez (minúsculas, sem acentos, espaços
+simples), de modo que "sao joao" encontra "SÃO JOÃO". A busca devolve
+primeiro os nomes que começam com o texto pesquisado (busca binária em uma
+lista ordenada) e depois os que o contêm em qualquer posição (str.find sobre
+todos os nomes concatenados, sem laço Python por nome). O resultado é
+limitado, para que a lista na tela tenha sempre poucos itens.
+"""
+
+import unicodedata
+from bisect import bisect_left, bisect_right
+from typing import List, Tuple, Iterable
+
+# Itens exibidos por pesquisa; o restante exige refinar o texto
+MAX_RESULTS = 300
+
+_SEPARATOR = '\n'
+
+
+def fold(text: str) -> str:
+    """
+    Forma usada na comparação: minúsculas, sem acentos e com espaços simples.
+    """
+    if not text:
+        return ""
+    if text.isascii():
+        return ' '.join(text.lower().split())
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return ' '.join(text.casefold().split())
+
+
+class NameSearchIndex:
+    """
+    Índice de pesquisa de uma lista de nomes, montado uma vez por janela.
+    """
+    def __init__(self, names: Iterable[str]):
+        self.names: List[str] = list(names)
+        keys = [fold(name).replace(_SEPARATOR, ' ') for name in self.names]
+
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self._sorted_keys = [keys[i] for i in order]
+        self._sorted_ids = order
+
+        # Todos os nomes em um só texto; _offsets[i] é onde o nome i começa
+        self._offsets: List[int] = []
+        position = 0
+        for key in keys:
+            self._offsets.append(position)
+            position += len(key) + 1
+        self._blob = _SEPARATOR.join(keys)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def search(self, query: str, limit: int = MAX_RESULTS) -> Tuple[List[str], bool]:
+        """
+        Retorna (nomes encontrados, há mais resultados além do limite).
+        Os nomes que começam com o texto vêm antes, em ordem alfabética
+        (sem acentos); os demais seguem na ordem original da lista.
+        """
+        query = fold(query)
+        if not query:
+            return self.names[:limit], len(self.names) > limit
+
+        prefix_ids = []
+        start = bisect_left(self._sorted_keys, query)
+        for position in range(start, len(self._sorted_keys)):
+            if not self._sorted_keys[position].startswith(query):
+                break
+            prefix_ids.append(self._sorted_ids[position])
+            if len(prefix_ids) > limit:
+                break
+        if len(prefix_ids) > limit:
+            return [self.names[i] for i in prefix_ids[:limit]], True
+
+        found = set(prefix_ids)
+        contains_ids = []
+        blob, offsets = self._blob, self._offsets
+        position = blob.find(query)
+        while position != -1:
+            name_id = bisect_right(offsets, position) - 1
+            if name_id not in found:
+                if len(found) + len(contains_ids) >= limit:
+                    return self._result(prefix_ids, contains_ids), True
+                contains_ids.append(name_id)
+            # Continua a partir do próximo nome: cada nome entra uma só vez
+            if name_id + 1 >= len(offsets):
+                break
+            position = blob.find(query, offsets[name_id + 1])
+        return self._result(prefix_ids, contains_ids), False
+
+    def _result(self, prefix_ids: List[int], contains_ids: List[int]) -> List[str]:
+        return [self.names[i] for i in prefix_ids] + [self.names[i] for i in contains_ids]
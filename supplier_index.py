@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Índice de fornecedores da Omie para conciliação rápida.
+
+O índice é montado uma única vez por lista de fornecedores e evita comparar
+cada descrição do extrato com todos os fornecedores:
+
+- Nomes idênticos (ignorando maiúsculas) são resolvidos por dicionário, O(1).
+- Um índice invertido de bigramas seleciona apenas os fornecedores que ainda
+  podem atingir a nota mínima; só esses passam pelo fuzz.ratio.
+- Nomes normalizados (sem acentos, pontuação e sufixos LTDA/ME/EIRELI...)
+  entram nas sugestões da conciliação manual, nunca na automática.
+
+O filtro de bigramas é exato: um fornecedor descartado nunca teria nota acima
+de MATCH_THRESHOLD, então o melhor resultado é o mesmo da comparação com
+todos os fornecedores.
+"""
+
+import re
+import unicodedata
+from collections import defaultdict
+from typing import List, Dict, Tuple, Optional
+
+from lazy_imports import lazy_import
+
+fuzz = lazy_import("fuzzywuzzy.fuzz")
+
+# Nota mínima (exclusiva) para aceitar a conciliação automática
+MATCH_THRESHOLD = 80
+
+# Sugestões para a conciliação manual: quantas, nota mínima e quantos
+# fornecedores (os com mais bigramas em comum) passam pelo fuzz.ratio
+SUGGESTION_COUNT = 3
+SUGGESTION_MIN_SCORE = 50
+SUGGESTION_POOL = 40
+
+# Sufixos societários removidos na normalização
+COMPANY_SUFFIXES = ['LTDA', 'ME', 'EPP', 'EIRELI', 'MEI', 'SA', 'S A', 'S/A', 'SS', 'CIA']
+
+_suffix_pattern = re.compile(
+    r'(?:\s+(?:' + '|'.join(re.escape(s.lower()) for s in COMPANY_SUFFIXES) + r'))+\s*$'
+)
+_non_alnum_pattern = re.compile(r'[^a-z0-9/ ]+')
+_spaces_pattern = re.compile(r'\s+')
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normaliza um nome para comparação: remove acentos, pontuação,
+    sufixos societários e espaços extras, e converte para minúsculas.
+    """
+    if not name:
+        return ""
+    text = unicodedata.normalize('NFKD', name)
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    text = _non_alnum_pattern.sub(' ', text)
+    text = _spaces_pattern.sub(' ', text).strip()
+    text = _suffix_pattern.sub('', ' ' + text).strip()
+    return text
+
+
+def supplier_display_name(supplier: Dict) -> Optional[str]:
+    """
+    Nome usado para exibir e conciliar um fornecedor da Omie.
+    """
+    return supplier.get('nome_fantasia') or supplier.get('razao_social')
+
+
+def _bigrams(text: str) -> Dict[str, int]:
+    counts = defaultdict(int)
+    for i in range(len(text) - 1):
+        counts[text[i:i + 2]] += 1
+    return counts
+
+
+class SupplierIndex:
+    """
+    Índice de nomes de fornecedores construído uma vez por lista da Omie.
+    """
+    def __init__(self, suppliers: List[Dict]):
+        self.names: List[str] = []          # nome original, na ordem da Omie
+        self.lowered: List[str] = []        # nome em minúsculas (usado no fuzz.ratio)
+        self._exact: Dict[str, int] = {}
+        self._normalized: Dict[str, int] = {}
+        self._by_length: Dict[int, List[int]] = defaultdict(list)
+        self._postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        # Total de candidatos comparados com fuzz.ratio (para as medições da execução)
+        self.comparisons = 0
+
+        for supplier in suppliers:
+            name = supplier_display_name(supplier)
+            if not name:
+                continue
+            lowered = name.lower()
+            # Nomes repetidos têm a mesma nota; vale o primeiro, como na busca completa
+            if lowered in self._exact:
+                continue
+            name_id = len(self.names)
+            self.names.append(name)
+            self.lowered.append(lowered)
+            self._exact[lowered] = name_id
+            self._normalized.setdefault(normalize_name(name), name_id)
+            self._by_length[len(lowered)].append(name_id)
+            for bigram, count in _bigrams(lowered).items():
+                self._postings[bigram].append((name_id, count))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return bool(name) and name.lower() in self._exact
+
+    def _shared_bigrams(self, query: str) -> Dict[int, int]:
+        # Bigramas em comum entre a descrição e cada fornecedor que tenha algum
+        shared = defaultdict(int)
+        for bigram, count in _bigrams(query).items():
+            for name_id, name_count in self._postings.get(bigram, ()):
+                shared[name_id] += min(count, name_count)
+        return shared
+
+    def candidates(self, query: str) -> List[int]:
+        """
+        Retorna, em ordem original, os fornecedores que podem ter nota
+        acima de MATCH_THRESHOLD para a descrição (já em minúsculas).
+
+        Para nota > 80 a distância de inserções/remoções d entre os textos é
+        no máximo 19,5% da soma dos tamanhos; cada operação destrói no
+        máximo dois bigramas, então os textos compartilham pelo menos
+        max(len) - 1 - 2*d bigramas.
+        """
+        query_len = len(query)
+        shared = self._shared_bigrams(query)
+
+        result = []
+        required_by_length = {}
+        for length, ids in self._by_length.items():
+            total = query_len + length
+            max_distance = (1000 - 10 * MATCH_THRESHOLD - 5) * total // 1000
+            if abs(query_len - length) > max_distance:
+                continue
+            required = max(query_len, length) - 1 - 2 * max_distance
+            if required <= 0:
+                result.extend(ids)
+            else:
+                required_by_length[length] = required
+
+        for name_id, count in shared.items():
+            required = required_by_length.get(len(self.lowered[name_id]))
+            if required is not None and count >= required:
+                result.append(name_id)
+
+        result.sort()
+        return result
+
+    def best_match(self, description: str) -> Tuple[Optional[str], int]:
+        """
+        Retorna o melhor fornecedor para a descrição e sua nota.
+        O nome só é retornado quando a nota passa de MATCH_THRESHOLD.
+        """
+        if not description or not self.names:
+            return None, 0
+
+        query = description.lower()
+        exact_id = self._exact.get(query)
+        if exact_id is not None:
+            return self.names[exact_id], 100
+
+        best_id = None
+        highest_score = 0
+        candidates = self.candidates(query)
+        self.comparisons += len(candidates)
+        ratio = fuzz.ratio
+        for name_id in candidates:
+            score = ratio(query, self.lowered[name_id])
+            if score > highest_score:
+                highest_score = score
+                best_id = name_id
+
+        if highest_score > MATCH_THRESHOLD:
+            return self.names[best_id], highest_score
+        return None, highest_score
+
+    def suggestions(self, description: str, limit: int = SUGGESTION_COUNT,
+                    min_score: int = SUGGESTION_MIN_SCORE) -> List[Tuple[str, int]]:
+        """
+        Retorna até limit fornecedores (nome, nota) para sugerir na
+        conciliação manual, do mais para o menos parecido.
+
+        Diferente de best_match, não é exaustivo: só os SUGGESTION_POOL
+        fornecedores com mais bigramas em comum (proporcionalmente ao
+        tamanho) são comparados com fuzz.ratio.
+        """
+        if not description or not self.names:
+            return []
+
+        query = description.lower()
+        scores: Dict[int, int] = {}
+        exact_id = self._exact.get(query)
+        if exact_id is None and normalize_name(description):
+            exact_id = self._normalized.get(normalize_name(description))
+        if exact_id is not None:
+            scores[exact_id] = 100
+
+        query_len = len(query)
+        shared = self._shared_bigrams(query)
+        pool = sorted(shared, key=lambda i: (-shared[i] / (query_len + len(self.lowered[i])), i))
+        for name_id in pool[:SUGGESTION_POOL]:
+            if name_id not in scores:
+                scores[name_id] = fuzz.ratio(query, self.lowered[name_id])
+
+        ranked = sorted((item for item in scores.items() if item[1] >= min_score), key=lambda item: (-item[1], item[0]))
+        return [(self.names[name_id], score) for name_id, score in ranked[:limit]]
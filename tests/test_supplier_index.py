@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+"""
+Conciliação automática pelo índice de fornecedores (supplier_index).
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supplier_index import SupplierIndex  # noqa: E402
+
+
+def test_best_match_needs_score_above_threshold():
+    index = SupplierIndex([{"razao_social": "ED "}, {"razao_social": "POSTO IPIRANGA LTDA"}])
+    # Mesmo nome depois de normalizado, mas com fuzz.ratio 80: fica para a conciliação manual
+    assert index.best_match("ed")[0] is None
+    assert index.best_match("posto ipiranga ltda") == ("POSTO IPIRANGA LTDA", 100)
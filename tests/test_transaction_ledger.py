@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""
+Histórico de transações exportadas (transaction_ledger).
+"""
+
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transaction_ledger import TransactionLedger, without_duplicates  # noqa: E402
+from transaction_records import Transaction  # noqa: E402
+
+
+def _ride() -> Transaction:
+    return Transaction("UBER *TRIP", date(2024, 3, 5), 2350)
+
+
+def test_skipped_duplicate_keeps_original_occurrence(tmp_path):
+    ledger = TransactionLedger(str(tmp_path / "historico.sqlite3"))
+    assert ledger.record("Cliente", "Conta", [_ride()]) == 1
+
+    # Novo extrato com duas corridas iguais no mesmo dia: a primeira já foi exportada
+    batch = [_ride(), _ride()]
+    duplicates = ledger.find_duplicates("Cliente", "Conta", batch)
+    assert duplicates == [0]
+
+    kept, keys = without_duplicates(batch, duplicates)
+    assert len(kept) == 1
+    assert ledger.record("Cliente", "Conta", kept, keys=keys) == 1
+
+    # Reimportar o mesmo extrato: as duas corridas já estão no histórico
+    assert ledger.find_duplicates("Cliente", "Conta", [_ride(), _ride()]) == [0, 1]
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+"""
+Conversão das linhas dos parsers em transações (transaction_records).
+"""
+
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transaction_records import from_rows  # noqa: E402
+
+
+def test_invalid_dates_are_returned_not_dropped():
+    rejected = []
+    transactions = from_rows([("31/09/2025", "POSTO IPIRANGA", 150.0),
+                              ("30/09/2025", "UBER *TRIP", 23.5)], rejected)
+    assert [(t.date, t.cents) for t in transactions] == [(date(2025, 9, 30), 2350)]
+    assert rejected == [("31/09/2025", "POSTO IPIRANGA", 150.0)]
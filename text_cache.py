@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache do texto extraído de extratos em PDF, endereçado pelo conteúdo.
+
+Cada página é guardada pela chave (hash do arquivo, página, mecanismo de
+extração, configuração do OCR), então reprocessar o mesmo arquivo, mesmo
+com outro nome ou de outra pasta, não repete o pdfplumber nem o Tesseract.
+O cache tem tamanho máximo e descarta primeiro as páginas usadas há mais
+tempo (LRU), junto com o registro dos documentos que perderam páginas. O
+tamanho total é somado no banco uma vez e depois acompanhado a cada
+gravação; só é somado de novo quando parece passar do máximo.
+"""
+
+import os
+import time
+import hashlib
+import sqlite3
+import threading
+from contextlib import closing, contextmanager
+from typing import Iterator, List, Optional
+
+DEFAULT_TEXT_CACHE_PATH = os.path.join("cache", "textos_extraidos.sqlite3")
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+def file_hash(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    SHA-256 do conteúdo do arquivo, lido em blocos.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PageTextCache:
+    """
+    Cache LRU, limitado em bytes, do texto de cada página de um PDF.
+    """
+    def __init__(self, db_path: str = DEFAULT_TEXT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Bytes de texto no cache; None até a primeira gravação
+        self._total_bytes: Optional[int] = None
+        self._init_db()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # Transação confirmada (ou desfeita) e conexão fechada ao sair do with
+        with closing(sqlite3.connect(self.db_path, timeout=30)) as conn, conn:
+            yield conn
+
+    def _init_db(self):
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS paginas ("
+                " arquivo TEXT NOT NULL,"
+                " pagina INTEGER NOT NULL,"
+                " mecanismo TEXT NOT NULL,"
+                " configuracao TEXT NOT NULL,"
+                " texto TEXT NOT NULL,"
+                " tamanho INTEGER NOT NULL,"
+                " ultimo_uso REAL NOT NULL,"
+                " PRIMARY KEY (arquivo, pagina, mecanismo, configuracao))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_paginas_uso ON paginas (ultimo_uso)")
+            # Mecanismo usado em cada página, para pular até a classificação das páginas
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS documentos ("
+                " arquivo TEXT NOT NULL,"
+                " configuracao TEXT NOT NULL,"
+                " mecanismos TEXT NOT NULL,"
+                " PRIMARY KEY (arquivo, configuracao))"
+            )
+
+    def get_page(self, digest: str, page_number: int, engine: str, settings: str) -> Optional[str]:
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT texto FROM paginas WHERE arquivo = ? AND pagina = ? AND mecanismo = ? AND configuracao = ?",
+                (digest, page_number, engine, settings)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE paginas SET ultimo_uso = ? WHERE arquivo = ? AND pagina = ? AND mecanismo = ? AND configuracao = ?",
+                (time.time(), digest, page_number, engine, settings)
+            )
+        return row[0]
+
+    def put_page(self, digest: str, page_number: int, engine: str, settings: str, text: str):
+        size = len(text.encode('utf-8'))
+        key = (digest, page_number, engine, settings)
+        with self._lock, self._connect() as conn:
+            replaced = conn.execute(
+                "SELECT tamanho FROM paginas WHERE arquivo = ? AND pagina = ? AND mecanismo = ? AND configuracao = ?",
+                key
+            ).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO paginas"
+                " (arquivo, pagina, mecanismo, configuracao, texto, tamanho, ultimo_uso)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                key + (text, size, time.time())
+            )
+            if self._total_bytes is None:
+                self._total_bytes = self._stored_bytes(conn)
+            else:
+                self._total_bytes += size - (replaced[0] if replaced else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict(conn)
+
+    @staticmethod
+    def _stored_bytes(conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT COALESCE(SUM(tamanho), 0) FROM paginas").fetchone()[0]
+
+    def _evict(self, conn: sqlite3.Connection):
+        # Outras instâncias (ex: extratos em paralelo na linha de comando) também gravam:
+        # a soma exata é refeita antes de descartar
+        total = self._stored_bytes(conn)
+        self._total_bytes = total
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        removed = 0
+        doomed = []
+        documents = set()
+        for rowid, digest, size in conn.execute("SELECT rowid, arquivo, tamanho FROM paginas ORDER BY ultimo_uso"):
+            doomed.append((rowid,))
+            documents.add((digest,))
+            removed += size
+            if removed >= excess:
+                break
+        conn.executemany("DELETE FROM paginas WHERE rowid = ?", doomed)
+        # O registro do documento só serve para entregar as páginas do cache
+        conn.executemany("DELETE FROM documentos WHERE arquivo = ?", documents)
+        self._total_bytes = total - removed
+
+    def get_engines(self, digest: str, settings: str) -> Optional[List[str]]:
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT mecanismos FROM documentos WHERE arquivo = ? AND configuracao = ?",
+                (digest, settings)
+            ).fetchone()
+        return row[0].split(',') if row else None
+
+    def put_engines(self, digest: str, settings: str, engines: List[str]):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO documentos (arquivo, configuracao, mecanismos) VALUES (?, ?, ?)",
+                (digest, settings, ','.join(engines))
+            )
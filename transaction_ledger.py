@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Histórico das transações já exportadas para a planilha da Omie.
+
+Cada transação gravada é registrada em um banco SQLite com a chave
+(cliente, conta, data, valor em centavos, descrição normalizada,
+ocorrência). A ocorrência numera compras idênticas dentro do mesmo lote
+(ex: duas passagens de mesmo valor no mesmo dia), que são legítimas; ao
+importar de novo um extrato que se sobrepõe a um anterior, as mesmas
+chaves se repetem e as linhas são apontadas como duplicadas.
+
+A verificação de um lote é feita de uma vez: as chaves vão para uma tabela
+temporária e são cruzadas com o índice único do histórico, sem consultas
+linha a linha, de modo que continua rápida com anos de dados.
+
+Consulta pela linha de comando:
+    python transaction_ledger.py --cliente "Aurora Hotel" --desde 01/01/2025 --busca uber
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import argparse
+from contextlib import closing, contextmanager
+from datetime import datetime
+from typing import Iterator, List, Dict, Tuple, Optional
+
+from supplier_index import normalize_name
+from transaction_records import Transaction
+
+DEFAULT_LEDGER_PATH = os.path.join("dados", "historico_transacoes.sqlite3")
+
+LedgerKey = Tuple[str, int, str, int]  # data ISO, centavos, descrição normalizada, ocorrência
+
+
+def _iso_date(date_str: str) -> str:
+    """
+    Converte "dd/mm/aaaa" em "aaaa-mm-dd" (ordenável e usado nos filtros por período).
+    """
+    try:
+        return datetime.strptime(date_str.strip(), "%d/%m/%Y").strftime("%Y-%m-%d")
+    except (ValueError, AttributeError):
+        return str(date_str)
+
+
+def transaction_keys(transactions: List[Transaction]) -> List[LedgerKey]:
+    """
+    Chave de cada transação, na ordem do lote.
+    """
+    keys = []
+    seen: Dict[Tuple[str, int, str], int] = {}
+    for transaction in transactions:
+        base = (transaction.date.isoformat(), transaction.cents, normalize_name(transaction.description))
+        occurrence = seen.get(base, 0) + 1
+        seen[base] = occurrence
+        keys.append(base + (occurrence,))
+    return keys
+
+
+def without_duplicates(transactions: List[Transaction],
+                       duplicates: List[int]) -> Tuple[List[Transaction], List[LedgerKey]]:
+    """
+    Tira do lote as transações nas posições duplicates e devolve
+    (transações restantes, chaves delas). As chaves são as do lote inteiro:
+    renumerar as ocorrências só das restantes faria uma compra repetida
+    legítima colidir com a já exportada e ficar fora do histórico.
+    """
+    repeated = set(duplicates)
+    kept = [(transaction, key) for position, (transaction, key)
+            in enumerate(zip(transactions, transaction_keys(transactions))) if position not in repeated]
+    return [transaction for transaction, _ in kept], [key for _, key in kept]
+
+
+class TransactionLedger:
+    """
+    Histórico de transações exportadas, de todos os clientes.
+    """
+    def __init__(self, db_path: str = DEFAULT_LEDGER_PATH):
+        self.db_path = db_path
+        self._init_db()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # Transação confirmada (ou desfeita) e conexão fechada ao sair do with
+        with closing(sqlite3.connect(self.db_path, timeout=30)) as conn, conn:
+            yield conn
+
+    def _init_db(self):
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS transacoes ("
+                " id INTEGER PRIMARY KEY,"
+                " cliente TEXT NOT NULL,"
+                " conta TEXT NOT NULL,"
+                " data TEXT NOT NULL,"
+                " valor_centavos INTEGER NOT NULL,"
+                " descricao TEXT NOT NULL,"
+                " ocorrencia INTEGER NOT NULL,"
+                " descricao_extrato TEXT NOT NULL,"
+                " fornecedor TEXT,"
+                " categoria TEXT,"
+                " vencimento TEXT,"
+                " planilha TEXT,"
+                " exportado_em REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_transacoes_chave"
+                " ON transacoes (cliente, conta, data, valor_centavos, descricao, ocorrencia)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_transacoes_cliente_data ON transacoes (cliente, data)")
+
+    def find_duplicates(self, client: str, account: str, transactions: List[Transaction]) -> List[int]:
+        """
+        Índices (no lote) das transações que já foram exportadas antes
+        para o mesmo cliente e conta.
+        """
+        if not transactions:
+            return []
+        keys = transaction_keys(transactions)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TEMP TABLE lote (posicao INTEGER, data TEXT, valor_centavos INTEGER,"
+                " descricao TEXT, ocorrencia INTEGER)"
+            )
+            conn.executemany("INSERT INTO lote VALUES (?, ?, ?, ?, ?)",
+                             [(position,) + key for position, key in enumerate(keys)])
+            rows = conn.execute(
+                "SELECT lote.posicao FROM lote JOIN transacoes t"
+                " ON t.cliente = ? AND t.conta = ? AND t.data = lote.data"
+                " AND t.valor_centavos = lote.valor_centavos AND t.descricao = lote.descricao"
+                " AND t.ocorrencia = lote.ocorrencia"
+                " ORDER BY lote.posicao",
+                (client, account)
+            ).fetchall()
+            conn.execute("DROP TABLE lote")
+        return [position for (position,) in rows]
+
+    def record(self, client: str, account: str, transactions: List[Transaction],
+               due_date: str = "", output_path: Optional[str] = None,
+               keys: Optional[List[LedgerKey]] = None) -> int:
+        """
+        Registra o lote exportado (chaves já existentes são ignoradas).
+        keys são as chaves das transações, quando o lote veio de
+        without_duplicates; sem elas, são calculadas sobre o próprio lote.
+        Retorna quantas transações novas foram registradas.
+        """
+        if not transactions:
+            return 0
+        if keys is None:
+            keys = transaction_keys(transactions)
+        now = time.time()
+        rows = [
+            (client, account, key[0], key[1], key[2], key[3], transaction.description,
+             transaction.supplier or None, transaction.category, due_date, output_path, now)
+            for key, transaction in zip(keys, transactions)
+        ]
+        with self._connect() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO transacoes (cliente, conta, data, valor_centavos, descricao, ocorrencia,"
+                " descricao_extrato, fornecedor, categoria, vencimento, planilha, exportado_em)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            return conn.total_changes - before
+
+    def history(self, client: str, account: Optional[str] = None, start: Optional[str] = None,
+                end: Optional[str] = None, search: Optional[str] = None, limit: int = 500) -> List[Dict]:
+        """
+        Transações exportadas do cliente, da mais recente para a mais
+        antiga. start/end no formato dd/mm/aaaa; search procura na
+        descrição normalizada.
+        """
+        query = ("SELECT data, valor_centavos, descricao_extrato, fornecedor, categoria, conta, vencimento,"
+                 " planilha, exportado_em FROM transacoes WHERE cliente = ?")
+        params: list = [client]
+        if account:
+            query += " AND conta = ?"
+            params.append(account)
+        if start:
+            query += " AND data >= ?"
+            params.append(_iso_date(start))
+        if end:
+            query += " AND data <= ?"
+            params.append(_iso_date(end))
+        if search:
+            query += " AND descricao LIKE ?"
+            params.append(f"%{normalize_name(search)}%")
+        query += " ORDER BY data DESC, id DESC LIMIT ?"
+        params.append(limit)
+
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [
+            {
+                'data_registro': datetime.strptime(data, "%Y-%m-%d").strftime("%d/%m/%Y"),
+                'valor': cents / 100,
+                'fornecedor': description,
+                'fornecedor_omie': supplier or "",
+                'categoria': category,
+                'conta': account_name,
+                'vencimento': due_date,
+                'planilha': output_path,
+                'exportado_em': datetime.fromtimestamp(exported_at).strftime("%d/%m/%Y %H:%M"),
+            }
+            for data, cents, description, supplier, category, account_name, due_date, output_path, exported_at in rows
+        ]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Consulta o histórico de transações exportadas.")
+    parser.add_argument("--cliente", required=True)
+    parser.add_argument("--conta")
+    parser.add_argument("--desde", help="data inicial DD/MM/AAAA")
+    parser.add_argument("--ate", help="data final DD/MM/AAAA")
+    parser.add_argument("--busca", help="trecho da descrição do extrato")
+    parser.add_argument("--limite", type=int, default=100)
+    parser.add_argument("--banco-dados", default=DEFAULT_LEDGER_PATH)
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.banco_dados):
+        print(f"Histórico não encontrado: {args.banco_dados}", file=sys.stderr)
+        return 1
+    rows = TransactionLedger(args.banco_dados).history(args.cliente, args.conta, args.desde, args.ate,
+                                                       args.busca, args.limite)
+    for row in rows:
+        supplier = row['fornecedor_omie'] or "-"
+        print(f"{row['data_registro']}  {row['valor']:>10.2f}  {row['fornecedor'][:40]:<40}  {supplier[:30]:<30}"
+              f"  {row['conta']}  (exportado em {row['exportado_em']})")
+    print(f"{len(rows)} transação(ões).", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
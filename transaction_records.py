@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Registro das transações lidas dos extratos.
+
+Cada transação é um objeto com __slots__ (sem um dicionário por linha),
+com a data como datetime.date e o valor em centavos (int, sem erro de
+arredondamento). A categoria padrão é a mesma string para todas as
+transações; as categorias e fornecedores vindos da memória de conciliação
+ou da tela de conciliação passam por sys.intern, e a conta corrente só é
+informada na gravação da planilha.
+
+Os parsers geram tuplas (data "dd/mm/aaaa", descrição, valor);
+from_rows as converte, interpretando cada data distinta uma só vez. As
+linhas com data inexistente são devolvidas a quem chamou, para serem
+mostradas ao usuário, e não descartadas em silêncio.
+"""
+
+import sys
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+Row = Tuple[str, str, float]
+
+DEFAULT_CATEGORY = "Cartão de Credito"
+
+DATE_FORMAT = "%d/%m/%Y"
+
+
+class Transaction:
+    """
+    Uma compra do extrato: descrição original, data, valor em centavos,
+    fornecedor da Omie (vazio enquanto não conciliada) e categoria.
+    """
+    __slots__ = ('description', 'date', 'cents', 'supplier', 'category')
+
+    def __init__(self, description: str, date: date, cents: int,
+                 supplier: str = "", category: str = DEFAULT_CATEGORY):
+        self.description = description
+        self.date = date
+        self.cents = cents
+        self.supplier = supplier
+        self.category = category
+
+    @property
+    def amount(self) -> Decimal:
+        """
+        Valor exato em reais.
+        """
+        return Decimal(self.cents).scaleb(-2)
+
+    @property
+    def value(self) -> float:
+        return self.cents / 100
+
+    @property
+    def date_text(self) -> str:
+        return self.date.strftime(DATE_FORMAT)
+
+    def set_supplier(self, supplier: str):
+        self.supplier = sys.intern(supplier) if supplier else ""
+
+    def set_category(self, category: Optional[str]):
+        self.category = sys.intern(category) if category else DEFAULT_CATEGORY
+
+    def _fields(self) -> Tuple:
+        return (self.description, self.date, self.cents, self.supplier, self.category)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Transaction):
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return (f"Transaction({self.date_text}, {self.description!r}, {self.amount}"
+                f"{', ' + repr(self.supplier) if self.supplier else ''})")
+
+
+def to_cents(value: float) -> int:
+    return int(round(float(value) * 100))
+
+
+def parse_date(text: str) -> date:
+    """
+    Converte "dd/mm/aaaa" em date (ValueError se a data não existir).
+    """
+    return datetime.strptime(text.strip(), DATE_FORMAT).date()
+
+
+def parse_due_date(text: str):
+    """
+    Data de vencimento informada pelo usuário: date se estiver em
+    dd/mm/aaaa, senão o texto como foi digitado.
+    """
+    try:
+        return parse_date(text)
+    except (ValueError, AttributeError):
+        return text
+
+
+def from_rows(rows: Iterable[Row], rejected: Optional[List[Row]] = None) -> List[Transaction]:
+    """
+    Transações a partir das tuplas (data "dd/mm/aaaa", descrição, valor)
+    dos parsers. Linhas com data inexistente (ex: 31/09) não viram
+    transação e são acrescentadas a rejected.
+    """
+    dates: Dict[str, Optional[date]] = {}
+    transactions = []
+    for date_text, description, value in rows:
+        day = dates.get(date_text, False)
+        if day is False:
+            try:
+                day = parse_date(date_text)
+            except ValueError:
+                day = None
+            dates[date_text] = day
+        if day is not None:
+            transactions.append(Transaction(description, day, to_cents(value)))
+        else:
+            print(f"Data inválida: '{date_text}' ({description})")
+            if rejected is not None:
+                rejected.append((date_text, description, value))
+    return transactions